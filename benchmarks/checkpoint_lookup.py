@@ -0,0 +1,246 @@
+"""
+Latencia de lectura del último checkpoint de una conversación (PostgresSaver.get_tuple) con
+millones de conversaciones, antes y después de la retención.
+
+Trabaja en un esquema aparte (checkpoint_bench) de la base de DB_URI: ejecuta --turns turnos
+de un grafo mínimo en una conversación plantilla y la clona con INSERT ... SELECT hasta cada
+tamaño de --threads (ids con forma de celular). En cada tamaño mide get_tuple sobre
+conversaciones aleatorias (p50/p95/p99) y el tamaño de las tablas; al final aplica la
+retención (keep_last, ver src/memory/checkpoint_retention.py), ejecuta VACUUM ANALYZE y vuelve
+a medir. El esquema se borra al terminar salvo con --keep-schema.
+
+Uso:
+    uv run python benchmarks/checkpoint_lookup.py
+    uv run python benchmarks/checkpoint_lookup.py --threads 10000,100000,1000000 --turns 10
+    uv run python benchmarks/checkpoint_lookup.py --threads 1000 --samples 200 --json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+import psycopg  # noqa: E402
+from psycopg import sql  # noqa: E402
+from psycopg.rows import dict_row  # noqa: E402
+from langchain.messages import AIMessage, HumanMessage  # noqa: E402
+from langgraph.checkpoint.postgres import PostgresSaver  # noqa: E402
+from langgraph.graph import START, MessagesState, StateGraph  # noqa: E402
+
+from src.config.settings import settings  # noqa: E402
+from src.memory.checkpoint_retention import RetentionPolicy, prune_checkpoints  # noqa: E402
+
+SCHEMA = "checkpoint_bench"
+TABLES = ("checkpoints", "checkpoint_blobs", "checkpoint_writes")
+TEMPLATE_THREAD = "template"
+# Conversaciones clonadas: "57" + número de celular
+PHONE_BASE = 3_000_000_000
+
+QUESTION = "¿Qué crema dental Colgate me recomiendan para encías sensibles y cuánto cuesta en Éxito?"
+ANSWER = (
+    "Para encías sensibles te recomiendo Colgate Total Encías Reparación: ayuda a reducir el "
+    "sangrado y la inflamación desde la primera semana de uso. En Éxito cuesta $18.900 la "
+    "presentación de 75 ml y hay promoción de 3x2 en la línea Total. "
+) * 3
+
+
+def thread_name(number: int) -> str:
+    return f"57{PHONE_BASE + number}"
+
+
+def connect(conninfo: str, **kwargs) -> psycopg.Connection:
+    """Conexión en autocommit con el esquema del benchmark en el search_path."""
+    return psycopg.connect(conninfo, autocommit=True, options=f"-c search_path={SCHEMA}", **kwargs)
+
+
+def create_template(conn: psycopg.Connection, turns: int) -> PostgresSaver:
+    """Crea las tablas del checkpointer y la conversación plantilla con turns turnos reales."""
+    saver = PostgresSaver(conn)
+    saver.setup()
+
+    def reply(state: MessagesState):
+        return {"messages": [AIMessage(content=ANSWER)]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("reply", reply)
+    graph.add_edge(START, "reply")
+    agent = graph.compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": TEMPLATE_THREAD}}
+    for _ in range(turns):
+        agent.invoke({"messages": [HumanMessage(content=QUESTION)]}, config)
+    return saver
+
+
+def clone_statements(conn: psycopg.Connection) -> list[sql.Composed]:
+    """INSERT ... SELECT que copia la conversación plantilla a un rango de conversaciones."""
+    statements = []
+    for table in TABLES:
+        columns = [row["column_name"] for row in conn.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position",
+            (SCHEMA, table),
+        )]
+        select = [
+            sql.SQL("%(prefix)s::text || (%(base)s::bigint + g)::text")
+            if column == "thread_id" else sql.Identifier(column)
+            for column in columns
+        ]
+        statements.append(sql.SQL(
+            "INSERT INTO {table} ({columns}) SELECT {select} FROM {table}, "
+            "generate_series(%(start)s::bigint, %(stop)s::bigint) AS g WHERE thread_id = %(template)s"
+        ).format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+            select=sql.SQL(", ").join(select),
+        ))
+    return statements
+
+
+def grow(conn: psycopg.Connection, statements: list, current: int, target: int, chunk: int) -> None:
+    """Clona la plantilla de current + 1 a target, en transacciones de chunk conversaciones."""
+    for start in range(current + 1, target + 1, chunk):
+        stop = min(start + chunk - 1, target)
+        params = {"prefix": "57", "base": PHONE_BASE, "start": start, "stop": stop, "template": TEMPLATE_THREAD}
+        with conn.transaction():
+            for statement in statements:
+                conn.execute(statement, params)
+        print(f"  {stop:,} conversaciones", file=sys.stderr, end="\r")
+    print(file=sys.stderr)
+
+
+def table_stats(conn: psycopg.Connection) -> dict:
+    stats = {}
+    for table in TABLES:
+        row = conn.execute(
+            "SELECT reltuples::bigint AS rows, pg_total_relation_size(c.oid) AS bytes "
+            "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = %s AND c.relname = %s",
+            (SCHEMA, table),
+        ).fetchone()
+        stats[table] = {"rows": row["rows"], "mb": round(row["bytes"] / 2**20, 1)}
+    return stats
+
+
+def measure(saver: PostgresSaver, threads: int, samples: int, rng: random.Random) -> dict:
+    """Latencia de get_tuple (último checkpoint) sobre conversaciones aleatorias."""
+    def lookup():
+        config = {"configurable": {"thread_id": thread_name(rng.randint(1, threads)), "checkpoint_ns": ""}}
+        started = time.perf_counter()
+        if saver.get_tuple(config) is None:
+            raise RuntimeError(f"Sin checkpoint para {config['configurable']['thread_id']}")
+        return (time.perf_counter() - started) * 1000
+
+    for _ in range(min(samples, 50)):
+        lookup()
+    latencies = sorted(lookup() for _ in range(samples))
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+    }
+
+
+def build_report(args) -> dict:
+    sizes = sorted(int(size) for size in args.threads.split(","))
+    rng = random.Random(args.seed)
+    conninfo = args.db_uri or settings.DB_URI
+
+    with psycopg.connect(conninfo, autocommit=True) as admin:
+        admin.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(SCHEMA)))
+        admin.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(SCHEMA)))
+
+    report = {"turns": args.turns, "samples": args.samples, "stages": []}
+    try:
+        with connect(conninfo, prepare_threshold=0, row_factory=dict_row) as conn:
+            saver = create_template(conn, args.turns)
+            report["checkpoints_per_thread"] = conn.execute(
+                "SELECT count(*) AS n FROM checkpoints WHERE thread_id = %s", (TEMPLATE_THREAD,)
+            ).fetchone()["n"]
+            statements = clone_statements(conn)
+
+            current = 0
+            for size in sizes:
+                grow(conn, statements, current, size, args.chunk)
+                current = size
+                for table in TABLES:
+                    conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+                report["stages"].append({
+                    "stage": "sin retención",
+                    "threads": size,
+                    "tables": table_stats(conn),
+                    "lookup": measure(saver, size, args.samples, rng),
+                })
+
+            policy = RetentionPolicy(keep_last=args.keep_last, ttl_days=0, batch_size=args.batch, pause_s=0)
+            with connect(conninfo) as retention_conn:
+                retention = prune_checkpoints(retention_conn, policy)
+            report["retention"] = retention.as_dict()
+            for table in TABLES:
+                conn.execute(sql.SQL("VACUUM ANALYZE {}").format(sql.Identifier(table)))
+            report["stages"].append({
+                "stage": f"keep_last={args.keep_last}",
+                "threads": current,
+                "tables": table_stats(conn),
+                "lookup": measure(saver, current, args.samples, rng),
+            })
+    finally:
+        if not args.keep_schema:
+            with psycopg.connect(conninfo, autocommit=True) as admin:
+                admin.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(SCHEMA)))
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"Checkpoints por conversación: {report['checkpoints_per_thread']} ({report['turns']} turnos)")
+    print(f"{'etapa':<16}{'conversaciones':>16}{'checkpoints':>14}{'MB':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage in report["stages"]:
+        tables, lookup = stage["tables"], stage["lookup"]
+        size_mb = sum(table["mb"] for table in tables.values())
+        print(
+            f"{stage['stage']:<16}{stage['threads']:>16,}{tables['checkpoints']['rows']:>14,}{size_mb:>10.1f}"
+            f"{lookup['p50_ms']:>10.2f}{lookup['p95_ms']:>10.2f}{lookup['p99_ms']:>10.2f}"
+        )
+    retention = report["retention"]
+    print(
+        f"Retención: {retention['deleted']} en {retention['seconds']} s "
+        f"({retention['batches']} lotes, {retention['skipped_batches']} omitidos)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latencia de lectura del último checkpoint antes y después de la retención")
+    parser.add_argument("--threads", default="10000,100000,1000000", help="Tamaños a medir, separados por coma")
+    parser.add_argument("--turns", type=int, default=10, help="Turnos de la conversación plantilla")
+    parser.add_argument("--samples", type=int, default=2000, help="Lecturas medidas por tamaño")
+    parser.add_argument("--keep-last", type=int, default=settings.CHECKPOINT_KEEP_LAST,
+                        help="Checkpoints por conversación que conserva la retención")
+    parser.add_argument("--batch", type=int, default=settings.CHECKPOINT_RETENTION_BATCH,
+                        help="Conversaciones por lote de la retención")
+    parser.add_argument("--chunk", type=int, default=50_000, help="Conversaciones clonadas por transacción")
+    parser.add_argument("--seed", type=int, default=7, help="Semilla de las conversaciones muestreadas")
+    parser.add_argument("--db-uri", default=None, help="Base de datos (por defecto, DB_URI)")
+    parser.add_argument("--keep-schema", action="store_true", help=f"No borra el esquema {SCHEMA}")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args()
+
+    report = build_report(args)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Reporte reproducible del tiempo de importación de la API.
+
+Ejecuta `python -X importtime -c "import <módulo>"` en procesos nuevos, toma la mediana de
+varias corridas y muestra el tiempo total, los módulos con mayor tiempo acumulado y si se
+cargaron dependencias pesadas que deberían importarse de forma diferida.
+
+Uso:
+    uv run python benchmarks/import_time.py
+    uv run python benchmarks/import_time.py --module main --runs 7 --top 20
+    uv run python benchmarks/import_time.py --max-ms 800   # falla si se supera el umbral
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencias que no deberían cargarse solo por importar la API
+HEAVY_MODULES = (
+    "reportlab",
+    "smtplib",
+    "chromadb",
+    "langchain_chroma",
+    "langchain_google_genai",
+)
+
+
+def run_once(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Importa el módulo en un proceso nuevo.
+
+    Returns:
+        dict: {módulo: (tiempo propio µs, tiempo acumulado µs)} según -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Falló la importación de {module}:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def build_report(module: str, runs: int, top: int) -> dict:
+    samples = [run_once(module) for _ in range(runs)]
+    totals = [sum(self_us for self_us, _ in timings.values()) for timings in samples]
+    modules = set().union(*samples)
+    cumulative = {
+        name: statistics.median(timings[name][1] for timings in samples if name in timings)
+        for name in modules
+    }
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "total_ms": round(statistics.median(totals) / 1000, 1),
+        "total_ms_min": round(min(totals) / 1000, 1),
+        "modules_imported": round(statistics.median(len(timings) for timings in samples)),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in modules],
+        "slowest_cumulative_ms": [(name, round(us / 1000, 1)) for name, us in slowest],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reporte del tiempo de importación de la API")
+    parser.add_argument("--module", default="main", help="Módulo a importar (por defecto: main)")
+    parser.add_argument("--runs", type=int, default=5, help="Corridas en procesos nuevos (se reporta la mediana)")
+    parser.add_argument("--top", type=int, default=15, help="Cantidad de módulos más lentos a listar")
+    parser.add_argument("--max-ms", type=float, default=None, help="Termina con código 1 si el total supera este umbral (ms)")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args()
+
+    report = build_report(args.module, args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"import {report['module']}: mediana {report['total_ms']} ms "
+              f"(mín. {report['total_ms_min']} ms, {report['runs']} corridas, Python {report['python']})")
+        print(f"módulos importados: {report['modules_imported']}")
+        print(f"dependencias pesadas cargadas: {', '.join(report['heavy_modules_loaded']) or 'ninguna'}")
+        print("más lentos (acumulado):")
+        for name, ms in report["slowest_cumulative_ms"]:
+            print(f"  {ms:>8.1f} ms  {name}")
+
+    if args.max_ms is not None and report["total_ms"] > args.max_ms:
+        print(f"FALLA: {report['total_ms']} ms > {args.max_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
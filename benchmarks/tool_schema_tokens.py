@@ -0,0 +1,145 @@
+"""
+Reporte de tokens de entrada por llamada al modelo: prompt de sistema + esquemas de herramientas.
+
+Compara, sobre un conjunto estándar de preguntas, el esquema completo (las herramientas con
+pasos de cotización por separado y sus docstrings) con el que envía el agente con
+TOOL_SELECTION_ENABLED y TOOL_COMPACT_DESCRIPTIONS activos: selección de herramientas por
+turno, descripciones cortas y quote_pipeline_tool si QUOTE_PIPELINE_ENABLED está activo.
+Los tokens se cuentan con tiktoken (cl100k_base) si está instalado y, si no, se estiman como
+caracteres / 4; sirven para comparar, no para facturar.
+
+Uso:
+    uv run python benchmarks/tool_schema_tokens.py
+    uv run python benchmarks/tool_schema_tokens.py --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from langchain.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+
+from src.config.prompts import PROMPTS  # noqa: E402
+from src.config.settings import settings  # noqa: E402
+from src.models.tool_selection import select_tools  # noqa: E402
+from src.tools import default_tool_names, get_tools  # noqa: E402
+
+# Conversaciones de referencia: mensajes del usuario (el último es el turno medido) y, para
+# los flujos de varios pasos, las herramientas ya llamadas en el historial
+QUESTION_SET = [
+    {"name": "saludo", "turns": ["Hola"]},
+    {"name": "faq", "turns": ["¿Quién es el CEO de Colgate-Palmolive?"]},
+    {"name": "faq_horario", "turns": ["¿Cuáles son los horarios de atención?"]},
+    {"name": "abierta_producto", "turns": ["¿Qué beneficios tiene Colgate Total para las encías?"]},
+    {"name": "abierta_empresa", "turns": ["¿Qué hace Colgate-Palmolive en sostenibilidad?"]},
+    {"name": "precio", "turns": ["¿Cuánto cuesta la crema dental Colgate Triple Acción?"]},
+    {"name": "precio_tienda", "turns": ["precio jabón Palmolive pitahaya en Jumbo"]},
+    {"name": "cotizacion_inicio", "turns": ["Quiero cotizar 3 cremas Colgate Total y 2 cepillos"]},
+    {
+        "name": "cotizacion_pdf",
+        "turns": ["Quiero cotizar 3 cremas Colgate Total", "Sí, genérame el PDF"],
+        "called": ["price_tool", "calculator_tool"],
+    },
+    {
+        "name": "cotizacion_correo",
+        "turns": ["Quiero cotizar 3 cremas Colgate Total", "Envíala a cliente@example.com"],
+        "called": ["calculator_tool", "pdf_quote_tool"],
+    },
+]
+
+
+def count_tokens(text: str) -> int:
+    """Tokens de un texto con tiktoken, o una estimación de caracteres / 4 sin tiktoken."""
+    try:
+        import tiktoken
+    except ImportError:
+        return max(1, round(len(text) / 4))
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def schema_tokens(tools: list) -> int:
+    return sum(count_tokens(json.dumps(convert_to_openai_tool(tool), ensure_ascii=False)) for tool in tools)
+
+
+def build_messages(case: dict) -> list:
+    messages = []
+    for index, text in enumerate(case["turns"]):
+        messages.append(HumanMessage(content=text))
+        if index < len(case["turns"]) - 1:
+            calls = [{"name": name, "args": {}, "id": f"call_{name}"} for name in case.get("called", [])]
+            messages.append(AIMessage(content="", tool_calls=calls))
+            messages.append(AIMessage(content="Listo."))
+    return messages
+
+
+def build_report() -> dict:
+    full_tools = get_tools(default_tool_names(quote_pipeline=False))
+    agent_tools = default_tool_names(settings.QUOTE_PIPELINE_ENABLED)
+    compact_tools = {tool.name: tool for tool in get_tools(agent_tools, compact=True)}
+    prompt_tokens = count_tokens(PROMPTS["colgate_palmolive_system"])
+    baseline = prompt_tokens + schema_tokens(full_tools)
+
+    cases = []
+    for case in QUESTION_SET:
+        selected = select_tools(build_messages(case), agent_tools)
+        after = prompt_tokens + schema_tokens([compact_tools[name] for name in selected])
+        cases.append({
+            "name": case["name"],
+            "question": case["turns"][-1],
+            "tools": selected,
+            "tokens_before": baseline,
+            "tokens_after": after,
+            "saved_pct": round(100 * (baseline - after) / baseline, 1),
+        })
+
+    total_before = sum(case["tokens_before"] for case in cases)
+    total_after = sum(case["tokens_after"] for case in cases)
+    return {
+        "tokenizer": "tiktoken:cl100k_base" if _has_tiktoken() else "chars/4",
+        "system_prompt_tokens": prompt_tokens,
+        "schema_tokens_full": baseline - prompt_tokens,
+        "schema_tokens_compact_all": schema_tokens(list(compact_tools.values())),
+        "cases": cases,
+        "total_before": total_before,
+        "total_after": total_after,
+        "saved_pct": round(100 * (total_before - total_after) / total_before, 1),
+    }
+
+
+def _has_tiktoken() -> bool:
+    try:
+        import tiktoken  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reporte de tokens de los esquemas de herramientas")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    args = parser.parse_args()
+
+    report = build_report()
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"tokenizador: {report['tokenizer']}")
+    print(f"prompt de sistema: {report['system_prompt_tokens']} tokens")
+    print(f"esquemas de herramientas: {report['schema_tokens_full']} completos, "
+          f"{report['schema_tokens_compact_all']} compactos (todas las herramientas)")
+    print(f"{'caso':<20} {'antes':>7} {'después':>7} {'ahorro':>7}  herramientas")
+    for case in report["cases"]:
+        print(f"{case['name']:<20} {case['tokens_before']:>7} {case['tokens_after']:>7} "
+              f"{case['saved_pct']:>6}%  {', '.join(case['tools'])}")
+    print(f"{'total':<20} {report['total_before']:>7} {report['total_after']:>7} {report['saved_pct']:>6}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,13 @@
 Módulo principal para iniciar la aplicación FastAPI.
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env
@@ -17,15 +20,64 @@ from src.config.logger import get_logger
 
 # Importación de rutas
 from src.api.routes import router
+from src.api.admission import AdmissionController, AdmissionControlMiddleware, batch_weight
+from src.api.request_metrics import RequestMetricsMiddleware
+from src.api.request_tracing import RequestTracingMiddleware
+from src.observability.metrics import REGISTRY, Gauge
+from src.observability.tracing import TRACER
+from src.controllers.chatbot_controller import (
+    default_chatbot_controller_built,
+    get_default_chatbot_controller,
+)
+from src.controllers.warmup import WarmupState, warm_up
+from src.memory.checkpoint_retention import RetentionPolicy, retention_loop
+from src.memory.short_term_memory import pool_stats
 
 # Configuración de logging
 logger = get_logger(__name__)
 
+warmup_state = WarmupState()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la app: al arrancar, calienta el controlador en segundo plano
+    (/health responde 503 hasta terminar) y, si CHECKPOINT_RETENTION_INTERVAL_S > 0, lanza la
+    retención periódica de checkpoints; al apagar, cierra el checkpointer asíncrono del
+    controlador y exporta las trazas pendientes.
+    """
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(
+            warm_up(warmup_state, get_default_chatbot_controller, settings.WARMUP_MESSAGE)
+        )
+    else:
+        warmup_state.ready = True
+    retention_task = None
+    if settings.CHECKPOINT_RETENTION_INTERVAL_S > 0:
+        retention_task = asyncio.create_task(retention_loop(
+            settings.DB_URI,
+            RetentionPolicy.from_settings(settings),
+            settings.CHECKPOINT_RETENTION_INTERVAL_S,
+        ))
+    yield
+    if retention_task is not None:
+        retention_task.cancel()
+        await asyncio.gather(retention_task, return_exceptions=True)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    if default_chatbot_controller_built():
+        await get_default_chatbot_controller().aclose()
+    TRACER.shutdown()
+
+
 # Creación de la app
 app = FastAPI(
     title="Colgate LLM API",
     description="API para interactuar con el modelo de lenguaje de Colgate utilizando FastAPI.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configuración de CORS desde settings
@@ -37,10 +89,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Control de admisión (backpressure) delante del router /api/v1; un lote ocupa un cupo por
+# cada turno que ejecuta a la vez
+admission_controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_S,
+)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    controller=admission_controller,
+    path_prefix="/api/v1",
+    weights={"/api/v1/send-messages": batch_weight(settings.BATCH_MAX_CONCURRENCY)},
+)
+
+# Métricas HTTP (se registra al final para medir también los rechazos por admisión)
+app.add_middleware(RequestMetricsMiddleware)
+
+# Traza raíz por solicitud (más externo: cubre admisión, métricas y la ruta)
+app.add_middleware(
+    RequestTracingMiddleware, tracer=TRACER, force_header=settings.TRACE_FORCE_HEADER
+)
+
 # Inclusión de routers
 app.include_router(router, prefix="/api/v1")
 
 
+ADMISSION_STATE = REGISTRY.register(Gauge(
+    "chatbot_admission_state", "Estado del control de admisión.", ("field",)
+))
+ADMISSION_STATE.set_function(lambda: {
+    ("in_flight",): admission_controller.in_flight,
+    ("queue_depth",): admission_controller.waiting,
+    ("admitted_total",): admission_controller.admitted_total,
+    ("rejected_queue_full_total",): admission_controller.rejected_total["queue_full"],
+    ("rejected_timeout_total",): admission_controller.rejected_total["timeout"],
+    ("wait_seconds_total",): admission_controller.wait_seconds_total,
+})
+
+
+def _semantic_cache_stats() -> dict:
+    """Estadísticas del caché semántico, o {} si el controlador no existe o el caché está apagado."""
+    if not default_chatbot_controller_built():
+        return {}
+    cache = get_default_chatbot_controller().semantic_cache
+    return cache.stats() if cache is not None else {}
+
+
+SEMANTIC_CACHE_STATE = REGISTRY.register(Gauge(
+    "chatbot_semantic_cache_state", "Tamaño, aciertos, fallos y tasa de aciertos del caché semántico.", ("field",)
+))
+SEMANTIC_CACHE_STATE.set_function(
+    lambda: {(field,): value for field, value in _semantic_cache_stats().items()}
+)
+
+CHECKPOINT_POOL_STATE = REGISTRY.register(Gauge(
+    "chatbot_checkpoint_pool_state",
+    "Conexiones en uso y libres, esperas y errores de los pools del checkpointer.",
+    ("pool", "field"),
+))
+CHECKPOINT_POOL_STATE.set_function(
+    lambda: {(pool, field): value for pool, stats in pool_stats().items() for field, value in stats.items()}
+)
+
+
 @app.get("/")
 async def root():
     """
@@ -53,12 +165,27 @@ async def root():
 async def health_check():
     """
     Endpoint de comprobación de salud para monitoreo.
+    Responde 503 mientras el calentamiento no termina, para que el balanceador solo
+    envíe tráfico a instancias listas.
     """
-    return {
-        "status": "ok",
+    body = {
+        "status": "ok" if warmup_state.ready else "warming_up",
         "version": app.version,
         "environment": settings.ENVIRONMENT,
+        "warmup": warmup_state.as_dict(),
+        "admission": admission_controller.stats(),
+        "semantic_cache": _semantic_cache_stats() or None,
+        "checkpoint_pools": pool_stats() or None,
     }
+    return JSONResponse(body, status_code=200 if warmup_state.ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Endpoint de métricas en formato de texto de Prometheus.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+"""
+Control de admisión para la API.
+Limita los turnos en ejecución, acota la cola de espera y rechaza con 429 + Retry-After
+cuando la instancia está saturada, en lugar de acumular solicitudes sin límite.
+Una solicitud ocupa un cupo por cada turno que puede ejecutar a la vez: un lote de
+/send-messages pesa min(len(items), max_concurrency).
+"""
+
+from time import monotonic
+import asyncio
+import json
+import math
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class AdmissionRejected(Exception):
+    """Solicitud rechazada por saturación (cola llena o tiempo de espera agotado)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Semáforo de turnos en vuelo con una cola de espera acotada y con timeout.
+    Cada solicitud ocupa tantos cupos como su peso (turnos que ejecuta a la vez).
+    Lleva contadores de profundidad de cola, tiempo de espera y rechazos.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        """
+        Args:
+            max_in_flight (int): Turnos ejecutándose a la vez.
+            max_queue (int): Turnos que pueden esperar cupo; las solicitudes que no caben se
+                rechazan.
+            queue_timeout (float): Segundos máximos de espera en cola antes de rechazar.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        # Una sola solicitud con peso > 1 junta cupos a la vez: dos lotes con cupos parciales
+        # no se bloquean entre sí
+        self._weighted_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = {"queue_full": 0, "timeout": 0}
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._service_seconds_avg = 1.0
+
+    async def acquire(self, weight: int = 1) -> float:
+        """
+        Espera los cupos de ejecución de una solicitud.
+
+        Args:
+            weight (int): Cupos que ocupa la solicitud (se acota a max_in_flight).
+
+        Returns:
+            float: Segundos que la solicitud esperó en cola.
+
+        Raises:
+            AdmissionRejected: Si la cola está llena o se agota el tiempo de espera.
+        """
+        weight = self._clamp(weight)
+        if self.in_flight + self.waiting + weight > self.max_in_flight + self.max_queue:
+            self.rejected_total["queue_full"] += 1
+            raise AdmissionRejected("queue_full", self._retry_after())
+
+        started = monotonic()
+        self.waiting += weight
+        try:
+            await asyncio.wait_for(self._acquire_slots(weight), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_total["timeout"] += 1
+            raise AdmissionRejected("timeout", self._retry_after())
+        finally:
+            self.waiting -= weight
+
+        waited = monotonic() - started
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.admitted_total += 1
+        self.in_flight += weight
+        return waited
+
+    async def _acquire_slots(self, weight: int) -> None:
+        if weight == 1:
+            await self._semaphore.acquire()
+            return
+        acquired = 0
+        try:
+            async with self._weighted_lock:
+                for _ in range(weight):
+                    await self._semaphore.acquire()
+                    acquired += 1
+        except BaseException:
+            # Timeout o cancelación: se devuelven los cupos ya tomados
+            for _ in range(acquired):
+                self._semaphore.release()
+            raise
+
+    def release(self, service_seconds: float, weight: int = 1) -> None:
+        """
+        Libera los cupos y actualiza la estimación del tiempo de servicio.
+
+        Args:
+            service_seconds (float): Duración de la solicitud que libera los cupos.
+            weight (int): Cupos con los que se admitió la solicitud.
+        """
+        weight = self._clamp(weight)
+        self.in_flight -= weight
+        for _ in range(weight):
+            self._semaphore.release()
+        self._service_seconds_avg = 0.9 * self._service_seconds_avg + 0.1 * service_seconds
+
+    def _clamp(self, weight: int) -> int:
+        return min(max(1, weight), self.max_in_flight)
+
+    def _retry_after(self) -> int:
+        """Estima en segundos cuándo habrá cupo, según la cola y el tiempo de servicio medio."""
+        estimate = self._service_seconds_avg * (self.waiting + 1) / self.max_in_flight
+        return min(60, max(1, math.ceil(estimate)))
+
+    def stats(self) -> dict:
+        """Devuelve el estado actual del control de admisión."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted_total,
+            "rejected_total": dict(self.rejected_total),
+            "wait_seconds_avg": self.wait_seconds_total / self.admitted_total if self.admitted_total else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+def batch_weight(default_concurrency: int):
+    """
+    Peso de una solicitud de lote (/send-messages): los turnos que ejecuta a la vez.
+
+    Args:
+        default_concurrency (int): Concurrencia del lote si no indica max_concurrency
+            (BATCH_MAX_CONCURRENCY).
+
+    Returns:
+        Callable[[bytes], int]: Función que recibe el cuerpo de la solicitud y retorna
+            min(len(items), max_concurrency). Un cuerpo inválido pesa 1 (la ruta lo rechaza).
+    """
+
+    def weigh(body: bytes) -> int:
+        try:
+            payload = json.loads(body)
+            concurrency = int(payload.get("max_concurrency") or default_concurrency)
+            return max(1, min(len(payload["items"]), concurrency))
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return 1
+
+    return weigh
+
+
+async def _buffer_body(receive: Receive) -> tuple[bytes, Receive]:
+    """Lee el cuerpo completo de la solicitud y retorna un receive que lo entrega de nuevo."""
+    messages, chunks = [], []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+
+    async def replay():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    return b"".join(chunks), replay
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI que aplica el AdmissionController a las rutas bajo path_prefix.
+    El cupo se mantiene hasta que la respuesta termina de enviarse (incluye streaming).
+    Las rutas de weights ocupan los cupos que su función de peso calcula sobre el cuerpo.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        path_prefix: str = "/api/v1",
+        weights: dict = None,
+    ):
+        """
+        Args:
+            app (ASGIApp): Aplicación envuelta.
+            controller (AdmissionController): Control de admisión compartido.
+            path_prefix (str): Prefijo de las rutas sujetas a admisión.
+            weights (dict, opcional): {ruta: función(cuerpo) -> cupos} para las rutas que
+                ejecutan varios turnos por solicitud (ver batch_weight).
+        """
+        self.app = app
+        self.controller = controller
+        self.path_prefix = path_prefix
+        self.weights = weights or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        weight = 1
+        weigh = self.weights.get(scope["path"])
+        if weigh is not None and scope["method"] == "POST":
+            body, receive = await _buffer_body(receive)
+            weight = weigh(body)
+
+        try:
+            await self.controller.acquire(weight)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": f"Servicio saturado ({e.reason}). Intenta de nuevo más tarde."},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(monotonic() - started, weight)
@@ -0,0 +1,44 @@
+"""
+Middleware ASGI que mide la duración de cada solicitud HTTP por ruta, método y estado.
+"""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.observability.metrics import HTTP_REQUEST_SECONDS
+
+
+class RequestMetricsMiddleware:
+    """
+    Registra chatbot_http_request_duration_seconds hasta que la respuesta termina de enviarse.
+    La etiqueta route usa la plantilla de la ruta para acotar la cardinalidad.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                perf_counter() - started,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=status,
+            )
@@ -0,0 +1,56 @@
+"""
+Middleware ASGI que abre la traza raíz de cada solicitud HTTP.
+"""
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.observability.tracing import Tracer
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+class RequestTracingMiddleware:
+    """
+    Inicia una traza por solicitud según el muestreo del tracer. Continúa la traza del
+    llamador si llega un encabezado traceparent y fuerza el muestreo con force_header.
+    Las respuestas muestreadas incluyen X-Trace-Id para ubicar la traza en el exportador.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer, force_header: str = "X-Force-Trace"):
+        self.app = app
+        self.tracer = tracer
+        self.force_header = force_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        force = headers.get(self.force_header, "").lower() in _TRUTHY
+        with self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            traceparent=headers.get("traceparent"),
+            force=force,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            if span.trace_id is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_trace_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [
+                        *message.get("headers", []), (b"x-trace-id", span.trace_id.encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
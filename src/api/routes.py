@@ -2,33 +2,62 @@
 Rutas API relacionadas con el LLM de Colgate.
 """
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+import json
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from src.controllers.chatbot_controller import ChatbotController, get_default_chatbot_controller
-from src.api.schemas import SendMessageResponse, SendMessageRequest, UpdateModelRequest, UpdateModelResponse
+from src.api.schemas import (
+    SendMessageRequest,
+    SendMessageResponse,
+    SendMessageResult,
+    SendMessagesRequest,
+    SendMessagesResponse,
+    UpdateModelRequest,
+    UpdateModelResponse,
+)
 from src.config.settings import settings
 
 router = APIRouter(tags=["Colgate Chatbot"])
 
 
+def _resolve_model(
+    chatbot_controller: ChatbotController, message_request: SendMessageRequest
+) -> Optional[str]:
+    """Modelo de la solicitud (campo model o tenant; None si no fija uno); 400 si no está disponible."""
+    try:
+        return chatbot_controller.resolve_model(message_request.model, message_request.tenant)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+
 @router.post("/send-message", response_model=SendMessageResponse)
 async def send_message(
     message_request: SendMessageRequest = Body(...),
+    idempotency_key: Optional[str] = Header(None, max_length=128),
     chatbot_controller: ChatbotController = Depends(get_default_chatbot_controller),
 ):
     """
     Endpoint para enviar un mensaje al agente de Colgate.
+    Los reintentos con la misma clave de idempotencia (campo del body, header
+    Idempotency-Key o message_id del proveedor) no vuelven a ejecutar el agente.
 
     Args:
         message_request (SendMessageRequest): Datos del mensaje a enviar.
+        idempotency_key (str, opcional): Header Idempotency-Key.
         chatbot_controller (ChatbotController): Controlador del chatbot inyectado.
 
     Returns:
         send_message_response (SendMessageResponse): Respuesta generada por el agente.
     """
+    model = _resolve_model(chatbot_controller, message_request)
     try:
-        output_message = chatbot_controller.send_message(
+        output_message = await chatbot_controller.asend_message(
             messages=[{"role": "user", "content": message_request.message}],
             thread_id=message_request.cellphone,
+            idempotency_key=message_request.get_idempotency_key() or idempotency_key,
+            model=model,
         )
         return SendMessageResponse(output=output_message)
 
@@ -38,6 +67,104 @@ async def send_message(
         )
 
 
+def _format_sse(event: str, data: dict) -> str:
+    """Serializa un evento en formato Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/send-message/stream")
+async def send_message_stream(
+    message_request: SendMessageRequest = Body(...),
+    mode: Literal["tokens", "messages"] = Query(
+        "tokens", description="'tokens' para deltas de texto, 'messages' para mensajes completos"
+    ),
+    chatbot_controller: ChatbotController = Depends(get_default_chatbot_controller),
+):
+    """
+    Endpoint para enviar un mensaje al agente de Colgate recibiendo la respuesta como
+    Server-Sent Events (tool_start, tool_end, token/message y done).
+
+    Args:
+        message_request (SendMessageRequest): Datos del mensaje a enviar.
+        mode (str): Granularidad del streaming.
+        chatbot_controller (ChatbotController): Controlador del chatbot inyectado.
+
+    Returns:
+        StreamingResponse: Flujo text/event-stream con los eventos del turno.
+    """
+    model = _resolve_model(chatbot_controller, message_request)
+
+    async def event_stream():
+        try:
+            async for event in chatbot_controller.astream_message(
+                messages=[{"role": "user", "content": message_request.message}],
+                thread_id=message_request.cellphone,
+                mode=mode,
+                model=model,
+            ):
+                yield _format_sse(event["event"], event["data"])
+        except Exception as e:
+            yield _format_sse(
+                "error", {"detail": f"Error al usar el agente de Colgate: {str(e)}"}
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/send-messages", response_model=SendMessagesResponse)
+async def send_messages(
+    batch_request: SendMessagesRequest = Body(...),
+    stream: bool = Query(False, description="Si es true, responde NDJSON a medida que termina cada mensaje"),
+    chatbot_controller: ChatbotController = Depends(get_default_chatbot_controller),
+):
+    """
+    Endpoint para enviar un lote de mensajes al agente de Colgate con concurrencia acotada.
+    Los errores se reportan por mensaje sin abortar el lote.
+
+    Args:
+        batch_request (SendMessagesRequest): Mensajes del lote y concurrencia máxima.
+        stream (bool): Si es true, entrega cada resultado como una línea NDJSON apenas termina.
+        chatbot_controller (ChatbotController): Controlador del chatbot inyectado.
+
+    Returns:
+        SendMessagesResponse | StreamingResponse: Resultados por mensaje.
+    """
+    items = batch_request.items
+    results = chatbot_controller.asend_messages(
+        conversations=[
+            (
+                [{"role": "user", "content": item.message}],
+                item.cellphone,
+                item.get_idempotency_key(),
+                item.model,
+                item.tenant,
+            )
+            for item in items
+        ],
+        max_concurrency=batch_request.max_concurrency or settings.BATCH_MAX_CONCURRENCY,
+    )
+
+    def to_result(index: int, output: str, error: str) -> SendMessageResult:
+        return SendMessageResult(
+            index=index, cellphone=items[index].cellphone, output=output, error=error
+        )
+
+    if stream:
+
+        async def ndjson_stream():
+            async for index, output, error in results:
+                yield to_result(index, output, error).model_dump_json() + "\n"
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    collected = [to_result(*result) async for result in results]
+    return SendMessagesResponse(results=sorted(collected, key=lambda r: r.index))
+
+
 @router.put("/update-model", response_model=UpdateModelResponse)
 async def update_model(
     update_request: UpdateModelRequest = Body(...),
@@ -73,9 +200,10 @@ async def update_model(
 
     try:
         # Actualizar configuración del modelo
-        chatbot_controller.update_model_config(
+        await chatbot_controller.aupdate_model_config(
             temperature=update_request.temperature,
-            max_tokens=update_request.max_tokens
+            max_tokens=update_request.max_tokens,
+            model=update_request.model,
         )
 
         return UpdateModelResponse(
@@ -2,7 +2,7 @@
 Schemas para las solicitudes y respuestas del API relacionadas con el agente de Colgate.
 """
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -21,6 +21,35 @@ class SendMessageRequest(BaseModel):
         max_length=10,
         pattern="^\d{1,10}$",
     )
+    idempotency_key: Optional[str] = Field(
+        None,
+        description="Clave para deduplicar reintentos del mismo mensaje",
+        max_length=128,
+        example="wamid.HBgMNTczMDAxMjM0NTY3FQIAEhgUM0E",
+    )
+    message_id: Optional[str] = Field(
+        None,
+        description="ID del mensaje en el proveedor (p. ej. WhatsApp); se usa como clave si no hay idempotency_key",
+        max_length=128,
+        example="wamid.HBgMNTczMDAxMjM0NTY3FQIAEhgUM0E",
+    )
+
+    model: Optional[str] = Field(
+        None,
+        description="Modelo de config/models.yaml que atiende el mensaje (por defecto, el del tenant o el modelo por defecto)",
+        max_length=128,
+        example="qwen3:1.7b",
+    )
+    tenant: Optional[str] = Field(
+        None,
+        description="Tenant de la solicitud; selecciona el modelo asignado en config/models.yaml",
+        max_length=64,
+        example="tienda-demo",
+    )
+
+    def get_idempotency_key(self) -> Optional[str]:
+        """Retorna la clave de idempotencia explícita o la derivada del ID del proveedor."""
+        return self.idempotency_key or self.message_id
 
 
 class SendMessageResponse(BaseModel):
@@ -35,6 +64,47 @@ class SendMessageResponse(BaseModel):
     )
 
 
+class SendMessagesRequest(BaseModel):
+    """
+    Schema para enviar un lote de mensajes al agente de Colgate.
+    """
+
+    items: List[SendMessageRequest] = Field(
+        ...,
+        description="Mensajes a enviar; cada uno se procesa como un turno independiente",
+        min_length=1,
+        max_length=1000,
+    )
+    max_concurrency: Optional[int] = Field(
+        None,
+        description="Número máximo de turnos ejecutándose a la vez (por defecto BATCH_MAX_CONCURRENCY)",
+        ge=1,
+        le=64,
+        example=8,
+    )
+
+
+class SendMessageResult(BaseModel):
+    """
+    Schema para el resultado de un mensaje dentro de un lote.
+    """
+
+    index: int = Field(..., description="Posición del mensaje en el lote", example=0)
+    cellphone: str = Field(..., description="Número de celular del remitente", example="1234567890")
+    output: Optional[str] = Field(
+        None, description="Respuesta generada por el agente", example="Hola, ¿en qué puedo ayudarte?"
+    )
+    error: Optional[str] = Field(None, description="Error al procesar el mensaje, si lo hubo")
+
+
+class SendMessagesResponse(BaseModel):
+    """
+    Schema para la respuesta de un lote de mensajes, ordenada por índice.
+    """
+
+    results: List[SendMessageResult] = Field(..., description="Resultado por cada mensaje del lote")
+
+
 class UpdateModelRequest(BaseModel):
     """
     Schema para actualizar la configuración del modelo.
@@ -59,6 +129,12 @@ class UpdateModelRequest(BaseModel):
         le=8192,
         example=1500
     )
+    model: Optional[str] = Field(
+        None,
+        description="Modelo a actualizar (por defecto, todos los modelos configurados)",
+        max_length=128,
+        example="gemini-2.5-flash"
+    )
 
 
 class UpdateModelResponse(BaseModel):
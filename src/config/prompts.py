@@ -135,4 +135,12 @@ PROMPTS["colgate_palmolive_system"] = (
 
 )
 
-                       
\ No newline at end of file
+                       
+PROMPTS["conversation_summary"] = (
+    "Resume la conversación entre un usuario y el asistente de Colgate-Palmolive para que el "
+    "asistente pueda continuarla sin el historial completo. Conserva los datos que el usuario "
+    "ya dio (nombre, productos, cantidades, tienda, correo), las respuestas y precios ya "
+    "entregados, las cotizaciones generadas o enviadas y las preguntas pendientes. Si hay un "
+    "resumen anterior, intégralo. Escribe en español, en texto plano y en tercera persona, "
+    "en máximo {max_words} palabras. Responde solo con el resumen."
+)
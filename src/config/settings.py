@@ -7,16 +7,120 @@ from pydantic_settings import BaseSettings
 
 class AppSettings(BaseSettings):
     LOG_LEVEL: str = "DEBUG"
+    ENVIRONMENT: str = "development"
     OLLAMA_API_URL: str = "http://localhost:11434"
+    MODELS_CONFIG_PATH: str = "./config/models.yaml"
     DEFAULT_COLLECTION: str = "colgate_palmolive_kb_gemini_full"
     VECTOR_DB_PATH: str = "./data/vector_db"
     GOOGLE_API_KEY: str
     DB_URI: str
-    
+
+    # Pool de conexiones del checkpointer (uno síncrono y uno asíncrono): tamaño, espera máxima
+    # por una conexión, vida máxima ociosa y total de cada conexión (segundos), verificación
+    # al tomarla del pool y tiempo máximo de reconexión si Postgres se reinicia
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT_S: float = 10.0
+    DB_POOL_MAX_IDLE_S: float = 300.0
+    DB_POOL_MAX_LIFETIME_S: float = 1800.0
+    DB_POOL_CHECK: bool = True
+    DB_POOL_RECONNECT_TIMEOUT_S: float = 300.0
+
+    # Retención de checkpoints: checkpoints conservados por conversación (0 = todos), días sin
+    # actividad tras los que se borra la conversación (0 = nunca), conversaciones por lote y
+    # pausa entre lotes; la API la ejecuta cada CHECKPOINT_RETENTION_INTERVAL_S segundos
+    # (0 = solo con make db-retention)
+    CHECKPOINT_KEEP_LAST: int = 20
+    CHECKPOINT_TTL_DAYS: float = 90.0
+    CHECKPOINT_RETENTION_BATCH: int = 500
+    CHECKPOINT_RETENTION_PAUSE_MS: int = 50
+    CHECKPOINT_RETENTION_INTERVAL_S: int = 0
+
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8001
     API_KEY: str
 
+    # Control de admisión de /api/v1: solicitudes en vuelo, cola de espera y timeout de cola
+    ADMISSION_MAX_IN_FLIGHT: int = 32
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_QUEUE_TIMEOUT_S: float = 5.0
+
+    # Idempotencia de /send-message: vida de un resultado y máximo de resultados guardados
+    IDEMPOTENCY_TTL_S: int = 900
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+
+    # Caché semántico de respuestas para preguntas sin contexto (opt-in)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1024
+    SEMANTIC_CACHE_TTL_S: int = 86400
+
+    # Concurrencia máxima por defecto del endpoint de envío por lotes
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # Ventana de agrupación de mensajes por cellphone (0 = desactivada)
+    COALESCE_WINDOW_MS: int = 0
+    COALESCE_MAX_WAIT_MS: int = 4000
+
+    # Calentamiento al arrancar la API: /health responde 503 hasta terminar.
+    # WARMUP_MESSAGE ejecuta un turno sintético (vacío = sin turno)
+    WARMUP_ENABLED: bool = True
+    WARMUP_MESSAGE: str = ""
+
+    # Presupuesto de tokens del historial enviado al modelo (sin el prompt de sistema) y
+    # caracteres por token de la estimación usada si tiktoken no está instalado
+    HISTORY_MAX_TOKENS: int = 3000
+    HISTORY_CHARS_PER_TOKEN: float = 4.0
+
+    # Compactación (opt-in): al terminar cada turno, los resultados de herramientas de turnos
+    # anteriores a los últimos TOOL_RESULT_KEEP_TURNS se reemplazan en el checkpoint por sus
+    # primeros TOOL_RESULT_MAX_CHARS caracteres más una referencia; el resto se pierde
+    TOOL_RESULT_COMPACTION_ENABLED: bool = False
+    TOOL_RESULT_MAX_CHARS: int = 300
+    TOOL_RESULT_KEEP_TURNS: int = 1
+
+    # Resumen acumulado de los turnos antiguos, escrito después de responder con el modelo de
+    # la sección summary de MODELS_CONFIG_PATH
+    SUMMARY_ENABLED: bool = False
+
+    # Respuestas deterministas de FAQ y precios sin invocar al LLM (opt-in), con la similitud
+    # mínima con una pregunta frecuente
+    FAST_PATH_ENABLED: bool = False
+    FAST_PATH_FAQ_THRESHOLD: float = 0.85
+
+    # Esquemas de herramientas enviados al modelo: solo las relevantes para el turno y con
+    # descripciones cortas en lugar de los docstrings (ambos opt-in)
+    TOOL_SELECTION_ENABLED: bool = False
+    TOOL_COMPACT_DESCRIPTIONS: bool = False
+
+    # Cotizaciones con quote_pipeline_tool (cálculo, PDF y correo en una sola llamada) en lugar
+    # de calculator_tool, pdf_quote_tool y email_quote_tool por separado (opt-in)
+    QUOTE_PIPELINE_ENABLED: bool = False
+
+    # Llamadas a herramientas de un mismo paso: máximo ejecutadas en paralelo (0 = sin límite)
+    # y máximo de ejecuciones simultáneas por herramienta en todo el proceso
+    TOOL_MAX_PARALLEL: int = 0
+    TOOL_CONCURRENCY_LIMITS: dict[str, int] = {
+        "email_quote_tool": 1, "pdf_quote_tool": 2, "quote_pipeline_tool": 2
+    }
+
+    # Enrutamiento por complejidad entre el modelo pequeño y el grande (sección router de
+    # MODELS_CONFIG_PATH); solo aplica a /send-message y /send-messages sin model ni tenant
+    ROUTER_ENABLED: bool = False
+
+    # Hedging de llamadas al modelo hacia el modelo secundario (sección hedging de
+    # MODELS_CONFIG_PATH); solo en invocaciones asíncronas sin streaming de tokens
+    HEDGING_ENABLED: bool = False
+
+    # Trazas por solicitud: exportador (none, console, jsonl, otlp), tasa de muestreo y
+    # encabezado que fuerza la traza de una solicitud
+    TRACE_EXPORTER: str = "console"
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_FORCE_HEADER: str = "X-Force-Trace"
+    TRACE_JSONL_PATH: str = "./logs/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_SERVICE_NAME: str = "colgate-llm-api"
+
     # SMTP Configuration for sending emails
     SMTP_SERVER: str
     SMTP_PORT: int
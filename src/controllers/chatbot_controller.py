@@ -3,32 +3,349 @@ Controlador para orquestar la interacción entre la vista y el modelo del chatbo
 Genera thread_id único por sesión y expone método para enviar mensajes.
 """
 
-from src.tools import get_tools
+import asyncio
+import contextvars
+import threading
+from time import perf_counter
+
+from src.tools import default_tool_names, get_tools
 from src.config.prompts import PROMPTS
 from src.models.chatbot_model import ChatbotModel
+from src.models.fast_path import FAST_PATH_MODEL, FastPath
+from src.models.hedging import HedgingPolicy
+from src.models.model_registry import get_model_registry
+from src.controllers.thread_locks import ThreadLockRegistry
+from src.controllers.message_coalescer import MessageCoalescer
+from src.controllers.model_router import ModelRouter, RoutingDecision
+from src.memory.conversation_summary import SummaryPolicy
+from src.memory.idempotency import IdempotencyStore
+from src.memory.semantic_cache import SemanticCache, is_context_free
+from src.retrieval.embeddings import get_embeddings
+from src.retrieval.kb_version import kb_fingerprint
+from src.config.settings import settings
+from src.config.logger import get_logger
+from src.observability.metrics import (
+    ROUTER_COST_USD,
+    ROUTER_DECISIONS,
+    ROUTER_FALLBACKS,
+    ROUTER_TURN_SECONDS,
+    SUMMARY_RUNS,
+)
+from src.observability.tracing import TRACER
 from src.memory.short_term_memory import generate_thread_id
 
-from functools import lru_cache
+logger = get_logger(__name__)
 
 
 class ChatbotController:
     def __init__(self, model_name: str, tools, thread_id: str = None, **model_kwargs):
         self.model = ChatbotModel(model_name, tools, **model_kwargs)
+        self.thread_locks = ThreadLockRegistry()
+        self.idempotency = IdempotencyStore(
+            ttl=settings.IDEMPOTENCY_TTL_S, max_entries=settings.IDEMPOTENCY_MAX_ENTRIES
+        )
+        self.semantic_cache = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                embeddings_factory=get_embeddings,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl=settings.SEMANTIC_CACHE_TTL_S,
+                fingerprint=kb_fingerprint,
+            )
+        self.coalescer = None
+        if settings.COALESCE_WINDOW_MS > 0:
+            self.coalescer = MessageCoalescer(
+                window=settings.COALESCE_WINDOW_MS / 1000,
+                max_wait=settings.COALESCE_MAX_WAIT_MS / 1000,
+            )
+        # Actualizaciones del resumen de conversación en curso, por thread_id
+        self._summary_tasks: dict[str, asyncio.Task] = {}
+        self.router = None
+        if settings.ROUTER_ENABLED:
+            self.router = ModelRouter.from_registry(self.model.registry)
+            if self.router is None:
+                logger.warning("ROUTER_ENABLED is set but the model registry has no router section")
+            elif self.router.small not in self.model.available_models():
+                logger.warning("Router disabled: small model %s is not available", self.router.small)
+                self.router = None
+
+    def resolve_model(self, model: str = None, tenant: str = None) -> str | None:
+        """
+        Modelo que atenderá una solicitud: el solicitado o el asignado al tenant.
+        Sin ninguno de los dos retorna None: el turno usa el modelo por defecto o, si el router
+        está activo, el que elija el router.
+
+        Args:
+            model (str, opcional): Modelo solicitado (nombre o 'proveedor:nombre').
+            tenant (str, opcional): Tenant de la solicitud.
+
+        Returns:
+            str | None: Nombre del modelo, o None si la solicitud no fija uno.
+
+        Raises:
+            ValueError: Si el modelo no está configurado o no está disponible.
+        """
+        if not model and tenant not in self.model.registry.tenants:
+            return None
+        name = self.model.registry.resolve(model, tenant)
+        if name not in self.model.available_models():
+            raise ValueError(f"Modelo no disponible: '{name}'")
+        return name
 
-    def send_message(self, messages: list, thread_id) -> str:
+    def send_message(self, messages: list, thread_id, model: str = None) -> str:
         """
         Envía mensajes al modelo usando el thread_id de la sesión.
 
         Args:
             messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            model (str, opcional): Modelo del registro a usar. Por defecto, el modelo por defecto.
+
+        Returns:
+            str: Respuesta generada por el agente.
+        """
+        return self.model.invoke(messages, thread_id=thread_id, model_name=model)
+
+    async def asend_message(
+        self,
+        messages: list,
+        thread_id,
+        coalesce: bool = True,
+        idempotency_key: str = None,
+        model: str = None,
+    ) -> str:
+        """
+        Versión asíncrona de send_message para uso desde el event loop de la API.
+        Los turnos de un mismo thread_id se ejecutan en orden de llegada. Si la agrupación
+        está activa (COALESCE_WINDOW_MS), los mensajes de usuario que llegan dentro de la
+        ventana se fusionan en un solo turno y todos reciben la misma respuesta.
+        Con idempotency_key, un reintento del mismo mensaje se une a la ejecución en curso
+        o recibe la respuesta ya almacenada sin volver a ejecutar el agente.
+
+        Args:
+            messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            thread_id: Identificador de la conversación.
+            coalesce (bool): Permite agrupar este mensaje con otros del mismo thread_id.
+            idempotency_key (str, opcional): Clave para deduplicar reintentos.
+            model (str, opcional): Modelo del registro a usar. Por defecto, el modelo por defecto.
 
         Returns:
             str: Respuesta generada por el agente.
         """
-        return self.model.invoke(messages, thread_id=thread_id)
+        if thread_id is None:
+            thread_id = generate_thread_id()
+
+        if idempotency_key:
+            with TRACER.span("controller.idempotency", thread_id=thread_id):
+                return await self.idempotency.run(
+                    f"{thread_id}:{idempotency_key}",
+                    lambda: self.asend_message(messages, thread_id, coalesce=coalesce, model=model),
+                )
+
+        if coalesce and self.coalescer is not None and len(messages) == 1:
+            with TRACER.span("controller.coalesce", thread_id=thread_id):
+                return await self.coalescer.submit(
+                    thread_id,
+                    messages[0]["content"],
+                    lambda text: self._run_turn(
+                        [{"role": "user", "content": text}], thread_id, model
+                    ),
+                )
+        return await self._run_turn(messages, thread_id, model)
+
+    async def _run_turn(self, messages: list, thread_id: str, model: str = None) -> str:
+        """
+        Ejecuta un turno del agente con el lock de la conversación.
+        Si el caché semántico está activo y el mensaje es autocontenido, intenta responder
+        desde el caché (registrando el turno en el checkpoint) antes de invocar al agente.
+        Sin modelo explícito y con el router activo, el modelo lo elige el router.
+        """
+        with TRACER.span("controller.turn", thread_id=thread_id) as span:
+            text = messages[-1]["content"] if len(messages) == 1 else None
+            vector = None
+            if self.semantic_cache is not None and text and is_context_free(text):
+                with TRACER.span("semantic_cache.lookup") as lookup_span:
+                    try:
+                        answer, vector = await self.semantic_cache.alookup(text)
+                    except Exception as e:
+                        logger.warning("Semantic cache lookup failed: %s", e)
+                        answer = None
+                    lookup_span.set_attribute("hit", answer is not None)
+                if answer is not None:
+                    span.set_attribute("cache_hit", True)
+                    async with self.thread_locks.hold(thread_id):
+                        await self.model.aappend_turn(thread_id, text, answer)
+                    return answer
+
+            async with self.thread_locks.hold(thread_id):
+                if self.router is not None and model is None and text:
+                    answer = await self._routed_turn(messages, thread_id, text)
+                else:
+                    result = await self.model.ainvoke_turn(
+                        messages, thread_id=thread_id, model_name=model
+                    )
+                    if self.router is not None:
+                        self.router.record_turn(thread_id, result.used_tools)
+                    answer = result.output
+
+            if vector is not None:
+                self.semantic_cache.store(text, vector, answer)
+            self._schedule_summary(thread_id)
+            return answer
+
+    def _schedule_summary(self, thread_id: str) -> None:
+        """
+        Lanza en segundo plano la actualización del resumen de la conversación (ver
+        ChatbotModel.arefresh_summary), sin esperar su resultado. Si ya hay una en curso para
+        la conversación no se lanza otra: los mensajes pendientes quedan para el próximo turno.
+        """
+        if self.model.summary is None or thread_id in self._summary_tasks:
+            return
+        # Contexto vacío: la actualización no forma parte de la traza del turno que la lanzó
+        task = asyncio.create_task(self._refresh_summary(thread_id), context=contextvars.Context())
+        self._summary_tasks[thread_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(thread_id, None))
+
+    async def _refresh_summary(self, thread_id: str) -> None:
+        try:
+            await self.model.arefresh_summary(thread_id, lock=lambda: self.thread_locks.hold(thread_id))
+        except Exception as e:
+            SUMMARY_RUNS.inc(outcome="error")
+            logger.warning("Summary update failed for thread %s: %s", thread_id, e)
+
+    async def _routed_turn(self, messages: list, thread_id: str, text: str) -> str:
+        """
+        Turno con el modelo elegido por el router. Si el modelo pequeño falla o responde con
+        poca confianza, el turno se repite con el modelo grande desde el checkpoint de entrada,
+        de modo que solo la respuesta del modelo grande queda en el historial.
+        Registra la decisión, la latencia y el ahorro estimado frente al modelo grande.
+        """
+        router = self.router
+        started = perf_counter()
+        with TRACER.span("router.turn", thread_id=thread_id) as span:
+            decision = router.route(text, thread_id)
+            span.set_attribute("route", decision.route)
+            span.set_attribute("reason", decision.reason)
+            ROUTER_DECISIONS.inc(route=decision.route, reason=decision.reason)
+
+            result, fallback, cost = None, None, 0.0
+            try:
+                result = await self.model.ainvoke_turn(
+                    messages, thread_id=thread_id, model_name=decision.model
+                )
+                cost = router.cost(result.model_name, result.input_tokens, result.output_tokens)
+                if decision.route == "small" and result.model_name != FAST_PATH_MODEL:
+                    fallback = router.low_confidence_reason(result.output)
+            except Exception as e:
+                if decision.route != "small":
+                    raise
+                # El checkpoint de entrada ya se escribió al iniciar el turno
+                logger.warning("Small model %s failed, falling back: %s", decision.model, e)
+                fallback = "error"
+
+            if fallback:
+                span.set_attribute("fallback", fallback)
+                ROUTER_FALLBACKS.inc(reason=fallback)
+                result = await self.model.arerun_turn(thread_id, router.large)
+                cost += router.cost(result.model_name, result.input_tokens, result.output_tokens)
+
+            baseline = router.cost(router.large, result.input_tokens, result.output_tokens)
+            seconds = perf_counter() - started
+            ROUTER_COST_USD.inc(cost, kind="actual")
+            ROUTER_COST_USD.inc(baseline, kind="baseline")
+            ROUTER_TURN_SECONDS.observe(seconds, route=decision.route, fallback=fallback or "none")
+            router.record_turn(thread_id, result.used_tools)
+            self._log_routing(thread_id, decision, result.model_name, fallback, seconds, baseline - cost)
+            return result.output
+
+    @staticmethod
+    def _log_routing(
+        thread_id: str,
+        decision: RoutingDecision,
+        answered_by: str,
+        fallback: str,
+        seconds: float,
+        saved: float,
+    ) -> None:
+        logger.info(
+            "Routing thread=%s route=%s reason=%s model=%s answered_by=%s fallback=%s "
+            "seconds=%.3f saved_usd=%.6f features=%s",
+            thread_id, decision.route, decision.reason, decision.model, answered_by, fallback,
+            seconds, saved, decision.features,
+        )
+
+    async def asend_messages(self, conversations: list, max_concurrency: int):
+        """
+        Envía varios turnos de forma concurrente, con un máximo de max_concurrency turnos
+        en ejecución simultánea. Los resultados se entregan a medida que terminan.
+
+        Args:
+            conversations (list): Lista de tuplas (messages, thread_id, idempotency_key, model,
+                tenant). El modelo se resuelve por turno (ver resolve_model): un modelo o
+                tenant no disponible se reporta como error de ese turno.
+            max_concurrency (int): Número máximo de turnos ejecutándose a la vez.
+
+        Yields:
+            tuple: (índice, respuesta o None, error o None) por cada turno.
+        """
+
+        async def run(index: int, messages: list, thread_id, idempotency_key, model=None, tenant=None):
+            try:
+                output = await self.asend_message(
+                    messages,
+                    thread_id,
+                    coalesce=False,
+                    idempotency_key=idempotency_key,
+                    model=self.resolve_model(model, tenant),
+                )
+                return index, output, None
+            except Exception as e:
+                return index, None, str(e)
+
+        pending = set()
+        try:
+            for index, conversation in enumerate(conversations):
+                pending.add(asyncio.create_task(run(index, *conversation)))
+                if len(pending) < max_concurrency:
+                    continue
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream_message(
+        self, messages: list, thread_id, mode: str = "tokens", model: str = None
+    ):
+        """
+        Envía mensajes al modelo en modo streaming.
+        El lock de la conversación se mantiene hasta que el stream termina o se cierra.
+
+        Args:
+            messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            thread_id: Identificador de la conversación.
+            mode (str): "tokens" para deltas de texto o "messages" para mensajes completos.
+            model (str, opcional): Modelo del registro a usar. Por defecto, el modelo por defecto.
+
+        Yields:
+            dict: Eventos del turno (ver ChatbotModel.astream).
+        """
+        if thread_id is None:
+            thread_id = generate_thread_id()
+        async with self.thread_locks.hold(thread_id):
+            async for event in self.model.astream(
+                messages, thread_id=thread_id, mode=mode, model_name=model
+            ):
+                yield event
+        self._schedule_summary(thread_id)
 
     def update_model_config(
-        self, temperature: float = None, max_tokens: int = None
+        self, temperature: float = None, max_tokens: int = None, model: str = None
     ) -> None:
         """
         Actualiza la configuración del modelo sin reiniciar la sesión.
@@ -36,24 +353,98 @@ class ChatbotController:
         Args:
             temperature (float, opcional): Nueva temperatura del modelo.
             max_tokens (int, opcional): Nuevo límite de tokens.
+            model (str, opcional): Modelo a actualizar. Por defecto, todos.
 
         Raises:
             ValueError: Si los parámetros están fuera de los rangos válidos.
         """
-        self.model.update_model_config(temperature=temperature, max_tokens=max_tokens)
+        self.model.update_model_config(
+            temperature=temperature, max_tokens=max_tokens, model_name=model
+        )
+
+    async def aupdate_model_config(
+        self, temperature: float = None, max_tokens: int = None, model: str = None
+    ) -> None:
+        """
+        Versión asíncrona de update_model_config para la API: el nuevo agente se compila
+        fuera del event loop y se publica con un cambio atómico.
+
+        Args:
+            temperature (float, opcional): Nueva temperatura del modelo.
+            max_tokens (int, opcional): Nuevo límite de tokens.
+            model (str, opcional): Modelo a actualizar. Por defecto, todos.
+
+        Raises:
+            ValueError: Si los parámetros están fuera de los rangos válidos.
+        """
+        await self.model.aupdate_model_config(
+            temperature=temperature, max_tokens=max_tokens, model_name=model
+        )
+
+    async def aclose(self) -> None:
+        """Cancela los resúmenes en curso y libera los recursos asíncronos del modelo (checkpointer)."""
+        tasks = list(self._summary_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.model.aclose()
+
+
+# Controlador por defecto del proceso. Se construye una sola vez bajo el lock: el
+# calentamiento lo construye en un hilo mientras las primeras solicitudes pueden pedirlo desde
+# el threadpool de FastAPI, y cada construcción abre su propio pool de conexiones
+_DEFAULT_CONTROLLER = None
+_default_controller_lock = threading.Lock()
 
 
-@lru_cache(maxsize=32)
 def get_default_chatbot_controller() -> ChatbotController:
     """
-    Proveedor de dependencia para ChatbotController con caching.
+    Proveedor de dependencia para ChatbotController, compartido por todo el proceso.
+    Compila un agente por cada modelo de config/models.yaml (MODELS_CONFIG_PATH), con
+    hedging hacia el modelo secundario de la sección hedging si HEDGING_ENABLED está activo y
+    respuestas deterministas de FAQ y precios si FAST_PATH_ENABLED está activo.
 
     Returns:
         ChatbotController: Instancia del controlador del chatbot.
     """
+    global _DEFAULT_CONTROLLER
+    if _DEFAULT_CONTROLLER is None:
+        with _default_controller_lock:
+            if _DEFAULT_CONTROLLER is None:
+                _DEFAULT_CONTROLLER = _build_default_chatbot_controller()
+    return _DEFAULT_CONTROLLER
+
+
+def default_chatbot_controller_built() -> bool:
+    """Indica si el controlador por defecto ya existe, sin construirlo."""
+    return _DEFAULT_CONTROLLER is not None
+
+
+def _build_default_chatbot_controller() -> ChatbotController:
+    registry = get_model_registry()
     return ChatbotController(
-        model_name="google_genai:gemini-2.5-flash",
-        tools=get_tools(),
+        model_name=registry.default.name,
+        registry=registry,
+        hedging=HedgingPolicy.from_registry(registry) if settings.HEDGING_ENABLED else None,
+        fast_path=(
+            FastPath(faq_threshold=settings.FAST_PATH_FAQ_THRESHOLD)
+            if settings.FAST_PATH_ENABLED
+            else None
+        ),
+        tools=get_tools(
+            default_tool_names(settings.QUOTE_PIPELINE_ENABLED),
+            compact=settings.TOOL_COMPACT_DESCRIPTIONS,
+        ),
+        tool_selection=settings.TOOL_SELECTION_ENABLED,
+        tool_limits=settings.TOOL_CONCURRENCY_LIMITS,
+        max_parallel_tools=settings.TOOL_MAX_PARALLEL or None,
+        history_max_tokens=settings.HISTORY_MAX_TOKENS,
+        history_chars_per_token=settings.HISTORY_CHARS_PER_TOKEN,
+        summary=SummaryPolicy.from_registry(registry) if settings.SUMMARY_ENABLED else None,
+        tool_result_max_chars=(
+            settings.TOOL_RESULT_MAX_CHARS if settings.TOOL_RESULT_COMPACTION_ENABLED else None
+        ),
+        tool_result_keep_turns=settings.TOOL_RESULT_KEEP_TURNS,
         temperature=0.1,
         max_tokens=1000,
         system_prompt=PROMPTS["colgate_palmolive_system"],
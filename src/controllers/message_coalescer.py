@@ -0,0 +1,95 @@
+"""
+Agrupación (debounce) de mensajes consecutivos de un mismo remitente.
+Los mensajes que llegan dentro de la ventana se fusionan en un único turno del agente
+y todas las solicitudes en espera reciben la misma respuesta.
+"""
+
+from time import monotonic
+from typing import Awaitable, Callable
+import asyncio
+
+
+class _PendingBatch:
+    """Mensajes acumulados de un remitente y el futuro con la respuesta del turno."""
+
+    __slots__ = ("texts", "future", "started_at", "last_at")
+
+    def __init__(self, future: asyncio.Future):
+        self.texts: list[str] = []
+        self.future = future
+        self.started_at = monotonic()
+        self.last_at = self.started_at
+
+
+class MessageCoalescer:
+    """
+    Ventana de debounce por clave (cellphone/thread_id).
+    Cada mensaje nuevo extiende la ventana, hasta un máximo de max_wait segundos desde
+    el primer mensaje del grupo, para acotar la latencia añadida.
+    """
+
+    def __init__(self, window: float, max_wait: float):
+        """
+        Args:
+            window (float): Segundos de silencio tras el último mensaje antes de ejecutar el turno.
+            max_wait (float): Segundos máximos de espera desde el primer mensaje del grupo.
+        """
+        self.window = window
+        self.max_wait = max(max_wait, window)
+        self._batches: dict[str, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self, key: str, text: str, run: Callable[[str], Awaitable[str]]
+    ) -> str:
+        """
+        Agrega un mensaje al grupo de la clave y espera la respuesta del turno fusionado.
+
+        Args:
+            key (str): Clave de agrupación (normalmente el thread_id).
+            text (str): Texto del mensaje.
+            run (Callable): Corrutina que ejecuta el turno con el texto fusionado.
+
+        Returns:
+            str: Respuesta del turno que incluyó este mensaje.
+        """
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _PendingBatch(asyncio.get_running_loop().create_future())
+            task = asyncio.create_task(self._flush_when_idle(key, batch, run))
+            self._tasks.add(task)
+            task.add_done_callback(lambda task: self._flush_done(key, batch, task))
+        batch.texts.append(text)
+        batch.last_at = monotonic()
+        # shield: si un cliente se desconecta, el turno sigue para los demás en espera
+        return await asyncio.shield(batch.future)
+
+    async def _flush_when_idle(
+        self, key: str, batch: _PendingBatch, run: Callable[[str], Awaitable[str]]
+    ) -> None:
+        """Espera a que la ventana se cierre y ejecuta el turno con los mensajes fusionados."""
+        while True:
+            deadline = min(batch.last_at + self.window, batch.started_at + self.max_wait)
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
+
+        # Los mensajes que lleguen desde aquí abren un grupo nuevo
+        del self._batches[key]
+        try:
+            batch.future.set_result(await run("\n".join(batch.texts)))
+        except Exception as e:
+            batch.future.set_exception(e)
+
+    def _flush_done(self, key: str, batch: _PendingBatch, task: asyncio.Task) -> None:
+        """
+        Al terminar la tarea del grupo: si se canceló (p. ej. al apagar, incluso antes de
+        empezar), cancela el futuro para que las solicitudes en espera no queden bloqueadas y
+        retira el grupo para que los mensajes nuevos abran otro.
+        """
+        self._tasks.discard(task)
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        if not batch.future.done():
+            batch.future.cancel()
@@ -0,0 +1,195 @@
+"""
+Enrutamiento por complejidad entre un modelo pequeño (local) y el modelo grande.
+Clasifica cada mensaje con características baratas (longitud, coincidencias con las preguntas
+frecuentes y los nombres de productos, marcadores de tareas complejas y si el turno anterior
+usó herramientas) y envía los mensajes simples al modelo pequeño. Si la respuesta del modelo
+pequeño parece poco confiable, el turno se repite con el modelo grande.
+"""
+
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import re
+import threading
+
+from src.config.logger import get_logger
+from src.memory.semantic_cache import fold_text
+from src.models.model_registry import ModelRegistry
+from src.tools.qa_data import load_faqs, load_prices
+
+logger = get_logger(__name__)
+
+_GREETING = re.compile(
+    r"^(hola|buen[oa]s?( dias| tardes| noches)?|hey|saludos|gracias|muchas gracias|"
+    r"ok|listo|perfecto|chao|adios|hasta luego)( \w+)?$"
+)
+# Tareas que requieren herramientas encadenadas o razonamiento (cotizaciones, envíos, comparaciones)
+_COMPLEX_MARKERS = re.compile(
+    r"\b(cotiz\w*|pdf|correo|email|compar\w*|calcul\w*|recomiend\w*|diferencia\w*|"
+    r"mejor\w*|cual conviene|por que)\b"
+)
+# Respuestas del modelo pequeño que indican que no pudo resolver la pregunta
+_LOW_CONFIDENCE = re.compile(
+    r"(no (estoy segur[oa]|se|tengo (esa )?informacion|puedo ayudar|cuento con)|"
+    r"no tengo acceso|no encontre|lo siento|disculpa)"
+)
+_STOPWORDS = {
+    "para", "como", "cual", "cuales", "cuando", "donde", "quien", "que", "los", "las", "del",
+    "con", "por", "una", "uno", "son", "tiene", "tienen", "esta", "este", "sus", "mas",
+}
+
+
+def _keywords(text: str) -> set[str]:
+    return {word for word in fold_text(text).split() if len(word) > 3 and word not in _STOPWORDS}
+
+
+class RoutingDecision(NamedTuple):
+    """Modelo elegido para un turno, con el motivo y las características calculadas."""
+
+    model: str
+    route: str
+    reason: str
+    features: dict
+
+
+class ModelRouter:
+    """
+    Router de modelos configurado en la sección router de config/models.yaml.
+
+    Attributes:
+        small (str): Modelo pequeño para mensajes simples.
+        large (str): Modelo grande (por defecto, el modelo por defecto del registro).
+        max_words (int): Máximo de palabras de un mensaje simple.
+        min_keyword_hits (int): Mínimo de palabras en común con las FAQ o los productos.
+        min_answer_chars (int): Respuestas más cortas del modelo pequeño se repiten con el grande.
+    """
+
+    # Conversaciones cuyo último turno se recuerda (uso de herramientas)
+    MAX_THREADS = 10000
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        small: str,
+        large: str = None,
+        max_words: int = 20,
+        min_keyword_hits: int = 1,
+        min_answer_chars: int = 20,
+    ):
+        self.registry = registry
+        self.small = registry.get(small).name
+        self.large = registry.get(large).name if large else registry.default.name
+        self.max_words = max_words
+        self.min_keyword_hits = min_keyword_hits
+        self.min_answer_chars = min_answer_chars
+        self._vocabulary: Optional[set[str]] = None
+        self._vocabulary_source = None
+        self._last_turn_tools: OrderedDict[str, bool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_registry(cls, registry: ModelRegistry) -> Optional["ModelRouter"]:
+        """
+        Crea el router desde la sección router del registro.
+
+        Returns:
+            ModelRouter | None: Router configurado, o None si el registro no tiene sección router.
+        """
+        if not registry.router.get("small"):
+            return None
+        return cls(registry, **registry.router)
+
+    def _get_vocabulary(self) -> set[str]:
+        """Palabras clave de las preguntas frecuentes y los nombres de productos."""
+        faqs, prices = load_faqs(), load_prices()
+        # Los cargadores reutilizan el objeto mientras el archivo no cambie
+        if self._vocabulary is None or self._vocabulary_source != (id(faqs), id(prices)):
+            vocabulary = set()
+            for faq in faqs:
+                vocabulary |= _keywords(faq.get("pregunta", ""))
+            for product in prices.get("productos", []):
+                vocabulary |= _keywords(product.get("nombre", ""))
+                vocabulary |= _keywords(product.get("categoria", ""))
+            self._vocabulary = vocabulary
+            self._vocabulary_source = (id(faqs), id(prices))
+        return self._vocabulary
+
+    def features(self, text: str, thread_id: str) -> dict:
+        """
+        Características del mensaje usadas para decidir el modelo.
+
+        Args:
+            text (str): Mensaje del usuario.
+            thread_id (str): Identificador de la conversación.
+
+        Returns:
+            dict: words, keyword_hits, greeting, complex y previous_used_tools.
+        """
+        folded = fold_text(text)
+        try:
+            keyword_hits = len(_keywords(text) & self._get_vocabulary())
+        except (OSError, ValueError) as e:
+            logger.warning("Router vocabulary unavailable: %s", e)
+            keyword_hits = 0
+        return {
+            "words": len(folded.split()),
+            "keyword_hits": keyword_hits,
+            "greeting": _GREETING.match(folded) is not None,
+            "complex": _COMPLEX_MARKERS.search(folded) is not None or "@" in text,
+            "previous_used_tools": self._last_turn_tools.get(thread_id, False),
+        }
+
+    def route(self, text: str, thread_id: str) -> RoutingDecision:
+        """
+        Elige el modelo de un turno.
+
+        Args:
+            text (str): Mensaje del usuario.
+            thread_id (str): Identificador de la conversación.
+
+        Returns:
+            RoutingDecision: Modelo elegido y motivo.
+        """
+        features = self.features(text, thread_id)
+        if features["greeting"]:
+            return RoutingDecision(self.small, "small", "greeting", features)
+        if features["complex"]:
+            reason = "complex"
+        elif features["previous_used_tools"]:
+            reason = "previous_used_tools"
+        elif features["words"] > self.max_words:
+            reason = "long"
+        elif features["keyword_hits"] < self.min_keyword_hits:
+            reason = "no_keywords"
+        else:
+            return RoutingDecision(self.small, "small", "simple", features)
+        return RoutingDecision(self.large, "large", reason, features)
+
+    def low_confidence_reason(self, answer: str) -> Optional[str]:
+        """
+        Motivo por el que una respuesta del modelo pequeño se considera poco confiable.
+
+        Returns:
+            str | None: "empty", "short" o "uncertain"; None si la respuesta es aceptable.
+        """
+        folded = fold_text(answer or "")
+        if not folded:
+            return "empty"
+        if len(folded) < self.min_answer_chars:
+            return "short"
+        if _LOW_CONFIDENCE.search(folded):
+            return "uncertain"
+        return None
+
+    def record_turn(self, thread_id: str, used_tools: bool) -> None:
+        """Recuerda si el último turno de la conversación usó herramientas."""
+        with self._lock:
+            self._last_turn_tools[thread_id] = used_tools
+            self._last_turn_tools.move_to_end(thread_id)
+            while len(self._last_turn_tools) > self.MAX_THREADS:
+                self._last_turn_tools.popitem(last=False)
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Costo estimado (USD) de un turno con los precios del registro (0 fuera del registro)."""
+        if model not in self.registry:
+            return 0.0
+        return self.registry.get(model).cost(input_tokens, output_tokens)
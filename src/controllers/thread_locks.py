@@ -0,0 +1,58 @@
+"""
+Serialización de turnos por conversación.
+Provee locks asíncronos por thread_id para que los turnos de una misma conversación
+se ejecuten en orden, mientras conversaciones distintas corren en paralelo.
+"""
+
+from contextlib import asynccontextmanager
+import asyncio
+
+from src.observability.tracing import TRACER
+
+
+class _LockEntry:
+    """Lock de un thread_id junto con el número de turnos que lo usan o esperan."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ThreadLockRegistry:
+    """
+    Tabla de locks por thread_id.
+    Una entrada vive solo mientras algún turno la usa o la espera, de modo que la tabla
+    crece con las conversaciones activas y no con el total histórico de conversaciones.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _LockEntry] = {}
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str):
+        """
+        Adquiere el lock de la conversación; los turnos en espera se atienden en orden FIFO.
+
+        Args:
+            thread_id (str): Identificador de la conversación.
+        """
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            entry = self._entries[thread_id] = _LockEntry()
+        entry.users += 1
+        try:
+            with TRACER.span("thread_lock.wait", waiting_ahead=entry.users - 1):
+                await entry.lock.acquire()
+            try:
+                yield
+            finally:
+                entry.lock.release()
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._entries[thread_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
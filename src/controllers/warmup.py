@@ -0,0 +1,106 @@
+"""
+Calentamiento del proceso al arrancar la API.
+Construye de forma anticipada el controlador (modelo, checkpointers y agentes), carga los datos
+de FAQ y precios, abre el vector store y, opcionalmente, ejecuta un turno sintético, para que
+la primera solicitud real no pague el arranque en frío.
+"""
+
+import asyncio
+from time import perf_counter
+from typing import Callable
+
+from src.config.logger import get_logger
+from src.memory.short_term_memory import generate_thread_id
+from src.observability.metrics import EMBEDDING_CALLS
+from src.tools.qa_data import preload_qa_data
+
+logger = get_logger(__name__)
+
+
+class WarmupState:
+    """Estado del calentamiento: listo, en curso o fallido, con la duración de cada paso."""
+
+    def __init__(self):
+        self.ready = False
+        self.error = None
+        self.steps: dict[str, dict] = {}
+
+    def as_dict(self) -> dict:
+        return {"ready": self.ready, "error": self.error, "steps": self.steps}
+
+
+async def _step(state: WarmupState, name: str, coro, required: bool = True):
+    """Ejecuta un paso y registra su duración; los pasos opcionales solo registran el error."""
+    started = perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        state.steps[name] = {"ok": False, "seconds": round(perf_counter() - started, 3), "error": str(e)}
+        if required:
+            raise
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        return None
+    state.steps[name] = {"ok": True, "seconds": round(perf_counter() - started, 3)}
+    return result
+
+
+def _warm_vector_store() -> None:
+    from src.retrieval import retriever
+    from src.retrieval.vector_store import preload_vector_store
+
+    chroma = preload_vector_store(retriever.DEFAULT_COLLECTION, retriever.DEFAULT_PERSIST_DIR)
+    # Una consulta de embeddings abre la conexión con el proveedor
+    chroma.embeddings.embed_query("warm-up")
+    EMBEDDING_CALLS.inc(source="warmup")
+
+
+async def _synthetic_turn(model, message: str) -> None:
+    """
+    Ejecuta un turno en una conversación desechable y la borra del checkpointer, para que
+    los arranques no acumulen un historial compartido.
+    """
+    thread_id = f"warmup-{generate_thread_id()}"
+    try:
+        await model.ainvoke([{"role": "user", "content": message}], thread_id=thread_id)
+    finally:
+        await model.async_checkpointer.adelete_thread(thread_id)
+
+
+async def warm_up(
+    state: WarmupState,
+    controller_factory: Callable,
+    warmup_message: str = None,
+) -> None:
+    """
+    Calienta el proceso y marca state.ready al terminar.
+    La construcción del controlador es obligatoria; si falla, el proceso queda no listo.
+    Los datos, el vector store y el turno sintético son opcionales: un fallo se registra
+    en el estado pero no impide atender solicitudes.
+
+    Args:
+        state (WarmupState): Estado a actualizar.
+        controller_factory (Callable): Proveedor del controlador (get_default_chatbot_controller).
+        warmup_message (str, opcional): Mensaje del turno sintético; sin mensaje no se ejecuta.
+    """
+    started = perf_counter()
+    try:
+        # Modelo, conexión a Postgres, DDL del checkpointer y agente síncrono
+        controller = await _step(state, "controller", asyncio.to_thread(controller_factory))
+        # Checkpointer asíncrono y agente asíncrono dentro del event loop
+        await _step(state, "async_checkpointer", controller.model.asetup())
+        await _step(state, "qa_data", asyncio.to_thread(preload_qa_data), required=False)
+        await _step(state, "vector_store", asyncio.to_thread(_warm_vector_store), required=False)
+        if warmup_message:
+            await _step(
+                state,
+                "synthetic_turn",
+                _synthetic_turn(controller.model, warmup_message),
+                required=False,
+            )
+    except Exception as e:
+        state.error = str(e)
+        logger.exception("Warm-up failed; the instance stays not ready")
+        return
+
+    state.ready = True
+    logger.info("Warm-up finished in %.2fs: %s", perf_counter() - started, state.steps)
@@ -0,0 +1,356 @@
+"""
+Retención de los checkpoints de conversación en Postgres.
+LangGraph escribe un checkpoint por cada paso del agente y nunca los borra; con conversaciones
+identificadas por celular, las tablas crecen sin límite. La retención recorre las
+conversaciones en lotes (por thread_id, en orden) y, en una transacción corta por lote:
+
+- borra las conversaciones sin actividad en los últimos ttl_days días (checkpoints, escrituras
+  pendientes y blobs);
+- conserva los keep_last checkpoints más recientes de cada conversación y borra los anteriores
+  con sus escrituras pendientes. Los checkpoints desde la última entrada del usuario se
+  conservan siempre (arerun_turn repite el turno desde ella);
+- borra los blobs de canales que ningún checkpoint conservado referencia, solo si son
+  anteriores a la versión del último checkpoint (los de una escritura en curso son más nuevos).
+
+Cada lote fija lock_timeout: si choca con un turno en curso, el lote se omite y se reintenta en
+la siguiente ejecución. Un advisory lock evita que dos ejecuciones (varias réplicas de la API o
+la API y la CLI) corran a la vez.
+
+Uso:
+    python -m src.memory.checkpoint_retention
+    python -m src.memory.checkpoint_retention --dry-run --keep-last 10 --ttl-days 30
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import psycopg
+from psycopg import errors
+
+from src.config.logger import get_logger
+from src.observability.metrics import CHECKPOINT_RETENTION_ROWS, CHECKPOINT_RETENTION_RUNS
+
+logger = get_logger(__name__)
+
+# Clave del advisory lock de sesión que serializa las ejecuciones de la retención
+ADVISORY_LOCK_KEY = 7_310_245_001
+
+SELECT_THREADS_SQL = """
+SELECT thread_id FROM checkpoints
+WHERE thread_id > %(after)s
+GROUP BY thread_id
+ORDER BY thread_id
+LIMIT %(limit)s
+"""
+
+EXPIRE_THREADS_SQL = """
+WITH expired AS (
+    SELECT thread_id FROM checkpoints
+    WHERE thread_id = ANY(%(threads)s)
+    GROUP BY thread_id
+    HAVING max((checkpoint->>'ts')::timestamptz) < %(cutoff)s
+),
+writes AS (
+    DELETE FROM checkpoint_writes WHERE thread_id IN (SELECT thread_id FROM expired) RETURNING 1
+),
+blobs AS (
+    DELETE FROM checkpoint_blobs WHERE thread_id IN (SELECT thread_id FROM expired) RETURNING 1
+),
+removed AS (
+    DELETE FROM checkpoints WHERE thread_id IN (SELECT thread_id FROM expired) RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM expired) AS threads,
+    (SELECT count(*) FROM removed) AS checkpoints,
+    (SELECT count(*) FROM writes) AS writes,
+    (SELECT count(*) FROM blobs) AS blobs
+"""
+
+PRUNE_CHECKPOINTS_SQL = """
+WITH ranked AS (
+    SELECT
+        thread_id,
+        checkpoint_ns,
+        checkpoint_id,
+        row_number() OVER (
+            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+        ) AS position,
+        max(checkpoint_id) FILTER (WHERE metadata->>'source' = 'input') OVER (
+            PARTITION BY thread_id, checkpoint_ns
+        ) AS last_input
+    FROM checkpoints
+    WHERE thread_id = ANY(%(threads)s)
+),
+stale AS (
+    DELETE FROM checkpoints c
+    USING ranked r
+    WHERE c.thread_id = r.thread_id
+        AND c.checkpoint_ns = r.checkpoint_ns
+        AND c.checkpoint_id = r.checkpoint_id
+        AND r.position > %(keep_last)s
+        AND (r.last_input IS NULL OR r.checkpoint_id < r.last_input)
+    RETURNING c.thread_id, c.checkpoint_ns, c.checkpoint_id
+),
+writes AS (
+    DELETE FROM checkpoint_writes w
+    USING stale s
+    WHERE w.thread_id = s.thread_id
+        AND w.checkpoint_ns = s.checkpoint_ns
+        AND w.checkpoint_id = s.checkpoint_id
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM stale) AS checkpoints,
+    (SELECT count(*) FROM writes) AS writes
+"""
+
+# Las versiones de canal tienen ancho fijo ("{v:032}.{hash:016}"): se comparan como texto en
+# el collation "C"
+PRUNE_BLOBS_SQL = """
+WITH latest AS (
+    SELECT DISTINCT ON (thread_id, checkpoint_ns)
+        thread_id, checkpoint_ns, checkpoint->'channel_versions' AS versions
+    FROM checkpoints
+    WHERE thread_id = ANY(%(threads)s)
+    ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC
+)
+DELETE FROM checkpoint_blobs b
+USING latest l
+WHERE b.thread_id = l.thread_id
+    AND b.checkpoint_ns = l.checkpoint_ns
+    AND b.version COLLATE "C" < (l.versions->>b.channel) COLLATE "C"
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id
+            AND c.checkpoint_ns = b.checkpoint_ns
+            AND c.checkpoint->'channel_versions'->>b.channel = b.version
+    )
+"""
+
+
+class RetentionPolicy:
+    """
+    Configuración de la retención de checkpoints.
+
+    Attributes:
+        keep_last (int): Checkpoints más recientes conservados por conversación (0 = todos).
+        ttl_days (float): Días sin actividad tras los que se borra la conversación (0 = nunca).
+        batch_size (int): Conversaciones por lote (una transacción por lote).
+        pause_s (float): Pausa entre lotes, para no competir con los turnos en curso.
+        lock_timeout_ms (int): Espera máxima por un lock dentro de un lote.
+    """
+
+    def __init__(
+        self,
+        keep_last: int = 20,
+        ttl_days: float = 90.0,
+        batch_size: int = 500,
+        pause_s: float = 0.05,
+        lock_timeout_ms: int = 2000,
+    ):
+        if keep_last < 0 or ttl_days < 0:
+            raise ValueError("Retention keep_last and ttl_days must be non-negative")
+        if batch_size <= 0:
+            raise ValueError("Retention batch_size must be positive")
+        self.keep_last = keep_last
+        self.ttl_days = ttl_days
+        self.batch_size = batch_size
+        self.pause_s = pause_s
+        self.lock_timeout_ms = lock_timeout_ms
+
+    @classmethod
+    def from_settings(cls, settings) -> "RetentionPolicy":
+        """Crea la política desde las variables CHECKPOINT_* de AppSettings."""
+        return cls(
+            keep_last=settings.CHECKPOINT_KEEP_LAST,
+            ttl_days=settings.CHECKPOINT_TTL_DAYS,
+            batch_size=settings.CHECKPOINT_RETENTION_BATCH,
+            pause_s=settings.CHECKPOINT_RETENTION_PAUSE_MS / 1000,
+        )
+
+
+class RetentionReport:
+    """Resultado de una ejecución de la retención."""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.locked = False
+        self.batches = 0
+        self.skipped_batches = 0
+        self.threads_scanned = 0
+        self.threads_expired = 0
+        self.deleted = {"checkpoints": 0, "checkpoint_writes": 0, "checkpoint_blobs": 0}
+        self.seconds = 0.0
+
+    def add(self, table: str, reason: str, rows: int) -> None:
+        self.deleted[table] += rows
+        if rows and not self.dry_run:
+            CHECKPOINT_RETENTION_ROWS.inc(rows, table=table, reason=reason)
+
+    def as_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "locked": self.locked,
+            "batches": self.batches,
+            "skipped_batches": self.skipped_batches,
+            "threads_scanned": self.threads_scanned,
+            "threads_expired": self.threads_expired,
+            "deleted": dict(self.deleted),
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def _prune_batch(conn, threads: list[str], policy: RetentionPolicy, cutoff, dry_run: bool) -> tuple[int, list]:
+    """
+    Aplica la retención a un lote de conversaciones en una sola transacción.
+
+    Returns:
+        tuple: Conversaciones expiradas y filas borradas como (tabla, motivo, filas).
+    """
+    expired, deleted = 0, []
+    with conn.transaction(force_rollback=dry_run), conn.cursor() as cur:
+        cur.execute(f"SET LOCAL lock_timeout = {int(policy.lock_timeout_ms)}")
+        if cutoff is not None:
+            cur.execute(EXPIRE_THREADS_SQL, {"threads": threads, "cutoff": cutoff})
+            expired, checkpoints, writes, blobs = cur.fetchone()
+            deleted += [
+                ("checkpoints", "ttl", checkpoints),
+                ("checkpoint_writes", "ttl", writes),
+                ("checkpoint_blobs", "ttl", blobs),
+            ]
+        if policy.keep_last:
+            cur.execute(PRUNE_CHECKPOINTS_SQL, {"threads": threads, "keep_last": policy.keep_last})
+            checkpoints, writes = cur.fetchone()
+            cur.execute(PRUNE_BLOBS_SQL, {"threads": threads})
+            deleted += [
+                ("checkpoints", "keep_last", checkpoints),
+                ("checkpoint_writes", "keep_last", writes),
+                ("checkpoint_blobs", "keep_last", cur.rowcount),
+            ]
+    return expired, deleted
+
+
+def prune_checkpoints(
+    conn: psycopg.Connection,
+    policy: RetentionPolicy,
+    dry_run: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> RetentionReport:
+    """
+    Aplica la retención a todas las conversaciones, en lotes de policy.batch_size.
+
+    Args:
+        conn (psycopg.Connection): Conexión en modo autocommit (cada lote abre su transacción).
+        policy (RetentionPolicy): Política de retención.
+        dry_run (bool): Cuenta las filas que se borrarían y revierte cada lote.
+        stop (threading.Event, opcional): Detiene la ejecución entre lotes.
+
+    Returns:
+        RetentionReport: Lotes procesados y omitidos, conversaciones expiradas y filas borradas.
+    """
+    report = RetentionReport(dry_run)
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        if not cur.fetchone()[0]:
+            report.locked = True
+            CHECKPOINT_RETENTION_RUNS.inc(outcome="locked")
+            return report
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=policy.ttl_days) if policy.ttl_days else None
+    after = ""
+    try:
+        while stop is None or not stop.is_set():
+            threads = [row[0] for row in conn.execute(
+                SELECT_THREADS_SQL, {"after": after, "limit": policy.batch_size}
+            ).fetchall()]
+            if not threads:
+                break
+            after = threads[-1]
+            report.threads_scanned += len(threads)
+            try:
+                expired, deleted = _prune_batch(conn, threads, policy, cutoff, dry_run)
+            except errors.LockNotAvailable:
+                report.skipped_batches += 1
+                logger.debug("Checkpoint retention batch from %s skipped: lock timeout", threads[0])
+            else:
+                report.batches += 1
+                report.threads_expired += expired
+                for table, reason, rows in deleted:
+                    report.add(table, reason, rows)
+            if policy.pause_s:
+                time.sleep(policy.pause_s)
+    except Exception:
+        CHECKPOINT_RETENTION_RUNS.inc(outcome="error")
+        raise
+    finally:
+        conn.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+        report.seconds = time.perf_counter() - started
+    CHECKPOINT_RETENTION_RUNS.inc(outcome="ok")
+    logger.info("Checkpoint retention finished: %s", report.as_dict())
+    return report
+
+
+def run_retention(
+    conninfo: str,
+    policy: RetentionPolicy,
+    dry_run: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> RetentionReport:
+    """Abre una conexión propia (fuera del pool de los turnos) y aplica la retención."""
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        return prune_checkpoints(conn, policy, dry_run=dry_run, stop=stop)
+
+
+async def retention_loop(conninfo: str, policy: RetentionPolicy, interval_s: float) -> None:
+    """
+    Ejecuta la retención cada interval_s segundos en un hilo aparte, hasta que la tarea se
+    cancela; al cancelarse, la ejecución en curso termina después del lote actual.
+    """
+    stop = threading.Event()
+    try:
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                await asyncio.to_thread(run_retention, conninfo, policy, False, stop)
+            except Exception:
+                logger.exception("Checkpoint retention failed")
+    finally:
+        stop.set()
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from src.config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Retención de checkpoints de conversaciones")
+    parser.add_argument("--keep-last", type=int, default=settings.CHECKPOINT_KEEP_LAST,
+                        help="Checkpoints que se conservan por conversación (0 = todos)")
+    parser.add_argument("--ttl-days", type=float, default=settings.CHECKPOINT_TTL_DAYS,
+                        help="Días de inactividad tras los que se borra una conversación (0 = nunca)")
+    parser.add_argument("--batch", type=int, default=settings.CHECKPOINT_RETENTION_BATCH,
+                        help="Conversaciones por lote")
+    parser.add_argument("--pause-ms", type=int, default=settings.CHECKPOINT_RETENTION_PAUSE_MS,
+                        help="Pausa entre lotes (ms)")
+    parser.add_argument("--dry-run", action="store_true", help="Cuenta las filas sin borrarlas")
+    args = parser.parse_args()
+
+    policy = RetentionPolicy(
+        keep_last=args.keep_last,
+        ttl_days=args.ttl_days,
+        batch_size=args.batch,
+        pause_s=args.pause_ms / 1000,
+    )
+    report = run_retention(settings.DB_URI, policy, dry_run=args.dry_run)
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
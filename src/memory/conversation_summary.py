@@ -0,0 +1,100 @@
+"""
+Resumen acumulado de las conversaciones largas.
+Después de cada turno, fuera de la ruta de la respuesta, los turnos más antiguos del
+historial (los que quedan fuera de una fracción del presupuesto de tokens) se resumen con un
+modelo barato y se reemplazan en el estado del agente por ese resumen, que se agrega al prompt
+de sistema en los turnos siguientes. Cada resumen lleva una versión: un resumen que termina
+después de que otro ya se escribió se descarta.
+
+Formato de la sección del YAML de modelos:
+
+    summary:
+      model: qwen3:1.7b         # modelo del registro que escribe los resúmenes
+      target_ratio: 0.6         # fracción del presupuesto del historial que queda sin resumir
+      min_messages: 4           # mensajes a resumir necesarios para llamar al modelo
+      max_words: 150            # extensión máxima del resumen
+"""
+
+from typing import Optional
+
+from langchain.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.config.prompts import PROMPTS
+
+# Caracteres de un resultado de herramienta incluidos en la transcripción a resumir
+TOOL_RESULT_CHARS = 400
+
+
+class SummaryPolicy:
+    """
+    Configuración del resumen acumulado (sección summary del registro de modelos).
+
+    Attributes:
+        model (str): Modelo del registro que escribe los resúmenes.
+        target_ratio (float): Fracción del presupuesto del historial que queda sin resumir.
+        min_messages (int): Mensajes a resumir necesarios para llamar al modelo.
+        max_words (int): Extensión máxima del resumen.
+    """
+
+    def __init__(self, model: str, target_ratio: float = 0.6, min_messages: int = 4, max_words: int = 150):
+        if not 0 < target_ratio <= 1:
+            raise ValueError("Summary target_ratio must be in (0, 1]")
+        self.model = model
+        self.target_ratio = target_ratio
+        self.min_messages = min_messages
+        self.max_words = max_words
+
+    @classmethod
+    def from_registry(cls, registry) -> Optional["SummaryPolicy"]:
+        """
+        Crea la política desde la sección summary del registro de modelos.
+
+        Returns:
+            SummaryPolicy | None: Política configurada, o None si no hay modelo de resumen.
+        """
+        config = dict(registry.summary)
+        if not config.get("model"):
+            return None
+        config["model"] = registry.get(config["model"]).name
+        return cls(**config)
+
+
+def render_transcript(messages: list) -> str:
+    """Transcripción en texto de los mensajes a resumir (resultados de herramientas recortados)."""
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            lines.append(f"Usuario: {content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Herramienta {message.name or ''}: {content[:TOOL_RESULT_CHARS]}")
+        elif isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                lines.append(f"Asistente llama a {call['name']} con {call['args']}")
+            if content:
+                lines.append(f"Asistente: {content}")
+    return "\n".join(lines)
+
+
+async def asummarize(model, previous: str, messages: list, max_words: int) -> str:
+    """
+    Resume los mensajes junto con el resumen anterior.
+
+    Args:
+        model: Modelo de chat que escribe el resumen.
+        previous (str): Resumen anterior ("" si no hay).
+        messages (list): Mensajes que salen del historial.
+        max_words (int): Extensión máxima del resumen.
+
+    Returns:
+        str: Resumen actualizado.
+    """
+    prompt = PROMPTS["conversation_summary"].format(max_words=max_words)
+    transcript = render_transcript(messages)
+    if previous:
+        transcript = f"Resumen anterior:\n{previous}\n\nNuevos mensajes:\n{transcript}"
+    response = await model.ainvoke([SystemMessage(content=prompt), HumanMessage(content=transcript)])
+    content = response.content
+    if isinstance(content, list):
+        content = " ".join(item.get("text", "") for item in content if isinstance(item, dict))
+    return content.strip()
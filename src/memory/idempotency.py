@@ -0,0 +1,81 @@
+"""
+Almacén de resultados por clave de idempotencia con TTL.
+Permite que los reintentos de un mismo mensaje (p. ej. reintentos del webhook de WhatsApp)
+se unan a la ejecución en curso o reciban la respuesta ya calculada sin volver a invocar al LLM.
+"""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class IdempotencyStore:
+    """
+    Resultados recientes indexados por clave de idempotencia.
+    Las ejecuciones en curso nunca se expulsan; las terminadas expiran tras ttl segundos
+    y, si se supera max_entries, se descartan primero las más antiguas.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        """
+        Args:
+            ttl (float): Segundos que se conserva un resultado después de completarse.
+            max_entries (int): Número máximo de resultados terminados almacenados.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # clave -> (tarea, instante de expiración); las terminadas quedan en orden de finalización
+        self._entries: OrderedDict[str, tuple[asyncio.Task, float]] = OrderedDict()
+        self._completed = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta factory una sola vez por clave dentro del TTL. La ejecución corre en su
+        propia tarea: si el cliente original se desconecta, el reintento se une a ella.
+
+        Args:
+            key (str): Clave de idempotencia.
+            factory (Callable): Corrutina que produce el resultado.
+
+        Returns:
+            T: Resultado de la primera ejecución con esa clave.
+        """
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is None:
+            task = asyncio.create_task(factory())
+            self._entries[key] = (task, float("inf"))
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            task = entry[0]
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        """Guarda el resultado con su TTL o, si la ejecución falló, olvida la clave."""
+        if task.cancelled() or task.exception() is not None:
+            # Un fallo no se memoriza: el siguiente reintento vuelve a ejecutar
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (task, monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        self._completed += 1
+
+    def _evict(self) -> None:
+        """Descarta, desde las más antiguas, las entradas terminadas expiradas o en exceso."""
+        now = monotonic()
+        expired = []
+        for key, (task, expires_at) in self._entries.items():
+            if expires_at == float("inf"):
+                continue
+            if expires_at > now and self._completed - len(expired) <= self.max_entries:
+                break
+            expired.append(key)
+        for key in expired:
+            del self._entries[key]
+        self._completed -= len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,284 @@
+"""
+Caché semántico de respuestas para preguntas sin contexto conversacional.
+Reutiliza la respuesta de una pregunta anterior casi idéntica (similitud coseno de embeddings)
+para evitar una ejecución completa del agente.
+"""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Optional
+import asyncio
+import re
+import unicodedata
+
+from src.config.logger import get_logger
+from src.observability.metrics import EMBEDDING_CALLS
+
+logger = get_logger(__name__)
+
+# Marcadores de que el mensaje depende del historial o de datos personales del usuario
+_CONTEXT_MARKERS = re.compile(
+    r"\b(eso|esa|ese|esos|esas|esto|esta|este|estos|estas|ah[ií]|anterior|mism[oa]s?|"
+    r"tambi[eé]n|otr[oa]s?|m[aá]s barat[oa]s?|cu[aá]l de|cotiz\w*|correo|email|pdf|"
+    r"s[ií]|no|ok|dale|listo|gracias|mi|mis)\b",
+    re.IGNORECASE,
+)
+_PUNCTUATION = re.compile(r"[¿?¡!.,;:]")
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza un mensaje para comparación exacta (minúsculas, sin puntuación ni espacios extra)."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def fold_text(text: str) -> str:
+    """Normaliza un mensaje como normalize_text y además elimina las tildes."""
+    decomposed = unicodedata.normalize("NFKD", normalize_text(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def is_context_free(text: str) -> bool:
+    """
+    Clasifica si un mensaje puede responderse sin el historial de la conversación.
+
+    Args:
+        text (str): Mensaje del usuario.
+
+    Returns:
+        bool: True si el mensaje es autocontenido y apto para el caché.
+    """
+    normalized = normalize_text(text)
+    if len(normalized) < 3 or "@" in text or any(c.isdigit() for c in normalized):
+        return False
+    return _CONTEXT_MARKERS.search(normalized) is None
+
+
+class _CacheEntry:
+    """Pregunta cacheada con la fila de su embedding en la matriz del caché y su respuesta."""
+
+    __slots__ = ("question", "row", "answer", "expires_at")
+
+    def __init__(self, question: str, row: int, answer: str, expires_at: float):
+        self.question = question
+        self.row = row
+        self.answer = answer
+        self.expires_at = expires_at
+
+
+def _unit(vector):
+    # numpy se importa al usar el caché (langchain-chroma ya depende de él)
+    import numpy as np
+
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array)) or 1.0
+    return array / norm
+
+
+def _merge_fingerprint(previous: Optional[tuple], current: tuple) -> tuple[tuple, bool]:
+    """
+    Combina una lectura nueva de la huella con la anterior. Un componente None (p. ej. Chroma
+    no respondió) es desconocido: conserva el valor anterior y no cuenta como cambio.
+
+    Returns:
+        tuple: Huella combinada y si algún componente conocido cambió.
+    """
+    if previous is None:
+        return current, False
+    merged = tuple(old if new is None else new for old, new in zip(previous, current))
+    changed = any(old is not None and new is not None and old != new for old, new in zip(previous, current))
+    return merged, changed
+
+
+class SemanticCache:
+    """
+    Caché LRU con TTL de respuestas indexadas por embedding de la pregunta.
+    Los embeddings se guardan en una matriz (una fila por pregunta), de modo que la búsqueda
+    del vecino más cercano es un único producto matriz-vector.
+    Se vacía automáticamente cuando cambia la huella de la base de conocimiento; la huella se
+    lee en un hilo aparte, sin bloquear el event loop.
+    """
+
+    def __init__(
+        self,
+        embeddings_factory: Callable,
+        threshold: float,
+        max_entries: int,
+        ttl: float,
+        fingerprint: Callable[[], tuple],
+        fingerprint_check_interval: float = 5.0,
+    ):
+        """
+        Args:
+            embeddings_factory (Callable): Retorna la instancia de Embeddings (se crea al primer uso).
+            threshold (float): Similitud coseno mínima para considerar un acierto.
+            max_entries (int): Número máximo de preguntas almacenadas.
+            ttl (float): Segundos de vida de cada respuesta.
+            fingerprint (Callable): Retorna la versión actual de la base de conocimiento (función
+                bloqueante; los componentes None se tratan como desconocidos).
+            fingerprint_check_interval (float): Segundos entre verificaciones de la huella.
+        """
+        self._embeddings_factory = embeddings_factory
+        self._embeddings = None
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._fingerprint = fingerprint
+        # Se lee en la primera búsqueda
+        self._fingerprint_value: Optional[tuple] = None
+        self._fingerprint_check_interval = fingerprint_check_interval
+        self._fingerprint_checked_at = float("-inf")
+        self._fingerprint_task: Optional[asyncio.Task] = None
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        # Embeddings normalizados (fila por entrada), clave y expiración de cada fila
+        self._vectors = None
+        self._row_keys: list[Optional[str]] = []
+        self._expires = None
+        self._free_rows: list[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def alookup(self, text: str):
+        """
+        Busca una respuesta cacheada para una pregunta equivalente.
+
+        Args:
+            text (str): Mensaje del usuario.
+
+        Returns:
+            tuple: (respuesta o None, embedding del mensaje para guardarlo con store).
+        """
+        self._schedule_fingerprint_check()
+        now = monotonic()
+        key = normalize_text(text)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            return self._hit(key, entry), self._vectors[entry.row]
+
+        if self._embeddings is None:
+            self._embeddings = self._embeddings_factory()
+        vector = _unit(await self._embeddings.aembed_query(text))
+        EMBEDDING_CALLS.inc(source="semantic_cache")
+
+        best_key, best_score = self._nearest(vector, now)
+        if best_key is None:
+            self.misses += 1
+            return None, vector
+        logger.debug("Semantic cache hit (%.3f): %r ~ %r", best_score, text, best_key)
+        return self._hit(best_key, self._entries[best_key]), vector
+
+    def _nearest(self, vector, now: float) -> tuple[Optional[str], float]:
+        """Pregunta vigente más similar por encima del umbral (None si no hay)."""
+        if not self._entries or self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            return None, self.threshold
+        import numpy as np
+
+        rows = len(self._row_keys)
+        scores = self._vectors[:rows] @ vector
+        # Filas libres (expiración -inf) y entradas vencidas no cuentan
+        scores[self._expires[:rows] <= now] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None, self.threshold
+        return self._row_keys[best], float(scores[best])
+
+    def store(self, text: str, vector, answer: str) -> None:
+        """
+        Guarda la respuesta de una pregunta sin contexto.
+
+        Args:
+            text (str): Mensaje del usuario.
+            vector: Embedding normalizado devuelto por alookup.
+            answer (str): Respuesta generada por el agente.
+        """
+        import numpy as np
+
+        key = normalize_text(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        if self._vectors is not None and self._vectors.shape[1] != vector.shape[0]:
+            # Cambió el modelo de embeddings: los vectores anteriores no son comparables
+            self.clear()
+        entry = self._entries.get(key)
+        if entry is None:
+            row = self._allocate_row(vector.shape[0])
+            entry = self._entries[key] = _CacheEntry(key, row, answer, 0.0)
+            self._row_keys[row] = key
+        entry.answer = answer
+        entry.expires_at = monotonic() + self.ttl
+        self._vectors[entry.row] = vector
+        self._expires[entry.row] = entry.expires_at
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._release_row(evicted.row)
+
+    def _allocate_row(self, dim: int) -> int:
+        import numpy as np
+
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = len(self._row_keys)
+        if self._vectors is None or row >= self._vectors.shape[0]:
+            # La matriz crece al doble, hasta max_entries (+1 por la entrada que se expulsa)
+            capacity = min(max(16, 2 * row), self.max_entries + 1)
+            vectors = np.zeros((capacity, dim), dtype=np.float32)
+            expires = np.full(capacity, -np.inf)
+            if self._vectors is not None:
+                vectors[:row] = self._vectors[:row]
+                expires[:row] = self._expires[:row]
+            self._vectors, self._expires = vectors, expires
+        self._row_keys.append(None)
+        return row
+
+    def _release_row(self, row: int) -> None:
+        self._row_keys[row] = None
+        self._expires[row] = float("-inf")
+        self._free_rows.append(row)
+
+    def clear(self) -> None:
+        """Vacía el caché."""
+        self._entries.clear()
+        self._vectors = None
+        self._expires = None
+        self._row_keys = []
+        self._free_rows = []
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Devuelve tamaño, aciertos, fallos, tasa de aciertos e invalidaciones."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _hit(self, key: str, entry: _CacheEntry) -> str:
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.answer
+
+    def _schedule_fingerprint_check(self) -> None:
+        """Lanza la verificación de la huella en segundo plano si pasó el intervalo."""
+        now = monotonic()
+        if now - self._fingerprint_checked_at < self._fingerprint_check_interval:
+            return
+        if self._fingerprint_task is not None and not self._fingerprint_task.done():
+            return
+        self._fingerprint_checked_at = now
+        self._fingerprint_task = asyncio.create_task(self.acheck_fingerprint())
+
+    async def acheck_fingerprint(self) -> None:
+        """Invalida el caché si la base de conocimiento cambió desde la última verificación."""
+        try:
+            current = await asyncio.to_thread(self._fingerprint)
+        except Exception as e:
+            logger.warning("Knowledge base fingerprint check failed: %s", e)
+            return
+        self._fingerprint_value, changed = _merge_fingerprint(self._fingerprint_value, current)
+        if changed:
+            logger.info("Knowledge base changed, clearing semantic cache (%d entries)", len(self._entries))
+            self.clear()
@@ -1,17 +1,170 @@
 """
 Utilidades para la gestión de memoria a corto plazo con checkpointer Postgres y generación de thread_id único.
+Los checkpointers usan un pool de conexiones (ver create_checkpointer_context): cada lectura o
+escritura toma una conexión del pool, de modo que los turnos concurrentes no comparten un socket.
 """
 
+from contextlib import asynccontextmanager, contextmanager, nullcontext
 import uuid
 
 from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
+from src.config.logger import get_logger
 from src.config.settings import settings
+from src.observability.metrics import CHECKPOINT_SECONDS
+from src.observability.tracing import TRACER
 
+logger = get_logger(__name__)
 
+# Pools abiertos por nombre, para /metrics y /health
+_POOLS: dict[str, ConnectionPool | AsyncConnectionPool] = {}
+
+
+@contextmanager
+def _observe(op: str):
+    """Mide la operación del checkpointer como métrica y como span de la traza activa."""
+    with TRACER.span(f"checkpoint.{op}"), CHECKPOINT_SECONDS.time(op=op):
+        yield
+
+
+class TimedPostgresSaver(PostgresSaver):
+    """PostgresSaver que registra latencia y spans de lecturas y escrituras de checkpoints."""
+
+    def __init__(self, conn, pipe=None, serde=None):
+        super().__init__(conn, pipe, serde)
+        if isinstance(conn, ConnectionPool):
+            # Cada operación toma su propia conexión del pool: el lock de la instancia
+            # serializaría las operaciones de todos los turnos
+            self.lock = nullcontext()
+
+    def get_tuple(self, config):
+        with _observe("read"):
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with _observe("write"):
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with _observe("write_pending"):
+            return super().put_writes(config, writes, task_id, task_path)
+
+
+class TimedAsyncPostgresSaver(AsyncPostgresSaver):
+    """AsyncPostgresSaver que registra latencia y spans de lecturas y escrituras de checkpoints."""
+
+    def __init__(self, conn, pipe=None, serde=None):
+        super().__init__(conn, pipe, serde)
+        if isinstance(conn, AsyncConnectionPool):
+            self.lock = nullcontext()
+
+    async def aget_tuple(self, config):
+        with _observe("read"):
+            return await super().aget_tuple(config)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        with _observe("write"):
+            return await super().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        with _observe("write_pending"):
+            return await super().aput_writes(config, writes, task_id, task_path)
+
+
+def _pool_options(name: str) -> dict:
+    """Parámetros comunes de los pools del checkpointer (tamaño, vida de las conexiones y reconexión)."""
+    return {
+        "min_size": settings.DB_POOL_MIN_SIZE,
+        "max_size": settings.DB_POOL_MAX_SIZE,
+        "timeout": settings.DB_POOL_TIMEOUT_S,
+        "max_idle": settings.DB_POOL_MAX_IDLE_S,
+        "max_lifetime": settings.DB_POOL_MAX_LIFETIME_S,
+        "reconnect_timeout": settings.DB_POOL_RECONNECT_TIMEOUT_S,
+        "reconnect_failed": _log_reconnect_failed,
+        "name": name,
+        # Mismas opciones de conexión que PostgresSaver.from_conn_string
+        "kwargs": {"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+    }
+
+
+def _log_reconnect_failed(pool) -> None:
+    logger.error(
+        "Checkpoint pool '%s' could not reconnect to Postgres in %ss",
+        pool.name, settings.DB_POOL_RECONNECT_TIMEOUT_S,
+    )
+
+
+def pool_stats() -> dict[str, dict]:
+    """
+    Estado de los pools abiertos del checkpointer.
+
+    Returns:
+        dict[str, dict]: Por pool, conexiones abiertas, en uso y libres, solicitudes en espera y los
+        acumulados de solicitudes, espera, errores y conexiones perdidas.
+    """
+    stats = {}
+    for name, pool in _POOLS.items():
+        raw = pool.get_stats()
+        size, available = raw.get("pool_size", 0), raw.get("pool_available", 0)
+        stats[name] = {
+            "size": size,
+            "max_size": pool.max_size,
+            "in_use": size - available,
+            "idle": available,
+            "waiting": raw.get("requests_waiting", 0),
+            "requests_total": raw.get("requests_num", 0),
+            "requests_queued_total": raw.get("requests_queued", 0),
+            "wait_seconds_total": raw.get("requests_wait_ms", 0) / 1000,
+            "request_errors_total": raw.get("requests_errors", 0),
+            "connections_lost_total": raw.get("connections_lost", 0),
+            "connection_errors_total": raw.get("connections_errors", 0),
+            "returns_bad_total": raw.get("returns_bad", 0),
+        }
+    return stats
+
+
+@contextmanager
 def create_checkpointer_context():
-    """Crea el context manager del checkpointer."""
-    return PostgresSaver.from_conn_string(settings.DB_URI)
+    """
+    Crea el context manager del checkpointer sobre un pool de conexiones.
+    Las conexiones se verifican al tomarlas del pool (DB_POOL_CHECK) y el pool se reconecta
+    solo si Postgres se reinicia; falla al entrar si no logra abrir DB_POOL_MIN_SIZE conexiones
+    en DB_POOL_TIMEOUT_S.
+    """
+    pool = ConnectionPool(
+        settings.DB_URI,
+        open=False,
+        check=ConnectionPool.check_connection if settings.DB_POOL_CHECK else None,
+        **_pool_options("checkpoint"),
+    )
+    try:
+        pool.open(wait=True, timeout=settings.DB_POOL_TIMEOUT_S)
+        _POOLS[pool.name] = pool
+        yield TimedPostgresSaver(pool)
+    finally:
+        _POOLS.pop(pool.name, None)
+        pool.close()
+
+
+@asynccontextmanager
+async def create_async_checkpointer_context():
+    """Crea el context manager asíncrono del checkpointer (para el event loop de la API)."""
+    pool = AsyncConnectionPool(
+        settings.DB_URI,
+        open=False,
+        check=AsyncConnectionPool.check_connection if settings.DB_POOL_CHECK else None,
+        **_pool_options("checkpoint_async"),
+    )
+    try:
+        await pool.open(wait=True, timeout=settings.DB_POOL_TIMEOUT_S)
+        _POOLS[pool.name] = pool
+        yield TimedAsyncPostgresSaver(pool)
+    finally:
+        _POOLS.pop(pool.name, None)
+        await pool.close()
 
 
 def generate_thread_id() -> str:
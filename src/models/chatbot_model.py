@@ -1,22 +1,73 @@
 """
 Modelo para la gestión de un agente conversacional basado en LangChain.
-Incluye la creación del agente, configuración del modelo, memoria a corto plazo con Postgres y trimming de mensajes.
+Incluye la creación del agente, configuración del modelo, memoria a corto plazo con Postgres y trimming de mensajes
+por presupuesto de tokens.
 """
 
-from typing import Any
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Any, AsyncIterator, NamedTuple
 
-from langchain.agents import create_agent, AgentState
-from langchain.chat_models import init_chat_model
-from langchain.messages import RemoveMessage
-from langgraph.graph.message import REMOVE_ALL_MESSAGES
-from langchain.agents.middleware import before_model
-from langgraph.runtime import Runtime
+from langchain.agents import create_agent
+from langchain.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    RemoveMessage,
+    ToolMessage,
+)
 
+from src.config.logger import get_logger
+from src.models.fast_path import FAST_PATH_MODEL, FastPath, FastPathAnswer
+from src.models.hedging import HedgingMiddleware, HedgingPolicy
+from src.models.history_trimming import HistoryTrimMiddleware, trim_to_budget
+from src.models.middleware import (
+    AgentMetricsMiddleware,
+    AgentTracingMiddleware,
+    ToolConcurrencyMiddleware,
+)
+from src.models.tool_compaction import ToolResultCompactionMiddleware
+from src.models.tool_selection import ToolSelectionMiddleware
+from src.models.model_registry import ModelRegistry, create_chat_model
+from src.observability.metrics import FAST_PATH_ANSWERS, SUMMARY_RUNS, SUMMARY_SECONDS, TURN_SECONDS
+from src.observability.tracing import TRACER
+from src.memory.conversation_summary import SummaryPolicy, asummarize
 from src.memory.short_term_memory import (
+    create_async_checkpointer_context,
     create_checkpointer_context,
     generate_thread_id,
 )
 
+logger = get_logger(__name__)
+
+
+class AgentSnapshot(NamedTuple):
+    """
+    Configuración publicada del agente: modelo y agentes compilados para unos parámetros.
+    Es inmutable; un cambio de configuración publica un snapshot nuevo en lugar de modificarlo.
+    """
+
+    model_name: str
+    temperature: float
+    max_tokens: int
+    model: Any
+    agent: Any
+    async_agent: Any = None
+    hedge_model: Any = None
+
+
+class TurnResult(NamedTuple):
+    """Resultado de un turno: respuesta, modelo que la generó, uso de herramientas y tokens."""
+
+    output: str
+    model_name: str
+    used_tools: bool
+    input_tokens: int
+    output_tokens: int
+
 
 class ChatbotModel:
     """
@@ -24,6 +75,9 @@ class ChatbotModel:
     utilizando LangChain, memoria a corto plazo en Postgres y trimming de mensajes.
     """
 
+    # Máximo de configuraciones compiladas que se conservan para reutilizar
+    MAX_SNAPSHOTS = 8
+
     def __init__(
         self,
         model_name: str,
@@ -32,95 +86,318 @@ class ChatbotModel:
         max_tokens: int = 1000,
         timeout: int = 30,
         system_prompt: str = None,
+        registry: ModelRegistry = None,
+        hedging: HedgingPolicy = None,
+        fast_path: FastPath = None,
+        tool_selection: bool = False,
+        tool_limits: dict[str, int] = None,
+        max_parallel_tools: int = None,
+        history_max_tokens: int = 3000,
+        history_chars_per_token: float = 4.0,
+        summary: SummaryPolicy = None,
+        tool_result_max_chars: int = None,
+        tool_result_keep_turns: int = 1,
     ):
         """
         Inicializa el modelo del chatbot.
+        Con un registro de modelos se compila un agente por cada modelo configurado
+        (compartiendo herramientas y checkpointer); model_name es el modelo por defecto.
 
         Args:
-            model_name (str): Nombre o identificador del modelo (por ejemplo, 'gpt-4o').
+            model_name (str): Nombre o identificador del modelo (por ejemplo,
+                'google_genai:gemini-2.5-flash', o un nombre del registro).
             tools (List[Any]): Lista de herramientas para el agente.
             temperature (float): Temperatura del modelo (creatividad).
             max_tokens (int): Máximo de tokens en la respuesta.
             timeout (int): Tiempo máximo de espera para la respuesta.
             system_prompt (str, opcional): Prompt del sistema para el agente.
+            registry (ModelRegistry, opcional): Modelos adicionales seleccionables por turno.
+            hedging (HedgingPolicy, opcional): Hedging de cada llamada al modelo hacia el
+                modelo secundario de la política (solo en invocaciones asíncronas).
+            fast_path (FastPath, opcional): Respuestas deterministas de FAQ y precios que se
+                intentan antes de invocar al agente.
+            tool_selection (bool): Expone en cada llamada al modelo solo las herramientas
+                relevantes para el turno (ver src/models/tool_selection.py).
+            tool_limits (dict, opcional): Máximo de ejecuciones simultáneas por herramienta
+                en todo el proceso ({nombre: límite}).
+            max_parallel_tools (int, opcional): Máximo de llamadas a herramientas de un mismo
+                paso ejecutadas en paralelo (max_concurrency de LangGraph).
+            history_max_tokens (int): Presupuesto de tokens del historial enviado al modelo
+                (ver src/models/history_trimming.py).
+            history_chars_per_token (float): Caracteres por token de la estimación usada sin
+                tiktoken.
+            summary (SummaryPolicy, opcional): Resumen acumulado de los turnos antiguos, escrito
+                fuera de la ruta de la respuesta (ver arefresh_summary).
+            tool_result_max_chars (int, opcional): Al terminar cada turno, los resultados de
+                herramientas de turnos anteriores se compactan a este número de caracteres
+                (ver src/models/tool_compaction.py). None desactiva la compactación.
+            tool_result_keep_turns (int): Turnos más recientes cuyos resultados de herramientas
+                se conservan completos.
         """
-        self.model_name = model_name
-        self.temperature = temperature
-        self.max_tokens = max_tokens
+        self.registry = registry or ModelRegistry.from_model_id(model_name)
+        self.model_name = self.registry.get(model_name).name
         self.timeout = timeout
-        self.model = init_chat_model(
-            model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
         self.tools = tools
         self.system_prompt = system_prompt
+        self.hedging = hedging
+        self.fast_path = fast_path
+        self.tool_selection = tool_selection
+        self.max_parallel_tools = max_parallel_tools
+        self._tool_limiter = ToolConcurrencyMiddleware(tool_limits) if tool_limits else None
+        self._tool_compactor = (
+            ToolResultCompactionMiddleware(tool_result_max_chars, tool_result_keep_turns)
+            if tool_result_max_chars
+            else None
+        )
+        self.history_max_tokens = history_max_tokens
+        self.summary = summary
+        self._history_trimmer = HistoryTrimMiddleware(
+            history_max_tokens, history_chars_per_token, collect_dropped=summary is not None
+        )
         self._checkpointer_cm = create_checkpointer_context()
         self.checkpointer = self._checkpointer_cm.__enter__()
         self.checkpointer.setup()
-        self.agent = self._create_agent()
+        # El checkpointer asíncrono se abre dentro del event loop (ver asetup)
+        self._async_checkpointer_cm = None
+        self.async_checkpointer = None
+        self._async_setup_lock = None
+        # Snapshots compilados por (modelo, temperature, max_tokens). Los vigentes se publican
+        # juntos en _published ({modelo: snapshot}), que se reemplaza completo en cada cambio
+        self._snapshots: OrderedDict[tuple, AgentSnapshot] = OrderedDict()
+        self._snapshots_lock = threading.RLock()
+        self.unavailable_models: dict[str, str] = {}
+        published = {}
+        for spec in self.registry.specs:
+            try:
+                published[spec.name] = self._get_snapshot(
+                    spec.name,
+                    temperature if spec.temperature is None else spec.temperature,
+                    max_tokens if spec.max_tokens is None else spec.max_tokens,
+                )
+            except Exception as e:
+                if spec.name == self.model_name:
+                    raise
+                # Proveedores opcionales (p. ej. Ollama sin servidor o sin paquete instalado)
+                logger.warning("Model %s is not available: %s", spec.id, e)
+                self.unavailable_models[spec.name] = str(e)
+        self._published = published
+        if self.summary is not None and self.summary.model not in published:
+            logger.warning("Conversation summaries disabled: model %s is not available", self.summary.model)
+            self.summary = None
+            self._history_trimmer.collect_dropped = False
 
-    @staticmethod
-    @before_model
-    def trim_messages(state: AgentState, runtime: Runtime) -> dict[str, Any] | None:
+    def available_models(self) -> list[str]:
+        """Modelos con agente compilado, seleccionables por turno."""
+        return list(self._published)
+
+    def _snapshot_for(self, model_name: str = None) -> AgentSnapshot:
         """
-        Middleware para trimming: mantiene solo los últimos 4 mensajes relevantes en el historial.
+        Snapshot vigente de un modelo (por defecto, el modelo por defecto).
+
+        Raises:
+            ValueError: Si el modelo no está configurado o no está disponible.
         """
-        messages = state["messages"]
-        if len(messages) <= 4:
-            return None
-        first_msg = messages[0]
-        recent_messages = messages[-4:]
-        new_messages = [first_msg] + recent_messages
-        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *new_messages]}
+        name = self.registry.get(model_name).name if model_name else self.model_name
+        snapshot = self._published.get(name)
+        if snapshot is None:
+            raise ValueError(f"Modelo no disponible: '{name}'")
+        return snapshot
+
+    # Los turnos leen el snapshot una sola vez al empezar; estas propiedades exponen el
+    # snapshot vigente del modelo por defecto
+    @property
+    def temperature(self) -> float:
+        return self._snapshot_for().temperature
+
+    @property
+    def max_tokens(self) -> int:
+        return self._snapshot_for().max_tokens
+
+    @property
+    def model(self):
+        return self._snapshot_for().model
 
-    def _create_agent(self):
+    @property
+    def agent(self):
+        return self._snapshot_for().agent
+
+    @property
+    def async_agent(self):
+        return self._snapshot_for().async_agent
+
+    def _create_agent(self, model, checkpointer, hedge_model=None):
         """
         Crea una instancia del agente LangChain con el modelo, herramientas, memoria y trimming.
+
+        Args:
+            model: Modelo de chat del agente.
+            checkpointer: Checkpointer a usar (síncrono o asíncrono).
+            hedge_model (opcional): Modelo secundario para el hedging de cada llamada.
+
         Returns:
             Agent: Instancia del agente LangChain.
         """
+        middleware = [self._history_trimmer]
+        if self.tool_selection:
+            middleware.append(ToolSelectionMiddleware())
+        if self._tool_compactor is not None:
+            middleware.append(self._tool_compactor)
+        middleware += [AgentMetricsMiddleware(), AgentTracingMiddleware()]
+        if self._tool_limiter is not None:
+            # Después de métricas y trazas: la espera por el límite cuenta en la duración
+            middleware.append(self._tool_limiter)
+        if hedge_model is not None:
+            # Último de la lista: envuelve directamente la llamada al modelo
+            middleware.append(HedgingMiddleware(self.hedging, hedge_model))
         return create_agent(
-            self.model,
+            model,
             tools=self.tools,
             system_prompt=self.system_prompt,
-            middleware=[self.trim_messages],
-            checkpointer=self.checkpointer,
+            middleware=middleware,
+            checkpointer=checkpointer,
         )
 
+    def _create_hedge_model(self, model_name: str, temperature: float, max_tokens: int):
+        """Modelo secundario del hedging para un modelo principal (None si no aplica)."""
+        if self.hedging is None or model_name == self.hedging.secondary:
+            return None
+        try:
+            return create_chat_model(
+                self.registry.get(self.hedging.secondary),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            logger.warning("Hedging disabled for %s: %s", model_name, e)
+            return None
+
+    def _get_snapshot(self, model_name: str, temperature: float, max_tokens: int) -> AgentSnapshot:
+        """
+        Retorna el snapshot compilado para la configuración, creándolo si no existe.
+        Se reutilizan los agentes ya compilados para configuraciones idénticas.
+
+        Args:
+            model_name (str): Nombre del modelo en el registro.
+            temperature (float): Temperatura del modelo.
+            max_tokens (int): Máximo de tokens en la respuesta.
+
+        Returns:
+            AgentSnapshot: Snapshot de la configuración.
+        """
+        key = (model_name, temperature, max_tokens)
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                model = create_chat_model(
+                    self.registry.get(model_name),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=self.timeout,
+                )
+                hedge_model = self._create_hedge_model(model_name, temperature, max_tokens)
+                snapshot = AgentSnapshot(
+                    model_name=model_name,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    model=model,
+                    agent=self._create_agent(model, self.checkpointer),
+                    async_agent=(
+                        self._create_agent(model, self.async_checkpointer, hedge_model)
+                        if self.async_checkpointer is not None
+                        else None
+                    ),
+                    hedge_model=hedge_model,
+                )
+                self._snapshots[key] = snapshot
+                while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                    self._snapshots.popitem(last=False)
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    async def asetup(self) -> None:
+        """
+        Abre el checkpointer asíncrono de Postgres y crea los agentes asíncronos.
+        Debe ejecutarse dentro del event loop que atenderá las invocaciones (idempotente).
+        """
+        if self.async_checkpointer is not None:
+            return
+        if self._async_setup_lock is None:
+            self._async_setup_lock = asyncio.Lock()
+        async with self._async_setup_lock:
+            if self.async_checkpointer is not None:
+                return
+            self._async_checkpointer_cm = create_async_checkpointer_context()
+            async_checkpointer = await self._async_checkpointer_cm.__aenter__()
+            await async_checkpointer.setup()
+            with self._snapshots_lock:
+                self.async_checkpointer = async_checkpointer
+                for key, snapshot in self._snapshots.items():
+                    self._snapshots[key] = snapshot._replace(
+                        async_agent=self._create_agent(
+                            snapshot.model, async_checkpointer, snapshot.hedge_model
+                        )
+                    )
+                # Un snapshot publicado puede haber salido del LRU de _snapshots: se conserva
+                # con su propio agente asíncrono
+                published = {}
+                for name, snapshot in self._published.items():
+                    cached = self._snapshots.get((name, snapshot.temperature, snapshot.max_tokens))
+                    published[name] = cached if cached is not None else snapshot._replace(
+                        async_agent=self._create_agent(
+                            snapshot.model, async_checkpointer, snapshot.hedge_model
+                        )
+                    )
+                self._published = published
+
     def update_model_config(
-        self, temperature: float = None, max_tokens: int = None
+        self, temperature: float = None, max_tokens: int = None, model_name: str = None
     ) -> None:
         """
-        Actualiza la configuración del modelo y recrea el agente con los nuevos parámetros.
+        Actualiza la configuración del modelo publicando un nuevo snapshot del agente.
+        El cambio es atómico: los turnos en curso terminan con el snapshot con el que empezaron
+        y los nuevos turnos usan el nuevo; no hay respuestas con configuración mezclada.
 
         Args:
             temperature (float, opcional): Nueva temperatura del modelo.
                 Si no se proporciona, mantiene el valor actual.
             max_tokens (int, opcional): Nuevo límite de tokens.
                 Si no se proporciona, mantiene el valor actual.
+            model_name (str, opcional): Modelo a actualizar. Por defecto, todos los disponibles.
 
         Raises:
             ValueError: Si los parámetros están fuera de los rangos válidos.
         """
-        if temperature is not None:
-            if not 0.0 <= temperature <= 1.0:
-                raise ValueError("Temperature must be between 0.0 and 1.0")
-            self.temperature = temperature
-
-        if max_tokens is not None:
-            if max_tokens <= 0:
-                raise ValueError("Max tokens must be greater than 0")
-            self.max_tokens = max_tokens
-
-        self.model = init_chat_model(
-            self.model_name,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            timeout=self.timeout,
+        if temperature is not None and not 0.0 <= temperature <= 1.0:
+            raise ValueError("Temperature must be between 0.0 and 1.0")
+        if max_tokens is not None and max_tokens <= 0:
+            raise ValueError("Max tokens must be greater than 0")
+
+        names = [self._snapshot_for(model_name).model_name] if model_name else self.available_models()
+        with self._snapshots_lock:
+            published = dict(self._published)
+            for name in names:
+                current = published[name]
+                published[name] = self._get_snapshot(
+                    name,
+                    current.temperature if temperature is None else temperature,
+                    current.max_tokens if max_tokens is None else max_tokens,
+                )
+            self._published = published
+
+    async def aupdate_model_config(
+        self, temperature: float = None, max_tokens: int = None, model_name: str = None
+    ) -> None:
+        """
+        Versión asíncrona de update_model_config: compila el nuevo agente en un hilo aparte
+        para no bloquear el event loop que atiende los turnos en curso.
+        """
+        await asyncio.to_thread(
+            self.update_model_config,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            model_name=model_name,
         )
-        self.agent = self._create_agent()
 
     def _get_text_from_content(self, content) -> str:
         """
@@ -136,8 +413,44 @@ class ChatbotModel:
             return " ".join(item.get("text", "") for item in content if "text" in item)
         return content
 
+    def _run_config(self, thread_id: str, **configurable) -> dict:
+        """Config de una ejecución del agente para la conversación."""
+        config = {"configurable": {"thread_id": thread_id, **configurable}}
+        if self.max_parallel_tools:
+            config["max_concurrency"] = self.max_parallel_tools
+        return config
+
+    def _match_fast_path(self, messages: list) -> tuple[str, FastPathAnswer] | None:
+        """
+        Respuesta del fast path para un turno de un solo mensaje de usuario.
+
+        Returns:
+            tuple | None: (texto del usuario, respuesta), o None si el turno va al agente.
+        """
+        if self.fast_path is None or len(messages) != 1:
+            return None
+        message = messages[0]
+        if not isinstance(message, dict) or message.get("role") != "user":
+            return None
+        text = message.get("content")
+        if not isinstance(text, str):
+            return None
+        answer = self.fast_path.match(text)
+        if answer is None:
+            return None
+        FAST_PATH_ANSWERS.inc(intent=answer.intent)
+        return text, answer
+
+    def _fast_path_update(self, text: str, answer: FastPathAnswer) -> dict:
+        return {"messages": [HumanMessage(content=text), AIMessage(content=answer.answer)]}
+
     def invoke(
-        self, messages: list, thread_id: str = None, output_keys="messages", **kwargs
+        self,
+        messages: list,
+        thread_id: str = None,
+        output_keys="messages",
+        model_name: str = None,
+        **kwargs,
     ):
         """
         Invoca el agente con historial de mensajes y un identificador de conversación único.
@@ -146,20 +459,356 @@ class ChatbotModel:
         Args:
             messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
             thread_id (str, opcional): Identificador único de la conversación.
+            model_name (str, opcional): Modelo del registro a usar. Por defecto, model_name.
             **kwargs: Parámetros adicionales para la invocación.
 
         Returns:
             dict: Respuesta generada por el agente.
         """
+        snapshot = self._snapshot_for(model_name)
         if thread_id is None:
             thread_id = generate_thread_id()
 
+        config = self._run_config(thread_id)
+
+        fast = self._match_fast_path(messages)
+        if fast is not None:
+            with TRACER.span("agent.fast_path", thread_id=thread_id, intent=fast[1].intent):
+                snapshot.agent.update_state(config, self._fast_path_update(*fast), as_node="model")
+            return fast[1].answer
+
+        with (
+            TRACER.span("agent.turn", thread_id=thread_id, model=snapshot.model_name),
+            TURN_SECONDS.time(mode="invoke"),
+        ):
+            response = snapshot.agent.invoke(
+                {"messages": messages}, config, output_keys=output_keys
+            )
+        return self._get_output_text(response)
+
+    async def ainvoke(
+        self,
+        messages: list,
+        thread_id: str = None,
+        output_keys="messages",
+        model_name: str = None,
+        **kwargs,
+    ):
+        """
+        Versión asíncrona de invoke: no bloquea el event loop durante las llamadas al LLM,
+        a las herramientas ni al checkpointer.
+
+        Args:
+            messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            thread_id (str, opcional): Identificador único de la conversación.
+            model_name (str, opcional): Modelo del registro a usar. Por defecto, model_name.
+            **kwargs: Parámetros adicionales para la invocación.
+
+        Returns:
+            str: Respuesta generada por el agente.
+        """
+        result = await self.ainvoke_turn(
+            messages, thread_id=thread_id, output_keys=output_keys, model_name=model_name
+        )
+        return result.output
+
+    async def ainvoke_turn(
+        self,
+        messages: list,
+        thread_id: str = None,
+        output_keys="messages",
+        model_name: str = None,
+    ) -> TurnResult:
+        """
+        Igual que ainvoke, pero retorna además el modelo usado, si el turno llamó herramientas
+        y los tokens consumidos. Un turno respondido por el fast path se registra en el
+        checkpoint sin invocar al agente (model_name="fast_path").
+
+        Args:
+            messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            thread_id (str, opcional): Identificador único de la conversación.
+            model_name (str, opcional): Modelo del registro a usar. Por defecto, model_name.
+
+        Returns:
+            TurnResult: Resultado del turno.
+        """
+        await self.asetup()
+        snapshot = self._snapshot_for(model_name)
+        if thread_id is None:
+            thread_id = generate_thread_id()
+
+        config = self._run_config(thread_id)
+
+        fast = self._match_fast_path(messages)
+        if fast is not None:
+            with TRACER.span("agent.fast_path", thread_id=thread_id, intent=fast[1].intent):
+                await snapshot.async_agent.aupdate_state(
+                    config, self._fast_path_update(*fast), as_node="model"
+                )
+            # Una respuesta de precios equivale a una llamada a price_tool
+            return TurnResult(fast[1].answer, FAST_PATH_MODEL, fast[1].intent == "price", 0, 0)
+
+        with (
+            TRACER.span("agent.turn", thread_id=thread_id, model=snapshot.model_name),
+            TURN_SECONDS.time(mode="ainvoke"),
+        ):
+            response = await snapshot.async_agent.ainvoke(
+                {"messages": messages}, config, output_keys=output_keys
+            )
+        return self._turn_result(response, snapshot.model_name)
+
+    async def arerun_turn(self, thread_id: str, model_name: str) -> TurnResult:
+        """
+        Repite el último turno de la conversación con otro modelo.
+        Parte del checkpoint de entrada del turno (antes de la respuesta del primer modelo), por
+        lo que la nueva respuesta reemplaza a la anterior en el historial en lugar de sumarse.
+
+        Args:
+            thread_id (str): Identificador de la conversación.
+            model_name (str): Modelo del registro con el que se repite el turno.
+
+        Returns:
+            TurnResult: Resultado del turno repetido.
+
+        Raises:
+            ValueError: Si la conversación no tiene turnos.
+        """
+        await self.asetup()
+        snapshot = self._snapshot_for(model_name)
+        config = {"configurable": {"thread_id": thread_id}}
+
+        with (
+            TRACER.span("agent.rerun_turn", thread_id=thread_id, model=snapshot.model_name),
+            TURN_SECONDS.time(mode="rerun"),
+        ):
+            turn_input = None
+            async for state in snapshot.async_agent.aget_state_history(config):
+                if state.metadata.get("source") == "input":
+                    turn_input = state
+                    break
+            if turn_input is None:
+                raise ValueError(f"La conversación {thread_id} no tiene turnos para repetir")
+            # Sin entrada nueva, el grafo continúa desde el checkpoint de entrada
+            response = await snapshot.async_agent.ainvoke(
+                None, {**self._run_config(thread_id), "configurable": turn_input.config["configurable"]}
+            )
+        return self._turn_result(response, snapshot.model_name)
+
+    async def aappend_turn(self, thread_id: str, user_text: str, answer: str) -> None:
+        """
+        Registra en el checkpoint de la conversación un turno respondido sin ejecutar el agente
+        (por ejemplo, desde un caché), para que el historial siga completo.
+
+        Args:
+            thread_id (str): Identificador de la conversación.
+            user_text (str): Mensaje del usuario.
+            answer (str): Respuesta entregada.
+        """
+        await self.asetup()
+        config = {"configurable": {"thread_id": thread_id}}
+        with TRACER.span("agent.append_turn", thread_id=thread_id):
+            await self.async_agent.aupdate_state(
+                config,
+                {"messages": [HumanMessage(content=user_text), AIMessage(content=answer)]},
+                as_node="model",
+            )
+
+    async def arefresh_summary(self, thread_id: str, lock=None) -> str:
+        """
+        Actualiza el resumen acumulado de la conversación: los mensajes que exceden
+        target_ratio del presupuesto del historial, junto con los que el recorte ya descartó,
+        se resumen con el modelo de la política y se reemplazan en el estado por el resumen.
+        Se ejecuta después de responder, en segundo plano; el modelo se llama sin el lock y la
+        escritura se hace con el lock solo si ningún otro resumen se escribió entretanto.
+
+        Args:
+            thread_id (str): Identificador de la conversación.
+            lock (opcional): Fábrica del context manager asíncrono que excluye los turnos de
+                la conversación durante la escritura.
+
+        Returns:
+            str: "written", "skipped" (nada que resumir) o "stale" (otro resumen más reciente).
+        """
+        policy = self.summary
+        if policy is None:
+            return "skipped"
+        await self.asetup()
+        agent = self._snapshot_for().async_agent
         config = {"configurable": {"thread_id": thread_id}}
 
-        response = self.agent.invoke(
-            {"messages": messages}, config, output_keys=output_keys
+        values = (await agent.aget_state(config)).values
+        messages = values.get("messages", [])
+        kept, _, _ = trim_to_budget(
+            messages,
+            int(self.history_max_tokens * policy.target_ratio),
+            self._history_trimmer.counter,
+            keep_first=False,
+        )
+        kept_ids = {message.id for message in kept}
+        dropped = [message for message in messages if message.id not in kept_ids]
+        pending = values.get("summary_pending", [])
+        if len(dropped) + len(pending) < policy.min_messages:
+            SUMMARY_RUNS.inc(outcome="skipped")
+            return "skipped"
+
+        version = values.get("summary_version", 0)
+        with SUMMARY_SECONDS.time():
+            summary = await asummarize(
+                self._snapshot_for(policy.model).model,
+                values.get("summary", ""),
+                pending + dropped,
+                policy.max_words,
+            )
+
+        async with (lock() if lock is not None else nullcontext()):
+            current = (await agent.aget_state(config)).values
+            if current.get("summary_version", 0) != version:
+                SUMMARY_RUNS.inc(outcome="stale")
+                return "stale"
+            consumed = {message.id for message in pending + dropped}
+            present = {message.id for message in current.get("messages", [])}
+            await agent.aupdate_state(
+                config,
+                {
+                    "messages": [RemoveMessage(id=message.id) for message in dropped if message.id in present],
+                    "summary": summary,
+                    "summary_version": version + 1,
+                    "summary_pending": [
+                        message for message in current.get("summary_pending", []) if message.id not in consumed
+                    ],
+                },
+                as_node="model",
+            )
+        SUMMARY_RUNS.inc(outcome="written")
+        logger.debug(
+            "Summary v%d written for thread %s (%d messages summarized)", version + 1, thread_id, len(consumed)
+        )
+        return "written"
+
+    async def astream(
+        self,
+        messages: list,
+        thread_id: str = None,
+        mode: str = "tokens",
+        model_name: str = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Ejecuta el agente en modo streaming y emite eventos a medida que ocurren.
+        El estado final se persiste igual que en ainvoke, a través del checkpointer.
+        Una respuesta del fast path se emite como un único token/message seguido de done.
+
+        Eventos emitidos (dicts con llaves "event" y "data"):
+            - "tool_start": el modelo solicitó una herramienta (id, name, args).
+            - "tool_end": la herramienta terminó (id, name, preview).
+            - "token": fragmento de texto del modelo (solo en mode="tokens").
+            - "message": mensaje de texto completo del modelo (solo en mode="messages").
+            - "done": respuesta final del turno (output).
+
+        Args:
+            messages (list): Lista de mensajes (dicts) siguiendo el formato de LangChain.
+            thread_id (str, opcional): Identificador único de la conversación.
+            mode (str): "tokens" para deltas de texto o "messages" para mensajes completos.
+            model_name (str, opcional): Modelo del registro a usar. Por defecto, model_name.
+
+        Yields:
+            dict: Evento del turno en curso.
+        """
+        await self.asetup()
+        snapshot = self._snapshot_for(model_name)
+        if thread_id is None:
+            thread_id = generate_thread_id()
+
+        # Sin hedging en streaming de tokens: los fragmentos enviados no se pueden retirar
+        config = self._run_config(thread_id, hedging=mode != "tokens")
+        stream_mode = ["messages", "updates"] if mode == "tokens" else ["updates"]
+        output = ""
+        started = perf_counter()
+
+        fast = self._match_fast_path(messages)
+        if fast is not None:
+            with TRACER.span("agent.fast_path", thread_id=thread_id, intent=fast[1].intent):
+                await snapshot.async_agent.aupdate_state(
+                    config, self._fast_path_update(*fast), as_node="model"
+                )
+            output = fast[1].answer
+            yield {"event": "token" if mode == "tokens" else "message", "data": {"text": output}}
+            yield {"event": "done", "data": {"output": output}}
+            return
+
+        with TRACER.span("agent.turn", thread_id=thread_id, model=snapshot.model_name, mode=mode):
+            async for stream_type, chunk in snapshot.async_agent.astream(
+                {"messages": messages}, config, stream_mode=stream_mode
+            ):
+                if stream_type == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") != "model":
+                        continue
+                    if isinstance(message, AIMessageChunk):
+                        text = self._get_text_from_content(message.content)
+                        if text:
+                            yield {"event": "token", "data": {"text": text}}
+                    continue
+
+                # Solo los nodos del agente: los de middleware (recorte del historial,
+                # compactación) reescriben mensajes de turnos anteriores
+                for node, update in chunk.items():
+                    if node not in ("model", "tools"):
+                        continue
+                    for message in (update or {}).get("messages", []):
+                        if node == "model" and isinstance(message, AIMessage):
+                            for tool_call in message.tool_calls:
+                                yield {
+                                    "event": "tool_start",
+                                    "data": {
+                                        "id": tool_call["id"],
+                                        "name": tool_call["name"],
+                                        "args": tool_call["args"],
+                                    },
+                                }
+                            if not message.tool_calls:
+                                output = self._get_text_from_content(message.content)
+                                if mode != "tokens":
+                                    yield {"event": "message", "data": {"text": output}}
+                        elif node == "tools" and isinstance(message, ToolMessage):
+                            yield {
+                                "event": "tool_end",
+                                "data": {
+                                    "id": message.tool_call_id,
+                                    "name": message.name,
+                                    "preview": str(message.content)[:200],
+                                },
+                            }
+
+        TURN_SECONDS.observe(perf_counter() - started, mode="astream")
+        yield {"event": "done", "data": {"output": output}}
+
+    def _turn_result(self, response, model_name: str) -> TurnResult:
+        """Resume la respuesta del agente: texto, herramientas y tokens del último turno."""
+        messages = response["messages"] if isinstance(response, dict) else response
+        turn = []
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            turn.append(message)
+        usage = [m.usage_metadata or {} for m in turn if isinstance(m, AIMessage)]
+        return TurnResult(
+            output=self._get_output_text(response),
+            model_name=model_name,
+            used_tools=any(isinstance(m, ToolMessage) for m in turn),
+            input_tokens=sum(u.get("input_tokens", 0) for u in usage),
+            output_tokens=sum(u.get("output_tokens", 0) for u in usage),
         )
 
+    def _get_output_text(self, response) -> str:
+        """
+        Extrae el texto del último mensaje de la respuesta del agente.
+
+        Args:
+            response: Respuesta del agente (dict con 'messages' o lista de mensajes).
+
+        Returns:
+            str: Texto plano del último mensaje.
+        """
         if isinstance(response, dict) and "messages" in response:
             last_message = response["messages"][-1]
             return self._get_text_from_content(last_message.content)
@@ -169,6 +818,20 @@ class ChatbotModel:
 
         return self._get_text_from_content(response["messages"][-1].content)
 
+    async def aclose(self) -> None:
+        """Cierra el checkpointer asíncrono si fue abierto."""
+        if self._async_checkpointer_cm is not None:
+            await self._async_checkpointer_cm.__aexit__(None, None, None)
+            self._async_checkpointer_cm = None
+            with self._snapshots_lock:
+                self.async_checkpointer = None
+                for key, snapshot in self._snapshots.items():
+                    self._snapshots[key] = snapshot._replace(async_agent=None)
+                self._published = {
+                    name: snapshot._replace(async_agent=None)
+                    for name, snapshot in self._published.items()
+                }
+
     def __del__(self):
         """Cerrar el context manager al destruir el objeto."""
         if hasattr(self, "_checkpointer_cm"):
@@ -0,0 +1,68 @@
+"""
+Modelo de chat local y determinista para pruebas sin red.
+Responde con un texto derivado del último mensaje del usuario, con latencia configurable,
+y acepta herramientas (bind_tools) aunque nunca las solicita.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modelo de chat simulado (proveedor "fake" en config/models.yaml).
+
+    Attributes:
+        model (str): Nombre del modelo, usado en métricas y logs.
+        latency_ms (int): Latencia simulada por llamada.
+        reply_prefix (str): Prefijo de cada respuesta.
+        temperature (float): Se acepta por compatibilidad; no afecta la respuesta.
+        max_tokens (int): Número máximo de palabras de la respuesta.
+    """
+
+    model: str = "fake"
+    latency_ms: int = 0
+    reply_prefix: str = "Respuesta simulada:"
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools, **kwargs) -> "FakeChatModel":
+        return self
+
+    def _reply(self, messages: list[BaseMessage]) -> ChatResult:
+        last_user = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        words = f"{self.reply_prefix} {last_user}".split()
+        if self.max_tokens:
+            words = words[: self.max_tokens]
+        text = " ".join(words)
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(words),
+                "total_tokens": input_tokens + len(words),
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._reply(messages)
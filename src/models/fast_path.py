@@ -0,0 +1,157 @@
+"""
+Respuestas deterministas para preguntas frecuentes y consultas de precio.
+Antes de invocar al agente se buscan localmente la pregunta frecuente y el producto/tienda
+mencionados (los mismos datos que usan faq_tool y price_tool). Si la coincidencia es de alta
+confianza, el turno se responde con una plantilla sin llamar al LLM; en cualquier otro caso
+el mensaje sigue al agente.
+"""
+
+from difflib import SequenceMatcher
+from typing import NamedTuple, Optional
+import re
+
+from src.config.logger import get_logger
+from src.memory.semantic_cache import fold_text
+from src.tools.qa_data import load_faqs, load_prices
+
+logger = get_logger(__name__)
+
+# Nombre con el que se reportan los turnos respondidos por el fast path
+FAST_PATH_MODEL = "fast_path"
+
+_PRICE_INTENT = re.compile(r"\b(precio|precios|cuanto (cuesta|vale|valen|cuestan)|valor|cuesta|vale)\b")
+# Mensajes que piden algo más que el dato (cotizaciones, envíos, comparaciones) o que dependen
+# de la conversación
+_NEEDS_AGENT = re.compile(
+    r"\b(cotiz\w*|pdf|correo|email|compar\w*|recomiend\w*|mejor|diferencia\w*|"
+    r"eso|ese|esa|este|esta|anterior|otr[oa]s?)\b"
+)
+_PRICE_WORDS = {
+    "precio", "precios", "cuanto", "cuesta", "cuestan", "vale", "valen", "valor", "el", "la",
+    "los", "las", "de", "del", "en", "un", "una", "y", "que", "me", "por", "favor", "hola",
+    "quiero", "saber", "tienda", "tiendas", "a", "al", "para",
+}
+# Palabras de los nombres de producto que no distinguen un producto de otro
+_GENERIC_PRODUCT_WORDS = {"de", "y", "para", "sin", "con", "colgate", "palmolive"}
+
+
+class FastPathAnswer(NamedTuple):
+    """Respuesta del fast path: intención, texto y puntaje de la coincidencia."""
+
+    intent: str
+    answer: str
+    score: float
+
+
+def _words(text: str) -> set[str]:
+    return set(fold_text(text).replace("®", "").split())
+
+
+def _store_key(store: str) -> str:
+    """'LaRebajaVirtualCO' -> 'larebajavirtual'."""
+    key = store.lower()
+    return key[:-2] if key.endswith("co") else key
+
+
+class FastPath:
+    """
+    Emparejador local de preguntas frecuentes y de producto + tienda.
+
+    Attributes:
+        faq_threshold (float): Similitud mínima con una pregunta frecuente.
+        max_products (int): Máximo de productos listados en una respuesta.
+        min_coverage (float): Fracción mínima del nombre del producto cubierta por la consulta
+            cuando hay más de max_products candidatos.
+    """
+
+    def __init__(self, faq_threshold: float = 0.85, max_products: int = 3, min_coverage: float = 0.6):
+        self.faq_threshold = faq_threshold
+        self.max_products = max_products
+        self.min_coverage = min_coverage
+
+    def match(self, text: str) -> Optional[FastPathAnswer]:
+        """
+        Busca una respuesta de alta confianza para el mensaje.
+
+        Args:
+            text (str): Mensaje del usuario.
+
+        Returns:
+            FastPathAnswer | None: Respuesta, o None si el mensaje debe ir al agente.
+        """
+        folded = fold_text(text)
+        if not folded or _NEEDS_AGENT.search(folded):
+            return None
+        try:
+            if _PRICE_INTENT.search(folded):
+                return self._match_price(folded)
+            return self._match_faq(folded)
+        except (OSError, ValueError) as e:
+            logger.warning("Fast path data unavailable: %s", e)
+            return None
+
+    def _match_faq(self, folded: str) -> Optional[FastPathAnswer]:
+        best, best_score = None, 0.0
+        for faq in load_faqs():
+            score = SequenceMatcher(None, fold_text(faq["pregunta"]), folded).ratio()
+            if score > best_score:
+                best, best_score = faq, score
+        if best is None or best_score < self.faq_threshold:
+            return None
+        return FastPathAnswer("faq", best["respuesta"], best_score)
+
+    def _match_price(self, folded: str) -> Optional[FastPathAnswer]:
+        productos = load_prices().get("productos", [])
+        stores = {
+            _store_key(tienda["tienda"]): tienda["tienda"]
+            for producto in productos
+            for tienda in producto.get("precios_por_tienda", [])
+        }
+        query = set(folded.split()) - _PRICE_WORDS
+        store = None
+        for word in list(query):
+            matches = [name for key, name in stores.items() if len(word) >= 4 and word in key]
+            if len(matches) == 1:
+                store = matches[0]
+                query.discard(word)
+        terms = query - _GENERIC_PRODUCT_WORDS
+        if not terms:
+            return None
+
+        # Productos cuyo nombre contiene todas las palabras de la consulta. Con pocos se listan
+        # todos; con más, solo si uno solo tiene el nombre más corto y la consulta cubre la
+        # mayor parte de él
+        candidates = [p for p in productos if query <= _words(p.get("nombre", ""))]
+        if not candidates:
+            return None
+        sizes = [len(_words(p["nombre"])) for p in candidates]
+        score = len(query) / min(sizes)
+        if len(candidates) > self.max_products:
+            if sizes.count(min(sizes)) != 1 or score < self.min_coverage:
+                return None
+            candidates = [candidates[sizes.index(min(sizes))]]
+
+        lines = [self._format_product(producto, store) for producto in candidates]
+        if len(lines) == 1:
+            return FastPathAnswer("price", lines[0], score)
+        return FastPathAnswer("price", "\n".join(["Encontré estos productos:"] + [f"- {line}" for line in lines]), score)
+
+    @staticmethod
+    def _format_product(producto: dict, store: str = None) -> str:
+        tiendas = producto.get("precios_por_tienda", [])
+        if store:
+            tienda = next((t for t in tiendas if t["tienda"] == store), None)
+            if tienda is None:
+                return f"{producto['nombre']}: sin información en {store}."
+            if tienda.get("disponibilidad") != "Disponible" or not tienda.get("precio"):
+                return f"{producto['nombre']}: agotado en {store}."
+            return f"{producto['nombre']}: {tienda['precio_formateado']} en {store}."
+
+        disponibles = [t for t in tiendas if t.get("disponibilidad") == "Disponible" and t.get("precio")]
+        if not disponibles:
+            return f"{producto['nombre']}: sin precios disponibles en este momento."
+        mejor = min(disponibles, key=lambda t: t["precio"])
+        precios = ", ".join(
+            f"{t['tienda']} {t['precio_formateado']}" for t in sorted(disponibles, key=lambda t: t["precio"])
+        )
+        return f"{producto['nombre']}: desde {mejor['precio_formateado']} en {mejor['tienda']} ({precios})."
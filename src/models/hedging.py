@@ -0,0 +1,169 @@
+"""
+Hedging de llamadas al modelo para recortar la latencia de cola.
+Si el modelo principal no responde un paso del agente dentro de un retardo calculado a partir
+de un percentil de sus latencias recientes, el mismo paso se lanza en un modelo secundario de
+config/models.yaml; gana la primera respuesta y la otra llamada se cancela.
+
+Formato de la sección del YAML:
+
+    hedging:
+      secondary: gpt-5-mini     # modelo secundario (otro proveedor)
+      percentile: 95            # percentil de latencia del principal usado como retardo
+      min_delay_ms: 500         # límites del retardo
+      max_delay_ms: 5000        # retardo mientras no hay suficientes muestras
+      min_samples: 20
+      window: 200               # latencias recientes consideradas por modelo
+"""
+
+import asyncio
+import math
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langgraph.config import get_config
+
+from src.config.logger import get_logger
+from src.models.middleware import model_label
+from src.observability.metrics import HEDGE_EVENTS
+from src.observability.tracing import TRACER
+
+logger = get_logger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Retardo de hedging por modelo principal, a partir de una ventana de latencias recientes.
+    Se comparte entre todos los agentes de un ChatbotModel.
+
+    Attributes:
+        secondary (str): Modelo secundario del registro.
+        percentile (float): Percentil de latencia usado como retardo.
+        min_delay (float): Retardo mínimo en segundos.
+        max_delay (float): Retardo máximo en segundos (y retardo sin muestras suficientes).
+        min_samples (int): Muestras necesarias para usar el percentil.
+        window (int): Latencias recientes conservadas por modelo.
+    """
+
+    def __init__(
+        self,
+        secondary: str,
+        percentile: float = 95,
+        min_delay_ms: float = 500,
+        max_delay_ms: float = 5000,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        if not 0 < percentile <= 100:
+            raise ValueError("Hedging percentile must be in (0, 100]")
+        self.secondary = secondary
+        self.percentile = percentile
+        self.min_delay = min_delay_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_registry(cls, registry) -> Optional["HedgingPolicy"]:
+        """
+        Crea la política desde la sección hedging del registro de modelos.
+
+        Returns:
+            HedgingPolicy | None: Política configurada, o None si no hay modelo secundario.
+        """
+        config = dict(registry.hedging)
+        if not config.get("secondary"):
+            return None
+        config["secondary"] = registry.get(config["secondary"]).name
+        return cls(**config)
+
+    def observe(self, model: str, seconds: float) -> None:
+        """Registra la latencia de una llamada del modelo principal."""
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None:
+                latencies = self._latencies[model] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def delay(self, model: str) -> float:
+        """Segundos a esperar al modelo principal antes de lanzar el secundario."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(model, ()))
+        if len(latencies) < self.min_samples:
+            return self.max_delay
+        value = latencies[max(0, math.ceil(self.percentile / 100 * len(latencies)) - 1)]
+        return min(max(value, self.min_delay), self.max_delay)
+
+
+def _discard(task: asyncio.Task) -> None:
+    """Cancela una llamada perdedora sin dejar excepciones sin recuperar."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+class HedgingMiddleware(AgentMiddleware):
+    """
+    Hedging por paso del agente (cada llamada al modelo), solo en la ruta asíncrona.
+    La ruta síncrona llama al modelo principal sin hedging.
+    """
+
+    def __init__(self, policy: HedgingPolicy, secondary_model):
+        super().__init__()
+        self.policy = policy
+        self.secondary_model = secondary_model
+
+    def wrap_model_call(self, request, handler):
+        return handler(request)
+
+    async def awrap_model_call(self, request, handler):
+        # En streaming de tokens los fragmentos ya enviados no se pueden retirar
+        if not get_config().get("configurable", {}).get("hedging", True):
+            return await handler(request)
+
+        primary_label = model_label(request.model)
+        started = perf_counter()
+        primary = asyncio.create_task(handler(request))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.policy.delay(primary_label))
+            if done:
+                if primary.exception() is None:
+                    self.policy.observe(primary_label, perf_counter() - started)
+                    HEDGE_EVENTS.inc(model=primary_label, outcome="not_needed")
+                return primary.result()
+
+            with TRACER.span(
+                "llm.hedge", primary=primary_label, secondary=model_label(self.secondary_model)
+            ) as span:
+                secondary = asyncio.create_task(
+                    handler(request.override(model=self.secondary_model))
+                )
+                tasks.add(secondary)
+                winner = None
+                pending = set(tasks)
+                while pending and winner is None:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            winner = task
+                            break
+                        logger.warning(
+                            "Hedged %s call failed: %s",
+                            "primary" if task is primary else "secondary", task.exception(),
+                        )
+                if winner is None:
+                    raise primary.exception()
+                outcome = "primary" if winner is primary else "secondary"
+                # Si el principal pierde, su latencia real es al menos el tiempo transcurrido
+                self.policy.observe(primary_label, perf_counter() - started)
+                span.set_attribute("winner", outcome)
+                HEDGE_EVENTS.inc(model=primary_label, outcome=outcome)
+                return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    _discard(task)
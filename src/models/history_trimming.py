@@ -0,0 +1,220 @@
+"""
+Recorte del historial por presupuesto de tokens.
+Antes de cada llamada al modelo se conserva el turno en curso completo y, hacia atrás, los
+mensajes anteriores que quepan en el presupuesto. Una llamada a herramientas (AIMessage con
+tool_calls) y sus ToolMessage se conservan o se descartan juntos, para no enviar al modelo
+resultados sin su llamada ni llamadas sin resultado.
+
+El estado del agente guarda además el resumen acumulado de los turnos ya descartados
+(ver src/memory/conversation_summary.py), que se agrega al prompt de sistema de cada llamada.
+"""
+
+import json
+from typing import Annotated
+
+from typing_extensions import NotRequired
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain.agents.middleware.types import PrivateStateAttr
+from langchain.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from src.config.logger import get_logger
+from src.observability.metrics import HISTORY_TOKENS, HISTORY_TRIMMED_TOKENS
+from src.observability.tracing import TRACER
+
+logger = get_logger(__name__)
+
+# Mensajes descartados pendientes de resumir que se conservan en el estado
+MAX_PENDING_MESSAGES = 100
+
+
+class SummaryState(AgentState):
+    """Estado del agente con el resumen acumulado de la conversación."""
+
+    summary: NotRequired[Annotated[str, PrivateStateAttr]]
+    summary_version: NotRequired[Annotated[int, PrivateStateAttr]]
+    # Mensajes descartados por el recorte que aún no entran en el resumen
+    summary_pending: NotRequired[Annotated[list, PrivateStateAttr]]
+
+
+def _tiktoken_encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+class TokenCounter:
+    """
+    Tokens de un mensaje con tiktoken (cl100k_base) si está instalado o, si no, con una
+    estimación de caracteres / chars_per_token más un costo fijo por mensaje.
+    """
+
+    # Tokens de formato por mensaje (rol y separadores)
+    PER_MESSAGE = 3
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+        self._encoding = _tiktoken_encoding()
+
+    @property
+    def name(self) -> str:
+        return "tiktoken:cl100k_base" if self._encoding is not None else f"chars/{self.chars_per_token:g}"
+
+    def count(self, message) -> int:
+        if self._encoding is None:
+            return count_tokens_approximately(
+                [message], chars_per_token=self.chars_per_token, extra_tokens_per_message=self.PER_MESSAGE
+            )
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        tokens = len(self._encoding.encode(content)) + self.PER_MESSAGE
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tokens += len(self._encoding.encode(json.dumps(message.tool_calls, ensure_ascii=False)))
+        return tokens
+
+
+def _group_messages(messages: list) -> list[list]:
+    """
+    Agrupa el historial en unidades que se conservan o descartan juntas: cada AIMessage con
+    tool_calls va con sus ToolMessage. Los ToolMessage sin llamada en el historial se
+    descartan (el proveedor rechaza resultados huérfanos).
+    """
+    units, open_calls = [], {}
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            unit = open_calls.get(message.tool_call_id)
+            if unit is not None:
+                unit.append(message)
+            continue
+        unit = [message]
+        units.append(unit)
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                open_calls[call["id"]] = unit
+    return units
+
+
+def trim_to_budget(messages: list, max_tokens: int, counter: TokenCounter, keep_first: bool = True):
+    """
+    Mensajes del historial que caben en el presupuesto de tokens.
+
+    El turno en curso (desde el último HumanMessage) y un SystemMessage inicial se conservan
+    siempre, aunque superen el presupuesto. Los turnos anteriores se agregan del más reciente
+    al más antiguo mientras quepan, empezando siempre en un HumanMessage; con keep_first, el
+    primer mensaje de la conversación se conserva si aún cabe.
+
+    Args:
+        messages (list): Mensajes del estado del agente.
+        max_tokens (int): Presupuesto de tokens del historial (sin el prompt de sistema).
+        counter (TokenCounter): Contador de tokens.
+        keep_first (bool): Conserva el primer mensaje de la conversación si cabe.
+
+    Returns:
+        tuple: Mensajes conservados, tokens antes y tokens después del recorte.
+    """
+    units = _group_messages(messages)
+    sizes = [sum(counter.count(message) for message in unit) for unit in units]
+    before = sum(counter.count(message) for message in messages)
+    # Instrucciones de sistema al inicio del historial: no se recortan
+    pinned = 1 if units and isinstance(units[0][0], SystemMessage) else 0
+
+    start = len(units)
+    for index in range(len(units) - 1, pinned - 1, -1):
+        start = index
+        if isinstance(units[index][0], HumanMessage):
+            break
+    used = sum(sizes[:pinned]) + sum(sizes[start:])
+
+    # Turnos anteriores, del más reciente al más antiguo
+    oldest = start
+    for index in range(start - 1, pinned - 1, -1):
+        if used + sizes[index] > max_tokens:
+            break
+        used += sizes[index]
+        oldest = index
+    while oldest < start and not isinstance(units[oldest][0], HumanMessage):
+        used -= sizes[oldest]
+        oldest += 1
+
+    kept_units = units[oldest:]
+    if keep_first and oldest > pinned and used + sizes[pinned] <= max_tokens:
+        kept_units = [units[pinned]] + kept_units
+        used += sizes[pinned]
+    kept_units = units[:pinned] + kept_units
+    return [message for unit in kept_units for message in unit], before, used
+
+
+class HistoryTrimMiddleware(AgentMiddleware):
+    """
+    Recorta el historial del estado antes de cada llamada al modelo (ver trim_to_budget),
+    reporta los tokens ahorrados en /metrics y en la traza, y agrega el resumen acumulado de
+    la conversación al prompt de sistema.
+
+    Attributes:
+        max_tokens (int): Presupuesto de tokens del historial.
+        counter (TokenCounter): Contador de tokens.
+        keep_first (bool): Conserva el primer mensaje de la conversación si cabe.
+        collect_dropped (bool): Guarda los mensajes descartados en summary_pending para el
+            próximo resumen.
+    """
+
+    state_schema = SummaryState
+
+    def __init__(
+        self,
+        max_tokens: int,
+        chars_per_token: float = 4.0,
+        keep_first: bool = True,
+        collect_dropped: bool = False,
+    ):
+        super().__init__()
+        if max_tokens <= 0:
+            raise ValueError("History token budget must be positive")
+        self.max_tokens = max_tokens
+        self.counter = TokenCounter(chars_per_token)
+        self.keep_first = keep_first
+        self.collect_dropped = collect_dropped
+
+    def before_model(self, state, runtime):
+        messages = state["messages"]
+        kept, before, after = trim_to_budget(messages, self.max_tokens, self.counter, self.keep_first)
+        HISTORY_TOKENS.observe(after)
+        if len(kept) == len(messages):
+            return None
+        HISTORY_TRIMMED_TOKENS.observe(before - after)
+        with TRACER.span(
+            "history.trim",
+            messages_before=len(messages),
+            messages_after=len(kept),
+            tokens_before=before,
+            tokens_after=after,
+            counter=self.counter.name,
+        ):
+            logger.debug("History trimmed from %d to %d tokens (%d messages)", before, after, len(kept))
+        update = {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *kept]}
+        if self.collect_dropped:
+            kept_ids = {id(message) for message in kept}
+            dropped = [message for message in messages if id(message) not in kept_ids]
+            update["summary_pending"] = (state.get("summary_pending", []) + dropped)[-MAX_PENDING_MESSAGES:]
+        return update
+
+    async def abefore_model(self, state, runtime):
+        return self.before_model(state, runtime)
+
+    @staticmethod
+    def _with_summary(request):
+        summary = request.state.get("summary")
+        if not summary:
+            return request
+        context = f"Resumen de la conversación anterior:\n{summary}"
+        system_prompt = f"{request.system_prompt}\n\n{context}" if request.system_prompt else context
+        return request.override(system_prompt=system_prompt)
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._with_summary(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._with_summary(request))
@@ -0,0 +1,175 @@
+"""
+Middleware del agente LangChain.
+Envuelve las llamadas al modelo y a las herramientas para instrumentarlas sin modificar
+la lógica del agente.
+"""
+
+import asyncio
+import threading
+from time import perf_counter
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.messages import ToolMessage
+
+from src.observability.metrics import LLM_CALL_SECONDS, LLM_TOKENS, TOOL_CALL_SECONDS
+from src.observability.tracing import TRACER
+
+
+def model_label(model) -> str:
+    """Nombre legible del modelo de chat para etiquetas de métricas y logs."""
+    return str(getattr(model, "model", None) or getattr(model, "model_name", None) or type(model).__name__)
+
+
+def _last_message(response):
+    messages = getattr(response, "result", None) or [response]
+    return messages[-1]
+
+
+def _record_model_call(model: str, status: str, started: float, response=None) -> None:
+    LLM_CALL_SECONDS.observe(perf_counter() - started, model=model, status=status)
+    if response is None:
+        return
+    usage = getattr(_last_message(response), "usage_metadata", None)
+    if usage:
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="input")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), model=model, kind="output")
+
+
+def _tool_status(result) -> str:
+    return "error" if isinstance(result, ToolMessage) and result.status == "error" else "ok"
+
+
+class AgentMetricsMiddleware(AgentMiddleware):
+    """Registra latencia y tokens de cada llamada al modelo y latencia de cada herramienta."""
+
+    def wrap_model_call(self, request, handler):
+        model, started = model_label(request.model), perf_counter()
+        try:
+            response = handler(request)
+        except Exception:
+            _record_model_call(model, "error", started)
+            raise
+        _record_model_call(model, "ok", started, response)
+        return response
+
+    async def awrap_model_call(self, request, handler):
+        model, started = model_label(request.model), perf_counter()
+        try:
+            response = await handler(request)
+        except Exception:
+            _record_model_call(model, "error", started)
+            raise
+        _record_model_call(model, "ok", started, response)
+        return response
+
+    def wrap_tool_call(self, request, handler):
+        tool, started, status = request.tool_call["name"], perf_counter(), "error"
+        try:
+            result = handler(request)
+            status = _tool_status(result)
+            return result
+        finally:
+            TOOL_CALL_SECONDS.observe(perf_counter() - started, tool=tool, status=status)
+
+    async def awrap_tool_call(self, request, handler):
+        tool, started, status = request.tool_call["name"], perf_counter(), "error"
+        try:
+            result = await handler(request)
+            status = _tool_status(result)
+            return result
+        finally:
+            TOOL_CALL_SECONDS.observe(perf_counter() - started, tool=tool, status=status)
+
+
+def _annotate_model_span(span, response) -> None:
+    message = _last_message(response)
+    usage = getattr(message, "usage_metadata", None) or {}
+    span.set_attribute("llm.input_tokens", usage.get("input_tokens", 0))
+    span.set_attribute("llm.output_tokens", usage.get("output_tokens", 0))
+    span.set_attribute("llm.tool_calls", len(getattr(message, "tool_calls", None) or []))
+
+
+class AgentTracingMiddleware(AgentMiddleware):
+    """Abre un span por cada llamada al modelo y por cada herramienta dentro de la traza activa."""
+
+    def wrap_model_call(self, request, handler):
+        with TRACER.span("llm.call", model=model_label(request.model)) as span:
+            response = handler(request)
+            _annotate_model_span(span, response)
+            return response
+
+    async def awrap_model_call(self, request, handler):
+        with TRACER.span("llm.call", model=model_label(request.model)) as span:
+            response = await handler(request)
+            _annotate_model_span(span, response)
+            return response
+
+    def wrap_tool_call(self, request, handler):
+        with TRACER.span("tool.call", tool=request.tool_call["name"]) as span:
+            result = handler(request)
+            span.set_attribute("tool.status", _tool_status(result))
+            return result
+
+    async def awrap_tool_call(self, request, handler):
+        with TRACER.span("tool.call", tool=request.tool_call["name"]) as span:
+            result = await handler(request)
+            span.set_attribute("tool.status", _tool_status(result))
+            return result
+
+
+class ToolConcurrencyMiddleware(AgentMiddleware):
+    """
+    Limita las ejecuciones simultáneas de cada herramienta en todo el proceso (p. ej. una sola
+    conexión SMTP a la vez para email_quote_tool). Las llamadas de un mismo paso del agente ya
+    se ejecutan en paralelo (LangGraph lanza una tarea por llamada y aplica los ToolMessage en
+    el orden de las llamadas); este middleware solo hace esperar a las que superan el límite.
+    Se comparte entre los agentes de un ChatbotModel para que el límite sea global; las rutas
+    síncrona y async tienen cada una su límite.
+    """
+
+    def __init__(self, limits: dict[str, int]):
+        super().__init__()
+        self.limits = {name: limit for name, limit in limits.items() if limit > 0}
+        # Ruta síncrona (hilos) y ruta async (event loop) con semáforos propios: la espera
+        # async no ocupa hilos del executor
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in self.limits.items()}
+        self._async_loop = None
+        self._async_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _async_semaphore(self, name: str) -> asyncio.Semaphore | None:
+        """Semáforo async de la herramienta, ligado al event loop en curso."""
+        if name not in self.limits:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # Un asyncio.Semaphore solo sirve en el loop donde se usó; se recrean si cambia
+            # (la API usa un único loop)
+            self._async_loop = loop
+            self._async_semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+        return self._async_semaphores[name]
+
+    def wrap_tool_call(self, request, handler):
+        semaphore = self._semaphores.get(request.tool_call["name"])
+        if semaphore is None:
+            return handler(request)
+        if not semaphore.acquire(blocking=False):
+            with TRACER.span("tool.limit_wait", tool=request.tool_call["name"]):
+                semaphore.acquire()
+        try:
+            return handler(request)
+        finally:
+            semaphore.release()
+
+    async def awrap_tool_call(self, request, handler):
+        semaphore = self._async_semaphore(request.tool_call["name"])
+        if semaphore is None:
+            return await handler(request)
+        if semaphore.locked():
+            with TRACER.span("tool.limit_wait", tool=request.tool_call["name"]):
+                await semaphore.acquire()
+        else:
+            await semaphore.acquire()
+        try:
+            return await handler(request)
+        finally:
+            semaphore.release()
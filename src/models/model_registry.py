@@ -0,0 +1,222 @@
+"""
+Registro de modelos de chat configurados en config/models.yaml.
+Permite elegir el modelo por solicitud o por tenant, con un modelo por defecto.
+
+Formato del archivo:
+
+    default: gemini-2.5-flash
+    gemini:
+      models:
+        - gemini-2.5-flash
+    ollama:
+      models:
+        - qwen3:1.7b
+        - name: gemma3:1b
+          temperature: 0.2
+    tenants:
+      tienda-demo: qwen3:1.7b
+    router:
+      small: qwen3:1.7b
+
+Cada modelo puede ser un nombre o un dict con name, temperature, max_tokens, costo por millón
+de tokens (input_cost_per_mtok, output_cost_per_mtok) y opciones adicionales que se pasan al
+constructor del modelo. La sección router configura el enrutamiento por complejidad
+(ver src/controllers/model_router.py), la sección hedging, el hedging de llamadas al modelo
+(ver src/models/hedging.py) y la sección summary, el resumen acumulado de las conversaciones
+(ver src/memory/conversation_summary.py).
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import yaml
+from langchain.chat_models import init_chat_model
+
+from src.config.settings import settings
+
+# Sección del YAML -> proveedor de init_chat_model
+PROVIDERS = {
+    "gemini": "google_genai",
+    "google_genai": "google_genai",
+    "ollama": "ollama",
+    "openai": "openai",
+    "fake": "fake",
+}
+
+_RESERVED_KEYS = {"default", "tenants", "router", "hedging", "summary"}
+
+
+class ModelSpec(NamedTuple):
+    """Modelo configurado: nombre, proveedor y parámetros propios (opcionales)."""
+
+    name: str
+    provider: Optional[str]
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    options: Optional[dict] = None
+    input_cost_per_mtok: float = 0.0
+    output_cost_per_mtok: float = 0.0
+
+    @property
+    def id(self) -> str:
+        return f"{self.provider}:{self.name}" if self.provider else self.name
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Costo estimado (USD) de una cantidad de tokens con los precios configurados."""
+        return (
+            input_tokens * self.input_cost_per_mtok + output_tokens * self.output_cost_per_mtok
+        ) / 1_000_000
+
+
+class ModelRegistry:
+    """
+    Modelos disponibles, modelo por defecto y asignación de modelo por tenant.
+    Los modelos se identifican por su nombre (p. ej. 'qwen3:1.7b') o por 'proveedor:nombre'.
+    """
+
+    def __init__(
+        self,
+        specs: list[ModelSpec],
+        default: str = None,
+        tenants: dict = None,
+        router: dict = None,
+        hedging: dict = None,
+        summary: dict = None,
+    ):
+        if not specs:
+            raise ValueError("At least one model must be configured")
+        self._specs = {spec.name: spec for spec in specs}
+        self._by_id = {spec.id: spec for spec in specs}
+        self.default = self.get(default) if default else specs[0]
+        self.tenants = {tenant: self.get(name).name for tenant, name in (tenants or {}).items()}
+        self.router = dict(router or {})
+        self.hedging = dict(hedging or {})
+        self.summary = dict(summary or {})
+
+    @classmethod
+    def from_yaml(cls, path) -> "ModelRegistry":
+        """
+        Carga el registro desde un archivo YAML (ver formato en el docstring del módulo).
+
+        Args:
+            path: Ruta del archivo.
+
+        Returns:
+            ModelRegistry: Registro cargado.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+
+        specs = []
+        for section, body in config.items():
+            if section in _RESERVED_KEYS:
+                continue
+            if section not in PROVIDERS:
+                raise ValueError(f"Unknown model provider '{section}' in {path}")
+            for entry in (body or {}).get("models", []):
+                if isinstance(entry, str):
+                    entry = {"name": entry}
+                entry = dict(entry)
+                specs.append(ModelSpec(
+                    name=str(entry.pop("name")),
+                    provider=PROVIDERS[section],
+                    temperature=entry.pop("temperature", None),
+                    max_tokens=entry.pop("max_tokens", None),
+                    input_cost_per_mtok=float(entry.pop("input_cost_per_mtok", 0.0)),
+                    output_cost_per_mtok=float(entry.pop("output_cost_per_mtok", 0.0)),
+                    options=entry or None,
+                ))
+        return cls(
+            specs,
+            default=config.get("default"),
+            tenants=config.get("tenants"),
+            router=config.get("router"),
+            hedging=config.get("hedging"),
+            summary=config.get("summary"),
+        )
+
+    @classmethod
+    def from_model_id(cls, model_id: str) -> "ModelRegistry":
+        """
+        Registro de un solo modelo a partir de 'proveedor:nombre' (p. ej. 'google_genai:gemini-2.5-flash').
+        Sin proveedor conocido, init_chat_model lo infiere del nombre (p. ej. 'gpt-4o').
+        """
+        provider, _, name = model_id.partition(":")
+        if name and provider in PROVIDERS.values():
+            return cls([ModelSpec(name=name, provider=provider)])
+        return cls([ModelSpec(name=model_id, provider=None)])
+
+    def get(self, model: str) -> ModelSpec:
+        """
+        Busca un modelo por nombre o por 'proveedor:nombre'.
+
+        Raises:
+            ValueError: Si el modelo no está configurado.
+        """
+        spec = self._specs.get(model) or self._by_id.get(model)
+        if spec is None:
+            raise ValueError(f"Modelo no configurado: '{model}'. Disponibles: {', '.join(self._specs)}")
+        return spec
+
+    def resolve(self, model: str = None, tenant: str = None) -> str:
+        """
+        Nombre del modelo a usar: el solicitado, el del tenant o el modelo por defecto.
+
+        Args:
+            model (str, opcional): Modelo solicitado.
+            tenant (str, opcional): Tenant de la solicitud.
+
+        Returns:
+            str: Nombre del modelo.
+
+        Raises:
+            ValueError: Si el modelo solicitado no está configurado.
+        """
+        if model:
+            return self.get(model).name
+        if tenant and tenant in self.tenants:
+            return self.tenants[tenant]
+        return self.default.name
+
+    @property
+    def specs(self) -> list[ModelSpec]:
+        return list(self._specs.values())
+
+    def __contains__(self, model: str) -> bool:
+        return model in self._specs or model in self._by_id
+
+
+def create_chat_model(spec: ModelSpec, temperature: float, max_tokens: int, timeout: int):
+    """
+    Instancia el modelo de chat de un ModelSpec.
+
+    Args:
+        spec (ModelSpec): Modelo configurado.
+        temperature (float): Temperatura.
+        max_tokens (int): Máximo de tokens en la respuesta.
+        timeout (int): Tiempo máximo de espera para la respuesta.
+
+    Returns:
+        BaseChatModel: Modelo de chat de LangChain.
+    """
+    options = dict(spec.options or {})
+    if spec.provider == "fake":
+        from src.models.fake_chat_model import FakeChatModel
+
+        return FakeChatModel(model=spec.name, temperature=temperature, max_tokens=max_tokens, **options)
+    if spec.provider == "ollama":
+        options.setdefault("base_url", settings.OLLAMA_API_URL)
+    return init_chat_model(
+        spec.id,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        **options,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_model_registry() -> ModelRegistry:
+    """Registro de modelos cargado desde MODELS_CONFIG_PATH."""
+    return ModelRegistry.from_yaml(Path(settings.MODELS_CONFIG_PATH))
@@ -0,0 +1,90 @@
+"""
+Compactación de resultados de herramientas en el estado persistido.
+Al terminar cada ejecución del agente (con la respuesta final ya generada), el contenido de los
+ToolMessage de turnos anteriores que supera un máximo de caracteres se reemplaza por su inicio y
+una referencia (herramienta, tamaño y digest). Los ToolMessage conservan su id y tool_call_id,
+de modo que cada llamada a herramientas sigue teniendo su resultado, y el checkpoint de la
+conversación no crece con cada resultado de retrieve_tool o price_tool.
+"""
+
+import hashlib
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.messages import HumanMessage, ToolMessage
+
+from src.observability.metrics import TOOL_RESULT_CHARS_SAVED, TOOL_RESULTS_COMPACTED
+
+# Marca de un contenido ya compactado
+COMPACTED_TAG = "resultado compactado"
+
+
+def compact_tool_content(message: ToolMessage, max_chars: int) -> str | None:
+    """
+    Contenido compactado de un ToolMessage.
+
+    Args:
+        message (ToolMessage): Resultado de herramienta.
+        max_chars (int): Caracteres del contenido original que se conservan.
+
+    Returns:
+        str | None: Nuevo contenido, o None si el mensaje no necesita compactarse.
+    """
+    content = message.content
+    if not isinstance(content, str) or len(content) <= max_chars or COMPACTED_TAG in content[-100:]:
+        return None
+    digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+    head = content[:max_chars].rstrip()
+    return f"{head}… [{COMPACTED_TAG} de {message.name or 'herramienta'}: {len(content)} caracteres, sha1:{digest}]"
+
+
+def compact_tool_messages(messages: list, max_chars: int, keep_turns: int = 1) -> list:
+    """
+    ToolMessage compactados de los turnos anteriores a los últimos keep_turns.
+
+    Args:
+        messages (list): Mensajes del estado del agente.
+        max_chars (int): Caracteres del contenido original que se conservan.
+        keep_turns (int): Turnos más recientes (desde un HumanMessage) que no se compactan.
+
+    Returns:
+        list: Copias de los ToolMessage compactados, con el mismo id (reemplazan al original).
+    """
+    human_indexes = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if len(human_indexes) <= keep_turns:
+        return []
+    boundary = human_indexes[-keep_turns] if keep_turns > 0 else len(messages)
+
+    compacted = []
+    for message in messages[:boundary]:
+        if not isinstance(message, ToolMessage):
+            continue
+        content = compact_tool_content(message, max_chars)
+        if content is None:
+            continue
+        TOOL_RESULTS_COMPACTED.inc(tool=message.name or "unknown")
+        TOOL_RESULT_CHARS_SAVED.inc(len(message.content) - len(content), tool=message.name or "unknown")
+        compacted.append(message.model_copy(update={"content": content}))
+    return compacted
+
+
+class ToolResultCompactionMiddleware(AgentMiddleware):
+    """
+    Compacta los resultados de herramientas de turnos anteriores al final de cada ejecución
+    del agente (ver compact_tool_messages).
+
+    Attributes:
+        max_chars (int): Caracteres del contenido original que se conservan.
+        keep_turns (int): Turnos más recientes cuyos resultados se conservan completos.
+    """
+
+    def __init__(self, max_chars: int = 300, keep_turns: int = 1):
+        super().__init__()
+        self.max_chars = max_chars
+        self.keep_turns = keep_turns
+
+    def after_agent(self, state, runtime):
+        compacted = compact_tool_messages(state["messages"], self.max_chars, self.keep_turns)
+        return {"messages": compacted} if compacted else None
+
+    async def aafter_agent(self, state, runtime):
+        return self.after_agent(state, runtime)
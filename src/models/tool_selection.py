@@ -0,0 +1,98 @@
+"""
+Selección de herramientas por turno.
+Cada llamada al modelo envía el esquema de todas las herramientas; este middleware expone solo
+las relevantes para el turno en curso: las de cotización una vez iniciado el flujo de
+cotización y la búsqueda en la base de conocimiento solo para preguntas abiertas.
+"""
+
+import re
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.memory.semantic_cache import fold_text
+
+# Herramientas del flujo de cotización
+QUOTE_TOOLS = ("calculator_tool", "pdf_quote_tool", "email_quote_tool", "quote_pipeline_tool")
+# Herramientas que siempre se exponen
+BASE_TOOLS = ("faq_tool", "price_tool")
+RETRIEVAL_TOOL = "retrieve_tool"
+
+_QUOTE_MARKERS = re.compile(
+    r"\b(cotiz\w*|pdf|correo|email|envi\w*|compr\w*|unidades|cantidad\w*)\b"
+)
+_PRICE_INTENT = re.compile(r"\b(precio|precios|cuanto (cuesta|vale|valen|cuestan)|valor|cuesta|vale)\b")
+_GREETING = re.compile(r"^(hola|buen[oa]s?( dias| tardes| noches)?|gracias|ok|listo|perfecto|chao|adios)\b")
+# Respuesta de faq_tool sin coincidencia: la pregunta pasa a la base de conocimiento
+_FAQ_MISS = "no encontré una pregunta similar"
+
+
+def _current_turn(messages: list) -> tuple[str, list]:
+    """Texto del último mensaje del usuario y los mensajes posteriores (pasos del turno)."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            content = messages[index].content
+            return (content if isinstance(content, str) else str(content)), messages[index + 1:]
+    return "", []
+
+
+def _tools_called(messages: list) -> set[str]:
+    names = set()
+    for message in messages:
+        if isinstance(message, AIMessage):
+            names.update(call["name"] for call in message.tool_calls)
+    return names
+
+
+def select_tools(messages: list, available: list[str]) -> list[str]:
+    """
+    Herramientas a exponer en la próxima llamada al modelo.
+
+    Args:
+        messages (list): Mensajes del estado del agente (historial recortado y turno en curso).
+        available (list[str]): Herramientas del agente.
+
+    Returns:
+        list[str]: Nombres de las herramientas seleccionadas, en el orden de available.
+    """
+    text, turn = _current_turn(messages)
+    folded = fold_text(text)
+    called = _tools_called(messages)
+
+    selected = set(BASE_TOOLS)
+    quote_flow = (
+        "@" in text
+        or any(_QUOTE_MARKERS.search(fold_text(str(m.content))) for m in messages if isinstance(m, HumanMessage))
+        or bool(called & set(QUOTE_TOOLS))
+    )
+    if quote_flow:
+        selected.update(QUOTE_TOOLS)
+
+    faq_missed = any(
+        isinstance(m, ToolMessage) and m.name == "faq_tool" and _FAQ_MISS in str(m.content).lower()
+        for m in turn
+    )
+    greeting = _GREETING.match(folded) is not None and len(folded.split()) <= 3
+    open_question = not (_PRICE_INTENT.search(folded) or greeting or quote_flow)
+    if open_question or faq_missed:
+        selected.add(RETRIEVAL_TOOL)
+
+    # Las herramientas ya llamadas en el historial siguen disponibles para sus respuestas
+    selected.update(called)
+    return [name for name in available if name in selected]
+
+
+class ToolSelectionMiddleware(AgentMiddleware):
+    """Reduce request.tools a las herramientas relevantes para el turno (ver select_tools)."""
+
+    def _select(self, request):
+        available = [tool.name for tool in request.tools if hasattr(tool, "name")]
+        names = set(select_tools(request.messages, available))
+        tools = [tool for tool in request.tools if not hasattr(tool, "name") or tool.name in names]
+        return request.override(tools=tools)
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._select(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._select(request))
@@ -0,0 +1,238 @@
+"""
+Métricas de la aplicación en formato de exposición de Prometheus.
+Registro mínimo en proceso (contadores, gauges e histogramas con etiquetas) pensado para
+ser barato en el camino crítico: cada observación es una búsqueda en dict bajo un lock.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Optional
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 16000, 32000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names + extra[:1], values + extra[1:])]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, etiquetas y valores por combinación de etiquetas."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Valor instantáneo; puede fijarse o calcularse al exponer con set_function."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], dict]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], dict]) -> None:
+        """
+        Calcula los valores al momento de exponer las métricas.
+
+        Args:
+            function (Callable): Retorna {tupla de valores de etiquetas: valor}.
+        """
+        self._function = function
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if self._function is not None:
+            items.extend(self._function().items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos, suma y conteo."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [conteos por bucket (+Inf al final), suma]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observa la duración (en segundos) del bloque, incluso si lanza una excepción."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, **labels)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, ("le", le))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Colección de métricas que se exponen juntas en /metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Serializa todas las métricas en el formato de texto de Prometheus."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_http_request_duration_seconds", "Duración de las solicitudes HTTP.", ("route", "method", "status")
+))
+TURN_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_turn_duration_seconds", "Duración de un turno del agente.", ("mode",)
+))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_llm_call_duration_seconds", "Duración de cada llamada al modelo.", ("model", "status")
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "chatbot_llm_tokens_total", "Tokens consumidos por el modelo.", ("model", "kind")
+))
+TOOL_CALL_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_tool_call_duration_seconds", "Duración de cada llamada a herramienta.", ("tool", "status")
+))
+RETRIEVAL_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_retrieval_duration_seconds", "Duración de la búsqueda vectorial por etapa.", ("stage",)
+))
+EMBEDDING_CALLS = REGISTRY.register(Counter(
+    "chatbot_embedding_calls_total", "Llamadas al proveedor de embeddings.", ("source",)
+))
+CHECKPOINT_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_checkpoint_duration_seconds", "Duración de lecturas y escrituras del checkpointer.", ("op",)
+))
+ROUTER_DECISIONS = REGISTRY.register(Counter(
+    "chatbot_router_decisions_total", "Decisiones del router de modelos.", ("route", "reason")
+))
+ROUTER_FALLBACKS = REGISTRY.register(Counter(
+    "chatbot_router_fallbacks_total", "Turnos del modelo pequeño repetidos con el grande.", ("reason",)
+))
+ROUTER_TURN_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_router_turn_duration_seconds", "Duración de los turnos enrutados.", ("route", "fallback")
+))
+# Costo estimado de los turnos enrutados (actual) y el que habrían tenido con el modelo
+# grande (baseline); el ahorro es baseline - actual
+ROUTER_COST_USD = REGISTRY.register(Counter(
+    "chatbot_router_cost_usd_total", "Costo estimado (USD) de los turnos enrutados.", ("kind",)
+))
+HEDGE_EVENTS = REGISTRY.register(Counter(
+    "chatbot_llm_hedge_total",
+    "Pasos del agente según el resultado del hedging (not_needed, primary, secondary).",
+    ("model", "outcome"),
+))
+FAST_PATH_ANSWERS = REGISTRY.register(Counter(
+    "chatbot_fast_path_answers_total", "Turnos respondidos sin el LLM por el fast path.", ("intent",)
+))
+HISTORY_TOKENS = REGISTRY.register(Histogram(
+    "chatbot_history_tokens", "Tokens del historial enviado en cada llamada al modelo.", buckets=TOKEN_BUCKETS
+))
+HISTORY_TRIMMED_TOKENS = REGISTRY.register(Histogram(
+    "chatbot_history_trimmed_tokens",
+    "Tokens del historial descartados por el recorte por presupuesto.",
+    buckets=TOKEN_BUCKETS,
+))
+SUMMARY_RUNS = REGISTRY.register(Counter(
+    "chatbot_summary_runs_total",
+    "Actualizaciones del resumen de conversación (written, skipped, stale, error).",
+    ("outcome",),
+))
+SUMMARY_SECONDS = REGISTRY.register(Histogram(
+    "chatbot_summary_duration_seconds", "Duración de la generación de un resumen de conversación."
+))
+TOOL_RESULTS_COMPACTED = REGISTRY.register(Counter(
+    "chatbot_tool_results_compacted_total", "Resultados de herramientas compactados en el checkpoint.", ("tool",)
+))
+TOOL_RESULT_CHARS_SAVED = REGISTRY.register(Counter(
+    "chatbot_tool_result_chars_saved_total",
+    "Caracteres de resultados de herramientas eliminados del checkpoint por la compactación.",
+    ("tool",),
+))
+CHECKPOINT_RETENTION_ROWS = REGISTRY.register(Counter(
+    "chatbot_checkpoint_retention_rows_total",
+    "Filas borradas por la retención de checkpoints, por tabla y motivo (keep_last, ttl).",
+    ("table", "reason"),
+))
+CHECKPOINT_RETENTION_RUNS = REGISTRY.register(Counter(
+    "chatbot_checkpoint_retention_runs_total",
+    "Ejecuciones de la retención de checkpoints (ok, locked, error).",
+    ("outcome",),
+))
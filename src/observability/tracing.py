@@ -0,0 +1,336 @@
+"""
+Trazas por solicitud (span trees) para depurar latencias de cola.
+El contexto de traza viaja en un ContextVar, por lo que se propaga solo a través de
+await, tareas de asyncio y los hilos del executor de LangGraph (que copian el contexto).
+Los spans terminados se exportan en un hilo de fondo: consola, JSONL u OTLP/HTTP (JSON).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+
+from src.config.settings import settings
+from src.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Span:
+    """Operación con nombre, tiempos y atributos dentro de una traza."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: dict = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Span de una solicitud no muestreada: no registra nada."""
+
+    trace_id = None
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """
+    Interpreta un encabezado W3C traceparent.
+
+    Returns:
+        tuple | None: (trace_id, parent_span_id, sampled) o None si el encabezado no es válido.
+    """
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class ConsoleSpanExporter:
+    """Escribe cada span terminado en el log (desarrollo local)."""
+
+    def export(self, spans: list[dict]) -> None:
+        for span in spans:
+            logger.info(
+                "span %s trace=%s span=%s parent=%s %.1fms status=%s %s",
+                span["name"], span["trace_id"], span["span_id"], span["parent_id"],
+                span["duration_ms"], span["status"], span["attributes"],
+            )
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlSpanExporter:
+    """Agrega cada span terminado como una línea JSON en un archivo."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: list[dict]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpSpanExporter:
+    """Envía spans a un colector OpenTelemetry por OTLP/HTTP con codificación JSON."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def _payload(self, spans: list[dict]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "chatbot"},
+                    "spans": [{
+                        "traceId": span["trace_id"],
+                        "spanId": span["span_id"],
+                        "parentSpanId": span["parent_id"] or "",
+                        "name": span["name"],
+                        "kind": 1,
+                        "startTimeUnixNano": str(span["start_ns"]),
+                        "endTimeUnixNano": str(span["end_ns"]),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)}
+                            for key, value in span["attributes"].items()
+                        ],
+                        "status": (
+                            {"code": 2, "message": span["error"] or ""}
+                            if span["status"] == "error" else {"code": 1}
+                        ),
+                    } for span in spans],
+                }],
+            }],
+        }
+
+    def export(self, spans: list[dict]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self._payload(spans), default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    """
+    Cola acotada de spans terminados que un hilo de fondo exporta por lotes, para que
+    la exportación (archivo o red) nunca ocurra en el camino de la solicitud.
+    Si la cola se llena, los spans se descartan.
+    """
+
+    def __init__(self, exporter, max_queue: int = 4096, max_batch: int = 256, interval: float = 2.0):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> list[dict]:
+        batch = []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _export(self, batch: list[dict]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning("Span export failed (%d spans): %s", len(batch), e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.interval)
+            while batch := self._drain():
+                self._export(batch)
+
+    def shutdown(self) -> None:
+        """Detiene el hilo y exporta los spans pendientes."""
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 5)
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """
+    Crea trazas raíz (una por solicitud, según el muestreo) y spans hijos de la traza activa.
+    Fuera de una traza muestreada, span() no hace nada más que una lectura del ContextVar.
+    """
+
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None, sample_rate: float = 0.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def _should_sample(self, force: bool, parent_sampled: Optional[bool]) -> bool:
+        if force or parent_sampled:
+            return True
+        if parent_sampled is False:
+            return False
+        return random.random() < self.sample_rate
+
+    @contextmanager
+    def _activate(self, span: Span):
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Generadores asíncronos cerrados desde otro contexto
+                _current_span.set(None)
+            self.processor.submit(span)
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: str = None, force: bool = False, **attributes):
+        """
+        Inicia la traza raíz de una solicitud.
+
+        Args:
+            name (str): Nombre del span raíz.
+            traceparent (str, opcional): Encabezado W3C entrante; la traza continúa la del llamador.
+            force (bool): Muestrea la traza sin importar la tasa configurada.
+            **attributes: Atributos del span raíz.
+
+        Yields:
+            Span: Span raíz, o un span vacío si la solicitud no se muestrea.
+        """
+        parent = parse_traceparent(traceparent)
+        trace_id, parent_id, parent_sampled = parent if parent else (None, None, None)
+        if not self.enabled or not self._should_sample(force, parent_sampled):
+            yield NOOP_SPAN
+            return
+        span = Span(name, trace_id or os.urandom(16).hex(), parent_id, attributes)
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Abre un span hijo del span activo; no hace nada si no hay una traza muestreada.
+
+        Yields:
+            Span: Span abierto (o un span vacío).
+        """
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        with self._activate(Span(name, parent.trace_id, parent.span_id, attributes)) as span:
+            yield span
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def current_span():
+    """Span activo en el contexto actual (o un span vacío)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def _build_tracer() -> Tracer:
+    exporters = {
+        "console": lambda: ConsoleSpanExporter(),
+        "jsonl": lambda: JsonlSpanExporter(settings.TRACE_JSONL_PATH),
+        "otlp": lambda: OtlpHttpSpanExporter(settings.TRACE_OTLP_ENDPOINT, settings.TRACE_SERVICE_NAME),
+    }
+    name = settings.TRACE_EXPORTER.lower()
+    if name not in exporters:
+        if name != "none":
+            logger.warning("Unknown TRACE_EXPORTER %r; tracing disabled", settings.TRACE_EXPORTER)
+        return Tracer()
+    return Tracer(BatchSpanProcessor(exporters[name]()), sample_rate=settings.TRACE_SAMPLE_RATE)
+
+
+TRACER = _build_tracer()
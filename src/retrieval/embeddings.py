@@ -6,7 +6,6 @@ import os
 from typing import Optional
 
 from langchain_core.embeddings import Embeddings
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 
 def get_embeddings(model: Optional[str] = None) -> Embeddings:
@@ -18,6 +17,9 @@ def get_embeddings(model: Optional[str] = None) -> Embeddings:
     Returns:
         A LangChain Embeddings implementation backed by Google Generative AI.
     """
+    # Import diferido: langchain_google_genai es costoso de importar
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
     model = model or os.getenv("RAG_EMBEDDINGS_MODEL", "models/text-embedding-004")
     task_type = "SEMANTIC_SIMILARITY"  # e.g., "SEMANTIC_SIMILARITY"
     if not os.getenv("GOOGLE_API_KEY"):
@@ -18,6 +18,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from .vector_store import get_chroma
+from .kb_version import bump_kb_version
 
 DEFAULT_COLLECTION = 'colgate_palmolive_kb_gemini_full'
 VECTOR_DB_PATH: str = "./data/vector_db"
@@ -88,6 +89,7 @@ def main() -> None:
     )
     
     vectorstore.add_texts(texts=texts, metadatas=metadatas)
+    bump_kb_version(DEFAULT_COLLECTION)
     
     print(f"Successfully ingested {len(texts)} chunks into '{DEFAULT_COLLECTION}'.")
 
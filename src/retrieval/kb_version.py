@@ -0,0 +1,80 @@
+"""
+Versión de la base de conocimiento.
+Permite a los cachés de respuestas detectar cuándo se re-ingestó Chroma o cambiaron los datos
+de precios/FAQ, para invalidarse automáticamente.
+
+La versión de Chroma se guarda en la metadata de la colección, en el mismo servidor que
+consultan todas las instancias de la API; los datos de precios/FAQ son archivos locales.
+"""
+
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.config.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+QA_DIR = Path(__file__).parent.parent.parent / "data" / "qa"
+WATCHED_FILES = (QA_DIR / "prices.json", QA_DIR / "faq.json")
+# Clave de la metadata de la colección con la versión de la última ingesta
+KB_VERSION_KEY = "kb_version"
+
+
+def bump_kb_version(collection: str = None) -> str:
+    """
+    Marca una nueva versión de la base de conocimiento (llamar tras cada ingesta).
+
+    Args:
+        collection (str, opcional): Colección de Chroma. Por defecto, DEFAULT_COLLECTION.
+
+    Returns:
+        str: Nueva versión.
+    """
+    from src.retrieval.vector_store import get_chroma_client
+
+    target = get_chroma_client().get_collection(collection or settings.DEFAULT_COLLECTION)
+    version = datetime.now(timezone.utc).isoformat()
+    # modify reemplaza la metadata completa: se conserva la existente salvo la configuración
+    # del índice (hnsw:*), que Chroma no permite modificar
+    metadata = {key: value for key, value in (target.metadata or {}).items() if not key.startswith("hnsw:")}
+    target.modify(metadata={**metadata, KB_VERSION_KEY: version})
+    return version
+
+
+def read_kb_version(collection: str = None) -> Optional[str]:
+    """
+    Versión de la base de conocimiento registrada en la colección de Chroma.
+
+    Args:
+        collection (str, opcional): Colección de Chroma. Por defecto, DEFAULT_COLLECTION.
+
+    Returns:
+        Optional[str]: Versión, o None si no hay versión o Chroma no responde (desconocida).
+    """
+    from src.retrieval.vector_store import get_chroma_client
+
+    try:
+        target = get_chroma_client().get_collection(collection or settings.DEFAULT_COLLECTION)
+    except Exception as e:
+        logger.debug("Could not read the knowledge base version from Chroma: %s", e)
+        return None
+    return (target.metadata or {}).get(KB_VERSION_KEY)
+
+
+def kb_fingerprint() -> tuple:
+    """
+    Huella de la versión actual de la base de conocimiento.
+
+    Returns:
+        tuple: Versión de la colección de Chroma y mtime (ns) de cada archivo vigilado
+            (None si no existe).
+    """
+    fingerprint = [read_kb_version()]
+    for path in WATCHED_FILES:
+        try:
+            fingerprint.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
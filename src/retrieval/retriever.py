@@ -11,6 +11,8 @@ try:
 except Exception:  # fallback if logger isn't available early
     _logger = None
 
+from src.observability.metrics import EMBEDDING_CALLS, RETRIEVAL_SECONDS
+from src.observability.tracing import TRACER
 from .vector_store import get_chroma
 DEFAULT_COLLECTION = 'colgate_palmolive_kb_gemini_full'
 DEFAULT_PERSIST_DIR: str = "./data/vector_db"
@@ -33,7 +35,17 @@ def search(
     chroma = get_chroma(collection=DEFAULT_COLLECTION, persist_dir=DEFAULT_PERSIST_DIR)
 
     filt = {"type": filter_type} if filter_type else None
-    results = chroma.similarity_search_with_score(query, k=top_k, filter=filt)
+    # Embed and query separately so each stage is timed (same distances as
+    # similarity_search_with_score)
+    with TRACER.span("retriever.search", top_k=top_k, filter_type=filter_type or "") as span:
+        with TRACER.span("retriever.embedding"), RETRIEVAL_SECONDS.time(stage="embedding"):
+            embedding = chroma.embeddings.embed_query(query)
+        EMBEDDING_CALLS.inc(source="retrieval")
+        with TRACER.span("retriever.query"), RETRIEVAL_SECONDS.time(stage="query"):
+            results = chroma.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=top_k, filter=filt
+            )
+        span.set_attribute("results", len(results))
 
     output: List[Dict] = []
     for doc, score in results:
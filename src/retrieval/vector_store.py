@@ -15,6 +15,7 @@ from .embeddings import get_embeddings
 
 # Cachés en memoria del proceso para evitar recrear objetos por consulta
 _EMBEDDINGS_SINGLETON = None
+_CLIENT_SINGLETON = None
 _CHROMA_CACHE: Dict[Tuple[str, str], Chroma] = {}
 
 
@@ -25,6 +26,16 @@ def _get_embeddings_cached():
     return _EMBEDDINGS_SINGLETON
 
 
+def get_chroma_client():
+    """Cliente HTTP del servidor de Chroma, compartido por las colecciones del proceso."""
+    global _CLIENT_SINGLETON
+    if _CLIENT_SINGLETON is None:
+        import chromadb
+
+        _CLIENT_SINGLETON = chromadb.HttpClient(host="localhost", port=8000, ssl=False)
+    return _CLIENT_SINGLETON
+
+
 def get_chroma(
     collection: Optional[str] = None, persist_dir: Optional[str] = None
 ) -> Chroma:
@@ -37,8 +48,8 @@ def get_chroma(
     Returns:
         Chroma instance connected to the persistent collection.
     """
-    collection = collection or DEFAULT_COLLECTION
-    persist_dir = persist_dir or DEFAULT_PERSIST_DIR
+    collection = collection or settings.DEFAULT_COLLECTION
+    persist_dir = persist_dir or settings.VECTOR_DB_PATH
     Path(persist_dir).mkdir(parents=True, exist_ok=True)
 
     key = (collection, persist_dir)
@@ -49,9 +60,7 @@ def get_chroma(
     store = Chroma(
         collection_name=collection,
         embedding_function=embeddings,
-        host="localhost",
-        port=8000,
-        ssl=False
+        client=get_chroma_client(),
     )
     _CHROMA_CACHE[key] = store
     return store
@@ -59,6 +68,6 @@ def get_chroma(
 
 def preload_vector_store(
     collection: Optional[str] = None, persist_dir: Optional[str] = None
-) -> None:
-    """Inicializa en memoria el vector store por defecto para esta sesión de proceso."""
-    get_chroma(collection=collection, persist_dir=persist_dir)
+) -> Chroma:
+    """Inicializa en memoria el vector store por defecto (y su cliente de embeddings) para esta sesión de proceso."""
+    return get_chroma(collection=collection, persist_dir=persist_dir)
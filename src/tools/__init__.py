@@ -1,25 +1,101 @@
-from src.tools.faq_tool import faq_tool
-from src.tools.retrieve_tool import retrieve_tool
-from src.tools.price_tool import price_tool
-from src.tools.calculator_tool import calculator_tool
-from src.tools.pdf_quote_tool import pdf_quote_tool
-from src.tools.email_quote_tool import email_quote_tool
-
-AVAILABLE_TOOLS = [
-    faq_tool,
-    retrieve_tool,
-    price_tool,
-    calculator_tool,
-    pdf_quote_tool,
-    email_quote_tool,
-]
-
-
-def get_tools():
+"""
+Registro perezoso de herramientas del agente.
+Cada herramienta se importa la primera vez que se solicita, y los módulos de herramientas
+difieren sus dependencias pesadas (reportlab, smtplib, Chroma, embeddings) hasta ejecutarse,
+de modo que importar la API no carga código que un worker quizá nunca use.
+"""
+
+from importlib import import_module
+
+# Nombre de la herramienta -> módulo que la define (en el orden que ve el agente)
+TOOL_MODULES = {
+    "faq_tool": "src.tools.faq_tool",
+    "retrieve_tool": "src.tools.retrieve_tool",
+    "price_tool": "src.tools.price_tool",
+    "calculator_tool": "src.tools.calculator_tool",
+    "pdf_quote_tool": "src.tools.pdf_quote_tool",
+    "email_quote_tool": "src.tools.email_quote_tool",
+    "quote_pipeline_tool": "src.tools.quote_pipeline_tool",
+}
+
+# Pasos de cotización que quote_pipeline_tool reemplaza en una sola llamada
+QUOTE_STEP_TOOLS = ("calculator_tool", "pdf_quote_tool", "email_quote_tool")
+
+
+# Descripciones cortas que ve el modelo en el esquema de cada herramienta. Los docstrings de
+# las herramientas quedan como documentación para desarrolladores
+COMPACT_DESCRIPTIONS = {
+    "faq_tool": "Responde preguntas frecuentes sobre Colgate-Palmolive (historia, CEO, sedes, horarios, contacto).",
+    "retrieve_tool": (
+        "Búsqueda semántica en la base de conocimiento de productos y de la empresa. "
+        "Para preguntas abiertas o si faq_tool no encuentra respuesta. filter_type: 'product' o 'company'."
+    ),
+    "price_tool": "Precios y disponibilidad de un producto por tienda (store opcional, p. ej. 'ExitoCO').",
+    "calculator_tool": "Calcula subtotales (precio x cantidad) y el total de una cotización. Retorna JSON.",
+    "pdf_quote_tool": "Genera el PDF de una cotización ya calculada. Retorna la ruta del archivo.",
+    "email_quote_tool": "Envía por correo una cotización con su PDF adjunto (requiere pdf_path de pdf_quote_tool).",
+    "quote_pipeline_tool": (
+        "Cotización completa en una llamada: productos por sku o nombre y cantidad (price opcional), "
+        "calcula el total, genera el PDF y envía el correo a recipient_email. Retorna JSON."
+    ),
+}
+
+
+def get_tool(name: str):
+    """
+    Retorna una herramienta por nombre, importando su módulo si aún no se ha cargado.
+
+    Args:
+        name (str): Nombre de la herramienta.
+
+    Returns:
+        Herramienta de LangChain.
+
+    Raises:
+        KeyError: Si la herramienta no está registrada.
+    """
+    tool = getattr(import_module(TOOL_MODULES[name]), name)
+    # Importar el submódulo lo deja como atributo del paquete con el mismo nombre;
+    # se reemplaza por la herramienta, como hacía el import explícito
+    globals()[name] = tool
+    return tool
+
+
+def default_tool_names(quote_pipeline: bool = True) -> list[str]:
+    """
+    Herramientas del agente: con quote_pipeline, quote_pipeline_tool en lugar de los pasos de
+    cotización por separado (QUOTE_STEP_TOOLS); sin él, los pasos por separado.
+    """
+    excluded = QUOTE_STEP_TOOLS if quote_pipeline else ("quote_pipeline_tool",)
+    return [name for name in TOOL_MODULES if name not in excluded]
+
+
+def get_tools(names: list[str] = None, compact: bool = False):
     """
     Retorna la lista de herramientas configuradas para el agente.
 
+    Args:
+        names (list[str], opcional): Herramientas a incluir. Por defecto, todas las registradas.
+        compact (bool): Usa las descripciones cortas de COMPACT_DESCRIPTIONS en lugar de los
+            docstrings (menos tokens de entrada en cada llamada al modelo).
+
     Returns:
         Lista de herramientas de LangChain.
     """
-    return AVAILABLE_TOOLS
+    tools = [get_tool(name) for name in (names or TOOL_MODULES)]
+    if compact:
+        tools = [
+            tool.model_copy(update={"description": COMPACT_DESCRIPTIONS[tool.name]})
+            if tool.name in COMPACT_DESCRIPTIONS
+            else tool
+            for tool in tools
+        ]
+    return tools
+
+
+def __getattr__(name: str):
+    if name in TOOL_MODULES:
+        return get_tool(name)
+    if name == "AVAILABLE_TOOLS":
+        return get_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
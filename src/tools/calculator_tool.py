@@ -23,37 +23,16 @@ class CalculationResult(BaseModel):
     grand_total: float
     details: str
 
-@tool
-def calculator_tool(quote_input: QuoteInput) -> str:
+def calculate_quote(products: List[ProductItem]) -> CalculationResult:
     """
-    Calcula el costo total para una lista de productos, generando subtotales y un total general.
-
-    Esta herramienta es útil para generar cotizaciones detalladas. Para cada producto en la lista
-    de entrada, multiplica su precio unitario por la cantidad solicitada para obtener el subtotal.
-    Luego, suma los subtotales de todos los productos para calcular el costo total de la cotización.
-
-    La herramienta devuelve un string en formato JSON que contiene una lista de los subtotales
-    por producto, el total general de la cotización y un resumen detallado en texto plano
-    ideal para ser mostrado directamente al usuario.
+    Calcula los subtotales (precio x cantidad) y el total de una lista de productos.
 
     Args:
-        quote_input (QuoteInput): Un objeto que encapsula la lista de productos a cotizar.
-            - products (List[ProductItem]): Una lista donde cada elemento representa un producto
-              y debe contener:
-                - name (str): El nombre del producto.
-                - price (float): El precio unitario del producto (debe ser mayor que 0).
-                - quantity (int): La cantidad de unidades del producto (debe ser mayor que 0).
+        products (List[ProductItem]): Productos de la cotización (objetos con name, price y quantity).
 
     Returns:
-        str: Un string en formato JSON con la siguiente estructura:
-             - "subtotals": Una lista de diccionarios, cada uno con "product" y "subtotal".
-             - "grand_total": El costo total de la cotización.
-             - "details": Un resumen en texto formateado con el desglose de la cotización.
+        CalculationResult: Subtotales, total general y resumen en texto.
     """
-    products = quote_input.products
-    if not products:
-        return "No se proporcionaron productos para calcular."
-
     subtotals = []
     grand_total = 0
 
@@ -71,10 +50,39 @@ def calculator_tool(quote_input: QuoteInput) -> str:
 
     details.append(f"\n**Total General: ${grand_total:.2f}**")
 
-    result = CalculationResult(
+    return CalculationResult(
         subtotals=subtotals,
         grand_total=grand_total,
         details="\n".join(details)
     )
 
-    return result.model_dump_json(indent=2)
\ No newline at end of file
+@tool
+def calculator_tool(quote_input: QuoteInput) -> str:
+    """
+    Calcula el costo total para una lista de productos, generando subtotales y un total general.
+
+    Esta herramienta es útil para generar cotizaciones detalladas. Para cada producto en la lista
+    de entrada, multiplica su precio unitario por la cantidad solicitada para obtener el subtotal.
+    Luego, suma los subtotales de todos los productos para calcular el costo total de la cotización.
+
+    La herramienta devuelve un string en formato JSON que contiene una lista de los subtotales
+    por producto, el total general de la cotización y un resumen detallado en texto plano
+    ideal para ser mostrado directamente al usuario.
+
+    Args:
+        quote_input (QuoteInput): Un objeto que encapsula la lista de productos a cotizar.
+            - products (List[ProductItem]): Una lista donde cada elemento representa un producto
+              y debe contener:
+                - name (str): El nombre del producto.
+                - price (float): El precio unitario del producto (debe ser mayor que 0).
+                - quantity (int): La cantidad de unidades del producto (debe ser mayor que 0).
+
+    Returns:
+        str: Un string en formato JSON con la siguiente estructura:
+             - "subtotals": Una lista de diccionarios, cada uno con "product" y "subtotal".
+             - "grand_total": El costo total de la cotización.
+             - "details": Un resumen en texto formateado con el desglose de la cotización.
+    """
+    if not quote_input.products:
+        return "No se proporcionaron productos para calcular."
+    return calculate_quote(quote_input.products).model_dump_json(indent=2)
@@ -22,6 +22,8 @@ from langchain.tools import tool
 from difflib import SequenceMatcher
 from pydantic import BaseModel, Field
 
+from src.tools.qa_data import load_faqs
+
 def string_similarity(a: str, b: str) -> float:
     """
     Calcula la similitud entre dos cadenas usando el algoritmo de ratio de secuencia.
@@ -63,11 +65,8 @@ def faq_tool(faq_input: FaqInput) -> str:
              precisión de la coincidencia. Si no se encuentra ninguna coincidencia adecuada,
              devuelve un mensaje indicando que no se encontró una respuesta.
     """
-    faq_path = Path(__file__).parent.parent.parent / "data" / "qa" / "faq.json"
-    
     try:
-        with open(faq_path, "r", encoding="utf-8") as f:
-            faqs = json.load(f)
+        faqs = load_faqs()
     except FileNotFoundError:
         return "Error: El archivo de preguntas frecuentes (faq.json) no se encontró."
     except json.JSONDecodeError:
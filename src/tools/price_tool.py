@@ -31,11 +31,8 @@ def load_prices_data():
     Returns:
         dict: Diccionario con los datos de precios o None si hay error
     """
-    prices_path = Path(__file__).parent.parent.parent / "data" / "qa" / "prices.json"
-    
     try:
-        with open(prices_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_prices()
     except FileNotFoundError:
         return None
     except json.JSONDecodeError:
@@ -119,6 +116,8 @@ from difflib import SequenceMatcher
 from typing import Optional
 from pydantic import BaseModel, Field
 
+from src.tools.qa_data import load_prices
+
 
 def string_similarity(a: str, b: str) -> float:
     """
@@ -141,11 +140,8 @@ def load_prices_data():
     Returns:
         dict: Diccionario con los datos de precios o None si hay error.
     """
-    prices_path = Path(__file__).parent.parent.parent / "data" / "qa" / "prices.json"
-    
     try:
-        with open(prices_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_prices()
     except (FileNotFoundError, json.JSONDecodeError):
         return None
 
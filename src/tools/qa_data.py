@@ -0,0 +1,67 @@
+"""
+Carga de los archivos de preguntas frecuentes y precios (data/qa).
+Mantiene el JSON ya parseado en memoria y solo lo relee si cambia la fecha de modificación
+del archivo, para no abrir y parsear el archivo en cada llamada de herramienta.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+QA_DIR = Path(__file__).parent.parent.parent / "data" / "qa"
+FAQ_PATH = QA_DIR / "faq.json"
+PRICES_PATH = QA_DIR / "prices.json"
+
+_cache: dict[Path, tuple[int, object]] = {}
+_lock = threading.Lock()
+
+
+def load_json(path: Path):
+    """
+    Carga un archivo JSON reutilizando la versión parseada mientras el archivo no cambie.
+
+    Args:
+        path (Path): Ruta del archivo.
+
+    Returns:
+        Contenido del archivo JSON.
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe.
+        json.JSONDecodeError: Si el archivo no es un JSON válido.
+    """
+    mtime = path.stat().st_mtime_ns
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        _cache[path] = (mtime, data)
+        return data
+
+
+def load_faqs() -> list:
+    """Preguntas frecuentes de data/qa/faq.json."""
+    return load_json(FAQ_PATH)
+
+
+def load_prices() -> dict:
+    """Datos de precios de data/qa/prices.json."""
+    return load_json(PRICES_PATH)
+
+
+def preload_qa_data() -> dict:
+    """
+    Carga en memoria los archivos de FAQ y precios.
+
+    Returns:
+        dict: Número de preguntas y de productos cargados.
+    """
+    return {
+        "faqs": len(load_faqs()),
+        "products": len(load_prices().get("productos", [])),
+    }
@@ -0,0 +1,155 @@
+"""
+Herramienta de cotización completa en una sola llamada.
+Resuelve los productos (por SKU o nombre contra data/qa/prices.json, o con el precio dado),
+calcula los totales, genera el PDF y envía el correo al destinatario; reemplaza la cadena
+calculator_tool -> pdf_quote_tool -> email_quote_tool, en la que el modelo copiaba la lista
+de productos y el total entre llamadas.
+"""
+
+import re
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from langchain.tools import tool
+
+from src.memory.semantic_cache import fold_text
+from src.tools.calculator_tool import ProductItem, calculate_quote
+from src.tools.qa_data import load_prices
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+class QuoteLine(BaseModel):
+    """Esquema para un producto de la cotización: SKU o nombre, y cantidad."""
+    sku: Optional[str] = Field(None, description="SKU del producto en el catálogo de precios.")
+    name: Optional[str] = Field(None, description="Nombre del producto (si no hay SKU).")
+    price: Optional[float] = Field(None, gt=0, description="Precio unitario; por defecto, el del catálogo.")
+    quantity: int = Field(..., gt=0, description="Cantidad del producto.")
+
+class QuotePipelineInput(BaseModel):
+    """Esquema de entrada para la herramienta de cotización completa."""
+    products: List[QuoteLine] = Field(..., description="Productos de la cotización.")
+    recipient_email: Optional[str] = Field(None, description="Correo al que se envía la cotización.")
+    store: Optional[str] = Field(None, description="Tienda cuyos precios se usan (ej: 'ExitoCO'); por defecto, el menor precio disponible.")
+
+class QuotePipelineResult(BaseModel):
+    """Esquema para el resultado de la cotización."""
+    subtotals: List[dict]
+    grand_total: float
+    details: str
+    pdf_path: str
+    email: str
+
+
+def _catalog_price(producto: dict, store: Optional[str]) -> Optional[float]:
+    """Precio del producto en la tienda indicada o, sin tienda, el menor precio disponible."""
+    tiendas = [
+        t for t in producto.get("precios_por_tienda", [])
+        if t.get("disponibilidad") == "Disponible" and t.get("precio")
+    ]
+    if store:
+        tiendas = [t for t in tiendas if store.strip().lower() in t["tienda"].lower()]
+    return min((t["precio"] for t in tiendas), default=None)
+
+
+def resolve_quote_lines(lines: List[QuoteLine], store: str = None) -> tuple[List[ProductItem], List[str]]:
+    """
+    Convierte las líneas de la cotización en productos con nombre y precio.
+
+    Args:
+        lines (List[QuoteLine]): Productos solicitados.
+        store (str, opcional): Tienda cuyos precios se usan.
+
+    Returns:
+        tuple: Productos resueltos y errores de las líneas que no se pudieron resolver.
+    """
+    productos = load_prices().get("productos", [])
+    by_sku = {str(p["sku"]): p for p in productos if p.get("sku")}
+    by_name = {fold_text(p["nombre"]): p for p in productos if p.get("nombre")}
+
+    items, errors = [], []
+    for line in lines:
+        producto = None
+        if line.sku:
+            producto = by_sku.get(line.sku.strip())
+            if producto is None:
+                errors.append(f"SKU no encontrado: {line.sku}")
+                continue
+        elif line.name:
+            producto = by_name.get(fold_text(line.name))
+        elif line.price is None:
+            errors.append("Producto sin SKU, nombre ni precio.")
+            continue
+
+        name = producto["nombre"] if producto else line.name
+        price = line.price
+        if price is None:
+            price = _catalog_price(producto, store) if producto else None
+            if price is None:
+                where = f" en {store}" if store else ""
+                errors.append(
+                    f"Sin precio disponible{where} para '{name}'. Consulta price_tool e indica el precio."
+                )
+                continue
+        items.append(ProductItem(name=name or "Producto", price=price, quantity=line.quantity))
+    return items, errors
+
+
+@tool
+def quote_pipeline_tool(quote_input: QuotePipelineInput) -> str:
+    """
+    Genera una cotización completa en una sola llamada: resuelve los productos, calcula los
+    subtotales y el total, genera el PDF y lo envía por correo.
+
+    Cada producto se identifica por su SKU o por su nombre exacto en el catálogo de precios
+    (data/qa/prices.json), que aporta el nombre y el precio (el de la tienda indicada o el menor
+    precio disponible). Si se indica el precio, se usa ese. Sin destinatario, la cotización
+    se calcula y se genera el PDF pero no se envía; se puede volver a llamar con el correo.
+
+    Args:
+        quote_input (QuotePipelineInput): Un objeto con los datos de la cotización.
+            - products (List[QuoteLine]): Productos con 'sku' o 'name', 'quantity' y
+              opcionalmente 'price'.
+            - recipient_email (Optional[str]): Correo del destinatario.
+            - store (Optional[str]): Tienda cuyos precios se usan.
+
+    Returns:
+        str: Un string en formato JSON con "subtotals", "grand_total", "details", "pdf_path" y
+             "email" (resultado del envío), o un mensaje de error si algún producto no se pudo
+             resolver o si falló la generación del PDF.
+    """
+    if not quote_input.products:
+        return "Error: No se proporcionaron productos para la cotización."
+    recipient = (quote_input.recipient_email or "").strip()
+    if recipient and not _EMAIL.match(recipient):
+        return f"Error: El correo '{recipient}' no es válido."
+
+    try:
+        items, errors = resolve_quote_lines(quote_input.products, quote_input.store)
+    except (OSError, ValueError) as e:
+        return f"Error: No se pudo cargar la base de datos de precios: {e}"
+    if errors:
+        return "Error: " + " ".join(errors)
+
+    calculation = calculate_quote(items)
+
+    # Generación del PDF y envío diferidos: reportlab y smtplib se cargan al usarse
+    from src.tools.email_quote_tool import send_quote_email
+    from src.tools.pdf_quote_tool import render_quote_pdf
+
+    try:
+        pdf_path = render_quote_pdf(items, calculation.grand_total).absolute()
+    except Exception as e:
+        return f"Error al generar el PDF: {e}"
+
+    if recipient:
+        # Envío síncrono: el modelo reporta el resultado real, no solo que se intentó
+        email = send_quote_email(recipient, str(pdf_path), items, calculation.grand_total)
+    else:
+        email = "Sin destinatario: la cotización no se envió."
+
+    return QuotePipelineResult(
+        subtotals=calculation.subtotals,
+        grand_total=calculation.grand_total,
+        details=calculation.details,
+        pdf_path=str(pdf_path),
+        email=email,
+    ).model_dump_json(indent=2)
@@ -5,8 +5,6 @@ Herramienta de búsqueda con base de datos vectorial para LangChain.
 from typing import Optional
 from langchain.tools import tool
 
-from src.retrieval.retriever import search as chroma_search
-
 
 """
 Herramienta de búsqueda con base de datos vectorial para LangChain.
@@ -16,8 +14,6 @@ from typing import Optional
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 
-from src.retrieval.retriever import search as chroma_search
-
 class RetrieveInput(BaseModel):
     """Esquema de entrada para la herramienta de búsqueda en la base de conocimiento."""
     query: str = Field(..., description="La pregunta o texto a buscar en la base de datos vectorial.")
@@ -54,7 +50,10 @@ def retrieve_tool(retrieve_input: RetrieveInput) -> str:
              respuesta. Si no se encuentran resultados o hay un error, devuelve un
              mensaje informativo.
     """
-    if chroma_search is None:
+    try:
+        # Chroma y el cliente de embeddings se importan en la primera búsqueda
+        from src.retrieval.retriever import search as chroma_search
+    except ImportError:
         return "La búsqueda RAG aún no está disponible (módulo de retrieval no cargado)."
     
     try:
@@ -7,7 +7,8 @@ import streamlit as st
 from src.controllers.chatbot_controller import ChatbotController
 from src.config.prompts import PROMPTS
 from src.config.settings import settings
-from src.tools import get_tools
+from src.tools import default_tool_names, get_tools
+from src.models.model_registry import get_model_registry
 from src.retrieval.vector_store import preload_vector_store
 
 
@@ -17,10 +18,12 @@ def initialize_controller():
     """
     if "controller" not in st.session_state:
         # Obtener herramientas configuradas
-        tools = get_tools()
+        tools = get_tools(default_tool_names(settings.QUOTE_PIPELINE_ENABLED))
         
+        registry = get_model_registry()
         st.session_state.controller = ChatbotController(
-            model_name="google_genai:gemini-2.5-flash",
+            model_name=registry.default.name,
+            registry=registry,
             tools=tools,
             temperature=0.1,
             max_tokens=1000,
@@ -76,11 +79,12 @@ def handle_user_input(controller: ChatbotController):
                         for msg in st.session_state.messages
                     ]
                     
-                    # Invocar el controlador
-                    response = controller.send_message(langchain_messages)
-                    
-                    # Extraer el contenido de la respuesta
-                    assistant_content = response.get("messages", [])[-1].content
+                    # Invocar el controlador (historial completo en un thread nuevo)
+                    assistant_content = controller.send_message(
+                        langchain_messages,
+                        thread_id=None,
+                        model=st.session_state.get("selected_model"),
+                    )
                     
                     # Mostrar respuesta
                     st.markdown(assistant_content)
@@ -110,6 +114,16 @@ def render_sidebar(controller: ChatbotController):
     with st.sidebar:
         st.title("Configuración")
         
+        st.markdown("---")
+        st.markdown("### Modelo")
+        models = controller.model.available_models()
+        st.session_state.selected_model = st.selectbox(
+            "Modelo",
+            options=models,
+            index=models.index(controller.model.model_name),
+            help="Modelo de config/models.yaml que responde los siguientes mensajes.",
+        )
+
         st.markdown("---")
         st.markdown("### Parámetros del Modelo")
         
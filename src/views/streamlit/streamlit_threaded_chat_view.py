@@ -7,7 +7,8 @@ import streamlit as st
 from src.controllers.chatbot_controller import ChatbotController
 from src.config.prompts import PROMPTS
 from src.config.settings import settings
-from src.tools import get_tools
+from src.tools import default_tool_names, get_tools
+from src.models.model_registry import get_model_registry
 from src.memory.short_term_memory import generate_thread_id
 
 
@@ -17,10 +18,12 @@ def initialize_controller():
     """
     if "controller" not in st.session_state:
         # Obtener herramientas configuradas
-        tools = get_tools()
+        tools = get_tools(default_tool_names(settings.QUOTE_PIPELINE_ENABLED))
 
+        registry = get_model_registry()
         st.session_state.controller = ChatbotController(
-            model_name="google_genai:gemini-2.5-flash",
+            model_name=registry.default.name,
+            registry=registry,
             tools=tools,
             temperature=0.1,
             max_tokens=1000,
@@ -74,10 +77,6 @@ def handle_user_input(controller: ChatbotController, messages: list, thread_id:
             st.session_state.new_chat = False
             st.session_state.pending_message = prompt  # Guardar el mensaje para procesarlo después del rerun
             
-            # Actualizar el thread_id del controlador
-            if "controller" in st.session_state:
-                st.session_state.controller.update_thread_id(new_thread_id)
-            
             st.rerun()
         
         # Agregar mensaje del usuario al historial
@@ -91,13 +90,12 @@ def handle_user_input(controller: ChatbotController, messages: list, thread_id:
         # Generar respuesta del asistente
         with st.spinner("Pensando..."):
             try:
-                # Convertir mensajes al formato de LangChain
-                langchain_messages = [
-                    {"role": msg["role"], "content": msg["content"]} for msg in messages
-                ]
-
-                # Invocar el controlador
-                assistant_content = controller.send_message(langchain_messages)
+                # El checkpointer ya guarda el historial del thread: solo se envía el mensaje nuevo
+                assistant_content = controller.send_message(
+                    [{"role": "user", "content": prompt}],
+                    thread_id=thread_id,
+                    model=st.session_state.get("selected_model"),
+                )
 
                 # Mostrar respuesta
                 st.markdown(assistant_content)
@@ -121,6 +119,16 @@ def render_model_config_sidebar(controller: ChatbotController):
     with st.sidebar:
         st.title("Configuración")
 
+        st.markdown("---")
+        st.markdown("### Modelo")
+        models = controller.model.available_models()
+        st.session_state.selected_model = st.selectbox(
+            "Modelo",
+            options=models,
+            index=models.index(controller.model.model_name),
+            help="Modelo de config/models.yaml que responde los siguientes mensajes.",
+        )
+
         st.markdown("---")
         st.markdown("### Parámetros del Modelo")
 
@@ -157,7 +165,7 @@ def render_model_config_sidebar(controller: ChatbotController):
             thread_data = st.session_state.threads.get(st.session_state.active_thread, {})
             num_messages = len(thread_data.get("messages", []))
             st.markdown(f"**Mensajes:** {num_messages}")
-        st.markdown(f"**Thread ID:** `{controller.thread_id[:8]}...`")
+            st.markdown(f"**Thread ID:** `{st.session_state.active_thread[:8]}...`")
 
         st.markdown("---")
 
@@ -222,9 +230,6 @@ def render_thread_sidebar():
             ):
                 st.session_state.active_thread = thread_id
                 st.session_state.new_chat = False
-                # Actualizar el thread_id del controlador
-                if "controller" in st.session_state:
-                    st.session_state.controller.update_thread_id(thread_id)
                 st.rerun()
 
         with col2:
@@ -287,10 +292,6 @@ def main():
 
     # Inicializar controlador una sola vez por sesión
     controller = initialize_controller()
-    
-    # Actualizar el thread_id si hay un thread activo
-    if active_thread_id:
-        controller.update_thread_id(active_thread_id)
 
     # Renderizar barra lateral
     with st.sidebar:
@@ -316,13 +317,12 @@ def main():
         # Generar respuesta del asistente
         with st.spinner("Pensando..."):
             try:
-                # Convertir mensajes al formato de LangChain
-                langchain_messages = [
-                    {"role": msg["role"], "content": msg["content"]} for msg in active_thread_messages
-                ]
-                
-                # Invocar el controlador
-                assistant_content = controller.send_message(langchain_messages)
+                # El checkpointer ya guarda el historial del thread: solo se envía el mensaje nuevo
+                assistant_content = controller.send_message(
+                    [{"role": "user", "content": prompt}],
+                    thread_id=st.session_state.active_thread,
+                    model=st.session_state.get("selected_model"),
+                )
                 
                 # Mostrar respuesta
                 with st.chat_message("assistant"):
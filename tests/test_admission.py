@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+from src.api.admission import AdmissionController, AdmissionControlMiddleware, AdmissionRejected, batch_weight
+
+BATCH_PATH = "/api/v1/send-messages"
+
+
+def batch_body(items: int, max_concurrency: int = None) -> bytes:
+    payload = {"items": [{"cellphone": "573001234567", "message": f"hola {i}"} for i in range(items)]}
+    if max_concurrency is not None:
+        payload["max_concurrency"] = max_concurrency
+    return json.dumps(payload).encode()
+
+
+def test_batch_weight_is_the_number_of_concurrent_turns():
+    weigh = batch_weight(default_concurrency=8)
+
+    assert weigh(batch_body(20, max_concurrency=4)) == 4
+    assert weigh(batch_body(3, max_concurrency=4)) == 3
+    assert weigh(batch_body(20)) == 8
+    # Cuerpos inválidos pesan 1: la validación de la ruta responde el error
+    assert weigh(b"{no es json") == 1
+    assert weigh(b'{"items": []}') == 1
+    assert weigh(b"[]") == 1
+
+
+def test_weighted_request_holds_one_slot_per_turn():
+    admission = AdmissionController(max_in_flight=4, max_queue=0, queue_timeout=0.05)
+
+    async def main():
+        await admission.acquire(3)
+        assert admission.in_flight == 3
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected, match="queue_full"):
+            await admission.acquire()
+        admission.release(0.1, 3)
+        admission.release(0.1)
+        # Un peso mayor que la capacidad se acota para que el lote pueda admitirse
+        await admission.acquire(100)
+        assert admission.in_flight == 4
+        admission.release(0.1, 100)
+
+    asyncio.run(main())
+    assert admission.in_flight == 0 and admission.admitted_total == 3
+
+
+def test_weighted_timeout_returns_the_partial_slots():
+    admission = AdmissionController(max_in_flight=4, max_queue=4, queue_timeout=0.05)
+
+    async def main():
+        await admission.acquire(2)
+        # Solo hay 2 de los 4 cupos del lote: se agota la espera sin retenerlos
+        with pytest.raises(AdmissionRejected, match="timeout"):
+            await admission.acquire(4)
+        assert admission.waiting == 0
+        await admission.acquire(2)
+
+    asyncio.run(main())
+    assert admission.in_flight == 4
+
+
+def test_middleware_weighs_batches_and_replays_the_body():
+    admission = AdmissionController(max_in_flight=32, max_queue=0, queue_timeout=1)
+    seen = []
+
+    async def app(scope, receive, send):
+        body, more_body = b"", True
+        while more_body:
+            message = await receive()
+            body, more_body = body + message["body"], message["more_body"]
+        seen.append((scope["path"], admission.in_flight, json.loads(body)))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = AdmissionControlMiddleware(
+        app, admission, path_prefix="/api/v1", weights={BATCH_PATH: batch_weight(8)}
+    )
+
+    async def request(path: str, body: bytes):
+        # El cuerpo llega en dos partes
+        chunks = [
+            {"type": "http.request", "body": body[:10], "more_body": True},
+            {"type": "http.request", "body": body[10:], "more_body": False},
+        ]
+
+        async def receive():
+            return chunks.pop(0)
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware({"type": "http", "method": "POST", "path": path}, receive, send)
+        return sent[0]["status"]
+
+    async def main():
+        return [
+            await request(BATCH_PATH, batch_body(20, max_concurrency=5)),
+            await request("/api/v1/send-message", json.dumps({"cellphone": "573001234567", "message": "hola"}).encode()),
+        ]
+
+    assert asyncio.run(main()) == [200, 200]
+    assert [(path, in_flight) for path, in_flight, _ in seen] == [(BATCH_PATH, 5), ("/api/v1/send-message", 1)]
+    assert len(seen[0][2]["items"]) == 20
+    assert admission.in_flight == 0
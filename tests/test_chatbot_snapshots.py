@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+
+import src.models.chatbot_model as chatbot_model
+from src.config.settings import settings
+from src.models.chatbot_model import ChatbotModel
+from src.models.model_registry import ModelRegistry
+
+
+class MemorySaver(InMemorySaver):
+    """Checkpointer en memoria con el setup() del saver de Postgres."""
+
+    def setup(self):
+        pass
+
+
+class AsyncMemorySaver(InMemorySaver):
+    async def setup(self):
+        pass
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(chatbot_model, "create_checkpointer_context", lambda: nullcontext(MemorySaver()))
+    monkeypatch.setattr(
+        chatbot_model, "create_async_checkpointer_context", lambda: nullcontext(AsyncMemorySaver())
+    )
+    registry = ModelRegistry.from_yaml(settings.MODELS_CONFIG_PATH)
+    return ChatbotModel("fake-large", tools=[], registry=registry, temperature=0.1, max_tokens=1000)
+
+
+def test_publishes_one_snapshot_per_model(model):
+    assert model.available_models() == ["fake-large", "fake-small"]
+    assert model.temperature == 0.1
+    assert model.async_agent is None
+
+
+def test_update_publishes_new_snapshot_and_keeps_the_old_one_intact(model):
+    before = model._snapshot_for("fake-small")
+
+    model.update_model_config(temperature=0.7, model_name="fake-small")
+
+    after = model._snapshot_for("fake-small")
+    assert after is not before
+    assert (after.temperature, after.max_tokens) == (0.7, 1000)
+    # Un turno que ya leyó el snapshot anterior termina con su agente y configuración
+    assert before.temperature == 0.1 and before.agent is not after.agent
+    assert model._snapshot_for("fake-large").temperature == 0.1
+
+    model.update_model_config(temperature=0.1, model_name="fake-small")
+    assert model._snapshot_for("fake-small") is before
+
+
+def test_asetup_keeps_published_snapshots_evicted_from_the_lru(model, monkeypatch):
+    monkeypatch.setattr(ChatbotModel, "MAX_SNAPSHOTS", 2)
+    published = model._snapshot_for("fake-large")
+    for temperature in (0.2, 0.3):
+        model.update_model_config(temperature=temperature, model_name="fake-small")
+    assert (published.model_name, published.temperature, published.max_tokens) not in model._snapshots
+
+    async def main():
+        await model.asetup()
+        return await model.ainvoke([{"role": "user", "content": "hola"}], thread_id="573001234567")
+
+    reply = asyncio.run(main())
+
+    assert reply.startswith("Respuesta simulada (large):")
+    for name in model.available_models():
+        assert model._snapshot_for(name).async_agent is not None
+    large = model._snapshot_for("fake-large")
+    assert large.model is published.model and large.temperature == 0.1
+    assert model._snapshot_for("fake-small").temperature == 0.3
@@ -0,0 +1,198 @@
+"""
+Retención de checkpoints contra un Postgres real: se omiten sin TEST_DB_URI.
+Cada prueba trabaja en un esquema propio (retention_test) que se recrea al empezar.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+TEST_DB_URI = os.environ.get("TEST_DB_URI")
+if not TEST_DB_URI:
+    pytest.skip("TEST_DB_URI no está configurado", allow_module_level=True)
+
+import psycopg  # noqa: E402
+from psycopg import sql  # noqa: E402
+from psycopg.conninfo import make_conninfo  # noqa: E402
+
+from src.config.settings import settings  # noqa: E402
+from src.memory import checkpoint_retention  # noqa: E402
+from src.memory.checkpoint_retention import RetentionPolicy, prune_checkpoints  # noqa: E402
+from src.models.chatbot_model import ChatbotModel  # noqa: E402
+from src.models.model_registry import ModelRegistry  # noqa: E402
+
+SCHEMA = "retention_test"
+TABLES = ("checkpoints", "checkpoint_writes", "checkpoint_blobs")
+
+
+@pytest.fixture
+def conninfo(monkeypatch):
+    with psycopg.connect(TEST_DB_URI, autocommit=True) as admin:
+        admin.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(SCHEMA)))
+        admin.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(SCHEMA)))
+    conninfo = make_conninfo(TEST_DB_URI, options=f"-c search_path={SCHEMA}")
+    # Los pools del checkpointer (create_*checkpointer_context) leen DB_URI al abrirse
+    monkeypatch.setattr(settings, "DB_URI", conninfo)
+    monkeypatch.setattr(settings, "DB_POOL_MIN_SIZE", 1)
+    yield conninfo
+    with psycopg.connect(TEST_DB_URI, autocommit=True) as admin:
+        admin.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(SCHEMA)))
+
+
+@pytest.fixture
+def model(conninfo):
+    registry = ModelRegistry.from_yaml(settings.MODELS_CONFIG_PATH)
+    model = ChatbotModel("fake-small", tools=[], registry=registry)
+    yield model
+    asyncio.run(model.aclose())
+    model._checkpointer_cm.__exit__(None, None, None)
+
+
+def chat(model: ChatbotModel, thread_id: str, turns: int) -> None:
+    async def main():
+        for turn in range(turns):
+            await model.ainvoke([{"role": "user", "content": f"pregunta {turn}"}], thread_id=thread_id)
+        await model.aclose()
+
+    asyncio.run(main())
+
+
+def rows(conninfo: str, thread_id: str) -> dict[str, int]:
+    with psycopg.connect(conninfo) as conn:
+        return {
+            table: conn.execute(
+                sql.SQL("SELECT count(*) FROM {} WHERE thread_id = %s").format(sql.Identifier(table)),
+                (thread_id,),
+            ).fetchone()[0]
+            for table in TABLES
+        }
+
+
+def checkpoint_ids(conninfo: str, thread_id: str) -> tuple[list[str], str]:
+    """Ids de los checkpoints de la conversación (del más nuevo al más viejo) y el de la última entrada."""
+    with psycopg.connect(conninfo) as conn:
+        ids = [row[0] for row in conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = %s ORDER BY checkpoint_id DESC",
+            (thread_id,),
+        )]
+        last_input = conn.execute(
+            "SELECT max(checkpoint_id) FROM checkpoints WHERE thread_id = %s AND metadata->>'source' = 'input'",
+            (thread_id,),
+        ).fetchone()[0]
+    return ids, last_input
+
+
+def blob_keys(conninfo: str, thread_id: str, referenced_only: bool = False) -> set[tuple[str, str]]:
+    """(canal, versión) de los blobs; con referenced_only, solo los que referencia un checkpoint."""
+    query = "SELECT channel, version FROM checkpoint_blobs b WHERE thread_id = %s"
+    if referenced_only:
+        query += (
+            " AND EXISTS (SELECT 1 FROM checkpoints c WHERE c.thread_id = b.thread_id"
+            " AND c.checkpoint_ns = b.checkpoint_ns"
+            " AND c.checkpoint->'channel_versions'->>b.channel = b.version)"
+        )
+    with psycopg.connect(conninfo) as conn:
+        return set(conn.execute(query, (thread_id,)).fetchall())
+
+
+def prune(conninfo: str, dry_run: bool = False, **policy) -> checkpoint_retention.RetentionReport:
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        return prune_checkpoints(conn, RetentionPolicy(pause_s=0, **policy), dry_run=dry_run)
+
+
+def test_keep_last_keeps_the_last_turn_and_its_blobs(conninfo, model):
+    chat(model, "573001111111", turns=4)
+    ids, last_input = checkpoint_ids(conninfo, "573001111111")
+    since_input = [checkpoint_id for checkpoint_id in ids if checkpoint_id >= last_input]
+    assert len(since_input) > 1
+
+    report = prune(conninfo, keep_last=1, ttl_days=0)
+
+    # keep_last=1 es menor que el turno en curso: se conserva desde la última entrada
+    kept, kept_input = checkpoint_ids(conninfo, "573001111111")
+    assert kept == since_input and kept_input == last_input
+    assert report.deleted["checkpoints"] == len(ids) - len(since_input)
+    assert report.deleted["checkpoint_blobs"] > 0
+    assert rows(conninfo, "573001111111")["checkpoint_writes"] > 0
+
+
+def test_keep_last_keeps_the_most_recent_checkpoints(conninfo, model):
+    chat(model, "573001111111", turns=4)
+    ids, last_input = checkpoint_ids(conninfo, "573001111111")
+    keep_last = len([checkpoint_id for checkpoint_id in ids if checkpoint_id >= last_input]) + 3
+
+    prune(conninfo, keep_last=keep_last, ttl_days=0)
+
+    assert checkpoint_ids(conninfo, "573001111111")[0] == ids[:keep_last]
+
+
+def test_pruned_thread_still_loads_and_reruns(conninfo, model):
+    chat(model, "573001111111", turns=3)
+    referenced = blob_keys(conninfo, "573001111111", referenced_only=True)
+
+    prune(conninfo, keep_last=1, ttl_days=0)
+
+    # Los blobs que referencian los checkpoints conservados siguen en la tabla
+    kept_referenced = blob_keys(conninfo, "573001111111", referenced_only=True)
+    assert kept_referenced and kept_referenced <= referenced
+    assert kept_referenced <= blob_keys(conninfo, "573001111111")
+
+    config = {"configurable": {"thread_id": "573001111111", "checkpoint_ns": ""}}
+    state = model.checkpointer.get_tuple(config)
+    messages = state.checkpoint["channel_values"]["messages"]
+    assert [message.content for message in messages[::2]] == ["pregunta 0", "pregunta 1", "pregunta 2"]
+
+    async def rerun():
+        result = await model.arerun_turn("573001111111", "fake-large")
+        snapshot = await model.async_agent.aget_state({"configurable": {"thread_id": "573001111111"}})
+        await model.aclose()
+        return result, snapshot.values["messages"]
+
+    result, messages = asyncio.run(rerun())
+    assert result.model_name == "fake-large"
+    assert result.output.startswith("Respuesta simulada (large):")
+    # La respuesta repetida reemplaza a la anterior
+    assert len(messages) == 6 and messages[-1].content == result.output
+
+
+def test_ttl_removes_only_idle_threads(conninfo, model):
+    chat(model, "573001111111", turns=2)
+    chat(model, "573002222222", turns=2)
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute(
+            "UPDATE checkpoints SET checkpoint = jsonb_set(checkpoint, '{ts}', "
+            "to_jsonb((now() - interval '200 days')::text)) WHERE thread_id = %s",
+            ("573001111111",),
+        )
+    idle, active = rows(conninfo, "573001111111"), rows(conninfo, "573002222222")
+    assert all(idle.values()) and all(active.values())
+
+    report = prune(conninfo, keep_last=0, ttl_days=90)
+
+    assert report.threads_expired == 1
+    assert rows(conninfo, "573001111111") == {table: 0 for table in TABLES}
+    assert rows(conninfo, "573002222222") == active
+    assert report.deleted == {
+        "checkpoints": idle["checkpoints"],
+        "checkpoint_writes": idle["checkpoint_writes"],
+        "checkpoint_blobs": idle["checkpoint_blobs"],
+    }
+
+
+def test_dry_run_deletes_nothing(conninfo, model, monkeypatch, capsys):
+    chat(model, "573001111111", turns=3)
+    before = rows(conninfo, "573001111111")
+
+    report = prune(conninfo, dry_run=True, keep_last=1, ttl_days=0)
+    assert report.deleted["checkpoints"] > 0
+    assert rows(conninfo, "573001111111") == before
+
+    # La CLI con --dry-run
+    monkeypatch.setattr(sys, "argv", ["checkpoint_retention", "--dry-run", "--keep-last", "1", "--pause-ms", "0"])
+    checkpoint_retention.main()
+    printed = json.loads(capsys.readouterr().out)
+    assert printed["dry_run"] is True and printed["deleted"]["checkpoints"] > 0
+    assert rows(conninfo, "573001111111") == before
@@ -0,0 +1,202 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from langchain_core.messages import SystemMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+import src.models.chatbot_model as chatbot_model
+from src.config.settings import settings
+from src.controllers.chatbot_controller import ChatbotController
+from src.memory.conversation_summary import SummaryPolicy
+from src.models.fake_chat_model import FakeChatModel
+from src.models.model_registry import ModelRegistry
+
+THREAD = "573001234567"
+# Presupuesto pequeño: cada turno de la conversación ocupa unos 25 tokens
+HISTORY_MAX_TOKENS = 80
+
+
+class MemorySaver(InMemorySaver):
+    """Checkpointer en memoria con el setup() del saver de Postgres."""
+
+    def setup(self):
+        pass
+
+
+class AsyncMemorySaver(InMemorySaver):
+    async def setup(self):
+        pass
+
+
+class Summarizer:
+    """Reemplazo de asummarize que registra los mensajes recibidos y puede quedar en espera."""
+
+    def __init__(self):
+        self.calls: list[list] = []
+        self.gate: asyncio.Event | None = None
+        self.started: asyncio.Event | None = None
+
+    async def __call__(self, model, previous, messages, max_words):
+        self.calls.append(list(messages))
+        call = len(self.calls)
+        if self.started is not None:
+            self.started.set()
+        if self.gate is not None:
+            await self.gate.wait()
+        return f"resumen {call} ({len(messages)} mensajes)"
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    monkeypatch.setattr(chatbot_model, "create_checkpointer_context", lambda: nullcontext(MemorySaver()))
+    monkeypatch.setattr(
+        chatbot_model, "create_async_checkpointer_context", lambda: nullcontext(AsyncMemorySaver())
+    )
+    summarizer = Summarizer()
+    monkeypatch.setattr(chatbot_model, "asummarize", summarizer)
+    return summarizer
+
+
+def model_kwargs() -> dict:
+    return {
+        "registry": ModelRegistry.from_yaml(settings.MODELS_CONFIG_PATH),
+        "history_max_tokens": HISTORY_MAX_TOKENS,
+        "summary": SummaryPolicy("fake-small", target_ratio=0.6, min_messages=4),
+    }
+
+
+@pytest.fixture
+def model(summarizer):
+    return chatbot_model.ChatbotModel("fake-small", tools=[], **model_kwargs())
+
+
+async def chat(model, turns: int, start: int = 0) -> None:
+    for turn in range(start, start + turns):
+        await model.ainvoke(
+            [{"role": "user", "content": f"pregunta número {turn} sobre la crema dental"}], thread_id=THREAD
+        )
+
+
+async def state(model) -> dict:
+    snapshot = await model.async_agent.aget_state({"configurable": {"thread_id": THREAD}})
+    return snapshot.values
+
+
+def test_stale_summary_writes_nothing(model, summarizer):
+    async def main():
+        await chat(model, 6)
+        before = await state(model)
+        summarizer.gate = asyncio.Event()
+        # Dos actualizaciones leen la misma versión; la segunda en escribir está desactualizada
+        refreshes = [asyncio.create_task(model.arefresh_summary(THREAD)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        summarizer.gate.set()
+        results = await asyncio.gather(*refreshes)
+        after = await state(model)
+        await model.aclose()
+        return before, results, after
+
+    before, results, after = asyncio.run(main())
+    assert sorted(results) == ["stale", "written"]
+    assert len(summarizer.calls) == 2
+    assert after["summary_version"] == 1
+    assert after["summary"] == f"resumen {results.index('written') + 1} ({len(summarizer.calls[0])} mensajes)"
+    # Solo la escritura vigente retiró mensajes del historial
+    removed = {message.id for message in before["messages"]} - {message.id for message in after["messages"]}
+    assert removed and removed <= {message.id for message in summarizer.calls[0]}
+
+
+def test_summarized_messages_are_removed_exactly_once(model, summarizer):
+    async def main():
+        await chat(model, 6)
+        pending = (await state(model))["summary_pending"]
+        assert pending, "el recorte debería haber dejado mensajes pendientes de resumir"
+
+        summarizer.gate, summarizer.started = asyncio.Event(), asyncio.Event()
+        refresh = asyncio.create_task(model.arefresh_summary(THREAD))
+        await summarizer.started.wait()
+        # Un turno que termina mientras se resume agrega pendientes nuevos que deben conservarse
+        await chat(model, 2, start=6)
+        new_pending = [m for m in (await state(model))["summary_pending"] if m.id not in {p.id for p in pending}]
+        summarizer.gate.set()
+        first = await refresh
+        after_first = await state(model)
+
+        summarizer.gate = summarizer.started = None
+        second = await model.arefresh_summary(THREAD)
+        after_second = await state(model)
+        await model.aclose()
+        return pending, new_pending, first, after_first, second, after_second
+
+    pending, new_pending, first, after_first, second, after_second = asyncio.run(main())
+    assert first == "written"
+    summarized = [message.id for message in summarizer.calls[0]]
+    assert len(summarized) == len(set(summarized))
+    assert {message.id for message in pending} <= set(summarized)
+    assert not set(summarized) & {message.id for message in after_first["messages"]}
+    # Los pendientes que llegaron durante el resumen y no se resumieron siguen pendientes
+    still_pending = [message.id for message in new_pending if message.id not in summarized]
+    assert still_pending
+    assert [message.id for message in after_first["summary_pending"]] == still_pending
+
+    # La siguiente actualización resume solo lo nuevo: nada se resume dos veces
+    assert second == "written" and after_second["summary_version"] == 2
+    assert set(still_pending) <= {message.id for message in summarizer.calls[1]}
+    assert not set(summarized) & {message.id for message in summarizer.calls[1]}
+    assert not after_second["summary_pending"]
+    assert not set(summarized) & {message.id for message in after_second["messages"]}
+
+
+def test_summary_is_added_to_the_system_prompt_of_the_next_turn(model, monkeypatch):
+    prompts = []
+    agenerate = FakeChatModel._agenerate
+
+    async def recording_agenerate(self, messages, *args, **kwargs):
+        prompts.append(next((m.content for m in messages if isinstance(m, SystemMessage)), None))
+        return await agenerate(self, messages, *args, **kwargs)
+
+    monkeypatch.setattr(FakeChatModel, "_agenerate", recording_agenerate)
+
+    async def main():
+        await chat(model, 6)
+        assert await model.arefresh_summary(THREAD) == "written"
+        summary = (await state(model))["summary"]
+        prompts.clear()
+        await chat(model, 1, start=6)
+        await model.aclose()
+        return summary
+
+    summary = asyncio.run(main())
+    assert prompts and prompts[-1].endswith(f"Resumen de la conversación anterior:\n{summary}")
+
+
+def test_schedule_summary_does_not_delay_the_turn(summarizer):
+    controller = ChatbotController("fake-small", tools=[], **model_kwargs())
+
+    async def main():
+        await chat(controller.model, 6)
+        # El resumen queda bloqueado: si el turno lo esperara, no terminaría
+        summarizer.gate, summarizer.started = asyncio.Event(), asyncio.Event()
+        answer = await asyncio.wait_for(
+            controller.asend_message([{"role": "user", "content": "¿y el precio?"}], THREAD, coalesce=False),
+            timeout=2,
+        )
+        task = controller._summary_tasks[THREAD]
+        await summarizer.started.wait()
+        assert not task.done()
+        # Mientras el resumen sigue en curso, otro turno de la conversación tampoco lo espera
+        second = await asyncio.wait_for(
+            controller.asend_message([{"role": "user", "content": "gracias"}], THREAD, coalesce=False),
+            timeout=2,
+        )
+        summarizer.gate.set()
+        await task
+        values = await state(controller.model)
+        await controller.aclose()
+        return answer, second, values
+
+    answer, second, values = asyncio.run(main())
+    assert answer.startswith("Respuesta simulada (small):") and second.startswith("Respuesta simulada (small):")
+    assert len(summarizer.calls) == 1
+    assert values["summary_version"] == 1
@@ -0,0 +1,33 @@
+import threading
+import time
+
+import src.controllers.chatbot_controller as chatbot_controller
+
+
+def test_default_controller_is_built_once_under_concurrent_requests(monkeypatch):
+    built = []
+
+    def build():
+        # Construcción lenta: las demás llamadas llegan mientras el primero sigue construyendo
+        time.sleep(0.05)
+        built.append(object())
+        return built[-1]
+
+    monkeypatch.setattr(chatbot_controller, "_DEFAULT_CONTROLLER", None)
+    monkeypatch.setattr(chatbot_controller, "_build_default_chatbot_controller", build)
+    assert not chatbot_controller.default_chatbot_controller_built()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(chatbot_controller.get_default_chatbot_controller()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(result is built[0] for result in results) and len(results) == 8
+    assert chatbot_controller.default_chatbot_controller_built()
+    assert chatbot_controller.get_default_chatbot_controller() is built[0]
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from langchain.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+import src.models.chatbot_model as chatbot_model
+from src.config.settings import settings
+from src.models.fake_chat_model import FakeChatModel
+from src.models.fast_path import FAST_PATH_MODEL, FastPath
+from src.models.model_registry import ModelRegistry
+
+
+class MemorySaver(InMemorySaver):
+    """Checkpointer en memoria con el setup() del saver de Postgres."""
+
+    def setup(self):
+        pass
+
+
+class AsyncMemorySaver(InMemorySaver):
+    async def setup(self):
+        pass
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(chatbot_model, "create_checkpointer_context", lambda: nullcontext(MemorySaver()))
+    monkeypatch.setattr(
+        chatbot_model, "create_async_checkpointer_context", lambda: nullcontext(AsyncMemorySaver())
+    )
+    registry = ModelRegistry.from_yaml(settings.MODELS_CONFIG_PATH)
+    return chatbot_model.ChatbotModel("fake-small", tools=[], registry=registry, fast_path=FastPath())
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def generate(self, messages, *args, **kwargs):
+        calls.append(messages)
+        return self._reply(messages)
+
+    async def agenerate(self, messages, *args, **kwargs):
+        calls.append(messages)
+        return self._reply(messages)
+
+    monkeypatch.setattr(FakeChatModel, "_generate", generate)
+    monkeypatch.setattr(FakeChatModel, "_agenerate", agenerate)
+    return calls
+
+
+def test_faq_question_is_answered_locally():
+    answer = FastPath().match("¿cuándo se fundó Colgate?")
+
+    assert answer.intent == "faq"
+    assert answer.answer == "En 1806."
+    assert answer.score == 1.0
+
+
+def test_product_and_store_are_answered_with_the_store_price():
+    answer = FastPath().match("precio crema dental colgate total en Exito")
+
+    assert answer.intent == "price"
+    lines = answer.answer.splitlines()
+    assert lines[0] == "Encontré estos productos:"
+    assert len(lines) - 1 <= FastPath().max_products
+    assert all("Crema Dental Colgate Total" in line and "ExitoCO" in line for line in lines[1:])
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Depende de la conversación: "esta crema" no identifica el producto
+        "cuanto vale esta crema",
+        # Cotizaciones: el agente calcula, genera el PDF y envía el correo
+        "quiero cotizar 12 cremas colgate total",
+        "¿me pueden cotizar el precio de la crema dental colgate total en Exito?",
+    ],
+)
+def test_messages_that_need_the_agent_are_not_matched(text):
+    assert FastPath().match(text) is None
+
+
+def test_low_similarity_faq_is_not_matched():
+    # Parecida a "¿Cuándo se fundó Colgate?", pero con otra respuesta
+    text = "¿Cuándo se fundó Palmolive en Colombia?"
+
+    assert FastPath().match(text) is None
+    assert FastPath(faq_threshold=0.5).match(text).answer == "En 1806."
+
+
+def test_answer_is_written_to_the_checkpoint_without_calling_the_llm(model, llm_calls):
+    answer = model.invoke([{"role": "user", "content": "¿cuándo se fundó Colgate?"}], thread_id="573001112233")
+
+    assert answer == "En 1806."
+    assert llm_calls == []
+    messages = model.agent.get_state({"configurable": {"thread_id": "573001112233"}}).values["messages"]
+    assert [type(message) for message in messages] == [HumanMessage, AIMessage]
+    assert [message.content for message in messages] == ["¿cuándo se fundó Colgate?", "En 1806."]
+
+    # El turno siguiente va al agente con el par registrado en el historial
+    model.invoke([{"role": "user", "content": "¿y quién la fundó?"}], thread_id="573001112233")
+    assert len(llm_calls) == 1
+    assert [message.content for message in llm_calls[0] if isinstance(message, (HumanMessage, AIMessage))] == [
+        "¿cuándo se fundó Colgate?",
+        "En 1806.",
+        "¿y quién la fundó?",
+    ]
+
+
+def test_async_turn_reports_the_fast_path(model, llm_calls):
+    async def main():
+        result = await model.ainvoke_turn(
+            [{"role": "user", "content": "precio crema dental colgate total en Exito"}], thread_id="573004445566"
+        )
+        snapshot = await model.async_agent.aget_state({"configurable": {"thread_id": "573004445566"}})
+        await model.aclose()
+        return result, snapshot.values["messages"]
+
+    result, messages = asyncio.run(main())
+    assert result.model_name == FAST_PATH_MODEL and result.used_tools
+    assert llm_calls == []
+    assert [message.content for message in messages] == ["precio crema dental colgate total en Exito", result.output]
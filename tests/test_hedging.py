@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from langchain.agents import create_agent
+from pydantic import Field
+
+from src.models.fake_chat_model import FakeChatModel
+from src.models.hedging import HedgingMiddleware, HedgingPolicy
+from src.observability.metrics import HEDGE_EVENTS
+
+
+class ProbeModel(FakeChatModel):
+    """FakeChatModel que registra llamadas y cancelaciones y puede fallar."""
+
+    fail: bool = False
+    events: list = Field(default_factory=list)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.events.append("start")
+        try:
+            result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        except asyncio.CancelledError:
+            self.events.append("cancelled")
+            raise
+        if self.fail:
+            self.events.append("failed")
+            raise RuntimeError(f"{self.model} no disponible")
+        self.events.append("done")
+        return result
+
+
+def hedge_count(model: str, outcome: str) -> float:
+    return HEDGE_EVENTS._values.get((model, outcome), 0.0)
+
+
+def run(primary: ProbeModel, secondary: ProbeModel, delay_ms: float = 50, hedging: bool = True) -> str:
+    policy = HedgingPolicy(secondary.model, min_delay_ms=delay_ms, max_delay_ms=delay_ms)
+    agent = create_agent(primary, tools=[], middleware=[HedgingMiddleware(policy, secondary)])
+
+    async def main():
+        result = await agent.ainvoke(
+            {"messages": [{"role": "user", "content": "hola"}]},
+            {"configurable": {"hedging": hedging}},
+        )
+        # Deja correr los callbacks de las llamadas canceladas
+        await asyncio.sleep(0.05)
+        return result["messages"][-1].content
+
+    return asyncio.run(main())
+
+
+def test_fast_primary_does_not_hedge():
+    primary = ProbeModel(model="primary-fast", latency_ms=5, reply_prefix="principal:")
+    secondary = ProbeModel(model="secondary-fast", reply_prefix="secundario:")
+
+    assert run(primary, secondary).startswith("principal:")
+    assert secondary.events == []
+    assert hedge_count("primary-fast", "not_needed") == 1
+
+
+def test_slow_primary_loses_to_secondary_and_is_cancelled():
+    primary = ProbeModel(model="primary-slow", latency_ms=2000, reply_prefix="principal:")
+    secondary = ProbeModel(model="secondary-slow", latency_ms=10, reply_prefix="secundario:")
+
+    assert run(primary, secondary).startswith("secundario:")
+    assert primary.events == ["start", "cancelled"]
+    assert secondary.events == ["start", "done"]
+    assert hedge_count("primary-slow", "secondary") == 1
+
+
+def test_failing_secondary_returns_the_primary_result():
+    primary = ProbeModel(model="primary-ok", latency_ms=150, reply_prefix="principal:")
+    secondary = ProbeModel(model="secondary-failing", latency_ms=10, fail=True)
+
+    assert run(primary, secondary).startswith("principal:")
+    assert secondary.events == ["start", "failed"]
+    assert hedge_count("primary-ok", "primary") == 1
+
+
+def test_both_failing_raises():
+    primary = ProbeModel(model="primary-failing", latency_ms=100, fail=True)
+    secondary = ProbeModel(model="secondary-failing-too", latency_ms=10, fail=True)
+
+    with pytest.raises(RuntimeError, match="primary-failing no disponible"):
+        run(primary, secondary)
+
+
+def test_token_streaming_bypasses_hedging():
+    primary = ProbeModel(model="primary-streaming", latency_ms=150, reply_prefix="principal:")
+    secondary = ProbeModel(model="secondary-streaming", reply_prefix="secundario:")
+
+    assert run(primary, secondary, hedging=False).startswith("principal:")
+    assert secondary.events == []
+    assert primary.events == ["start", "done"]
+
+
+def test_delay_uses_percentile_and_clamps():
+    policy = HedgingPolicy("secundario", percentile=90, min_delay_ms=100, max_delay_ms=1000, min_samples=10)
+    # Sin muestras suficientes se espera el máximo
+    assert policy.delay("principal") == 1.0
+    for ms in range(10, 510, 50):
+        policy.observe("principal", ms / 1000)
+    assert policy.delay("principal") == pytest.approx(0.41)
+
+    for _ in range(10):
+        policy.observe("rapido", 0.01)
+        policy.observe("lento", 5.0)
+    assert policy.delay("rapido") == 0.1
+    assert policy.delay("lento") == 1.0
+
+
+def test_delay_window_forgets_old_latencies():
+    policy = HedgingPolicy("secundario", percentile=50, min_delay_ms=0, max_delay_ms=10_000, min_samples=1, window=3)
+    for seconds in (9.0, 9.0, 9.0, 0.2, 0.2, 0.2):
+        policy.observe("principal", seconds)
+    assert policy.delay("principal") == 0.2
+
+
+def test_invalid_percentile_is_rejected():
+    with pytest.raises(ValueError):
+        HedgingPolicy("secundario", percentile=0)
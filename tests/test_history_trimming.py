@@ -0,0 +1,135 @@
+import pytest
+from langchain.agents.middleware.types import ModelRequest
+from langchain.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from src.models.history_trimming import HistoryTrimMiddleware, _group_messages, trim_to_budget
+
+
+class CharCounter:
+    """Un token por carácter del contenido, más 5 por llamada a herramienta."""
+
+    name = "chars"
+
+    def count(self, message) -> int:
+        return len(str(message.content)) + 5 * len(getattr(message, "tool_calls", None) or [])
+
+
+def tool_turn(turn: int) -> list:
+    """Turno con dos llamadas a herramientas en paralelo y la respuesta final."""
+    calls = [
+        {"name": "price_tool", "args": {"query": f"producto {turn}"}, "id": f"call-{turn}-a", "type": "tool_call"},
+        {"name": "faq_tool", "args": {"query": f"pregunta {turn}"}, "id": f"call-{turn}-b", "type": "tool_call"},
+    ]
+    return [
+        HumanMessage(content=f"pregunta del turno {turn}"),
+        AIMessage(content="", tool_calls=calls),
+        ToolMessage(content="x" * 40, tool_call_id=f"call-{turn}-a", name="price_tool"),
+        ToolMessage(content="y" * 40, tool_call_id=f"call-{turn}-b", name="faq_tool"),
+        AIMessage(content=f"respuesta del turno {turn}"),
+    ]
+
+
+def conversation(turns: int) -> list:
+    return [message for turn in range(turns) for message in tool_turn(turn)]
+
+
+def assert_tool_calls_complete(messages: list) -> None:
+    call_ids = {call["id"] for m in messages if isinstance(m, AIMessage) for call in m.tool_calls}
+    result_ids = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    assert call_ids == result_ids
+
+
+def test_group_messages_keeps_tool_results_with_their_call_and_drops_orphans():
+    messages = [ToolMessage(content="huérfano", tool_call_id="lost", name="faq_tool"), *tool_turn(0)]
+    units = _group_messages(messages)
+
+    assert [len(unit) for unit in units] == [1, 3, 1]
+    assert isinstance(units[1][0], AIMessage)
+    assert [m.tool_call_id for m in units[1][1:]] == ["call-0-a", "call-0-b"]
+
+
+@pytest.mark.parametrize("max_tokens", range(0, 1200, 37))
+def test_trim_never_splits_tool_calls_from_their_results(max_tokens):
+    messages = conversation(6)
+    kept, _, _ = trim_to_budget(messages, max_tokens, CharCounter(), keep_first=False)
+
+    assert_tool_calls_complete(kept)
+    assert isinstance(kept[0], HumanMessage)
+    # Lo conservado es un sufijo del historial: se descartan turnos completos
+    assert kept == messages[len(messages) - len(kept):]
+
+
+def test_trim_respects_budget_and_reports_tokens():
+    counter = CharCounter()
+    messages = conversation(6)
+    turn_tokens = sum(counter.count(m) for m in tool_turn(5))
+
+    kept, before, after = trim_to_budget(messages, 3 * turn_tokens, counter, keep_first=False)
+
+    assert before == sum(counter.count(m) for m in messages)
+    assert after == sum(counter.count(m) for m in kept)
+    assert after <= 3 * turn_tokens
+    assert kept == messages[-15:]
+
+
+def test_current_turn_is_kept_even_over_budget():
+    messages = conversation(3)
+    kept, _, after = trim_to_budget(messages, 1, CharCounter(), keep_first=False)
+
+    assert kept == messages[-5:]
+    assert after > 1
+
+
+def test_keep_first_keeps_the_opening_message_if_it_fits():
+    counter = CharCounter()
+    messages = conversation(6)
+    turn_tokens = sum(counter.count(m) for m in tool_turn(5))
+    budget = 2 * turn_tokens + counter.count(messages[0])
+
+    kept, _, after = trim_to_budget(messages, budget, counter, keep_first=True)
+
+    assert kept[0] is messages[0]
+    assert kept[1:] == messages[-10:]
+    assert after <= budget
+
+
+def test_leading_system_message_is_always_kept():
+    counter = CharCounter()
+    system = SystemMessage(content="Eres el asistente de Colgate-Palmolive. " * 10)
+    messages = [system, *conversation(4)]
+
+    kept, _, after = trim_to_budget(messages, 1, counter, keep_first=True)
+
+    assert kept == [system, *messages[-5:]]
+    assert after == sum(counter.count(m) for m in kept)
+    assert_tool_calls_complete(kept)
+
+
+def test_middleware_keeps_summary_and_adds_it_to_system_prompt():
+    middleware = HistoryTrimMiddleware(max_tokens=50, chars_per_token=4.0)
+    state = {"messages": conversation(5), "summary": "El cliente pidió una cotización de Colgate Total."}
+
+    update = middleware.before_model(state, None)
+    assert isinstance(update["messages"][0], RemoveMessage)
+    assert "summary" not in update
+    assert_tool_calls_complete(update["messages"][1:])
+
+    seen = {}
+
+    def handler(request):
+        seen["system_prompt"] = request.system_prompt
+        return "ok"
+
+    request = ModelRequest(
+        model=None,
+        system_prompt="Eres el asistente de Colgate-Palmolive.",
+        messages=update["messages"][1:],
+        tool_choice=None,
+        tools=[],
+        response_format=None,
+        state=state,
+        runtime=None,
+    )
+    assert middleware.wrap_model_call(request, handler) == "ok"
+    assert seen["system_prompt"].startswith("Eres el asistente de Colgate-Palmolive.")
+    assert seen["system_prompt"].endswith(state["summary"])
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.memory.idempotency import IdempotencyStore
+
+
+def test_concurrent_duplicate_joins_the_running_task():
+    store = IdempotencyStore(ttl=60, max_entries=100)
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"response": "hola"}
+
+    async def main():
+        return await asyncio.gather(store.run("wamid.1", factory), store.run("wamid.1", factory))
+
+    first, second = asyncio.run(main())
+    assert calls == 1
+    assert first is second
+
+
+def test_completed_result_is_reused_within_ttl():
+    store = IdempotencyStore(ttl=60, max_entries=100)
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        return [await store.run("wamid.1", factory), await store.run("wamid.1", factory),
+                await store.run("wamid.2", factory)]
+
+    assert asyncio.run(main()) == [1, 1, 2]
+
+
+def test_expired_and_excess_results_are_evicted():
+    async def main():
+        async def factory():
+            return object()
+
+        expiring = IdempotencyStore(ttl=0, max_entries=100)
+        first = await expiring.run("wamid.1", factory)
+        assert await expiring.run("wamid.1", factory) is not first
+
+        # Con max_entries=2 se descarta primero el resultado más antiguo
+        bounded = IdempotencyStore(ttl=60, max_entries=2)
+        results = {key: await bounded.run(key, factory) for key in ("wamid.1", "wamid.2", "wamid.3")}
+        assert await bounded.run("wamid.3", factory) is results["wamid.3"]
+        assert await bounded.run("wamid.1", factory) is not results["wamid.1"]
+
+    asyncio.run(main())
+
+
+def test_failure_is_not_memoized():
+    store = IdempotencyStore(ttl=60, max_entries=100)
+    attempts = 0
+
+    async def factory():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("falla del LLM")
+        return "hola"
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await store.run("wamid.1", factory)
+        return await store.run("wamid.1", factory)
+
+    assert asyncio.run(main()) == "hola"
+    assert attempts == 2
@@ -0,0 +1,40 @@
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from src.retrieval import kb_version, vector_store  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = chromadb.EphemeralClient()
+    # Los clientes efímeros comparten el sistema en memoria del proceso
+    for name in client.list_collections():
+        client.delete_collection(getattr(name, "name", name))
+    monkeypatch.setattr(vector_store, "get_chroma_client", lambda: client)
+    return client
+
+
+def test_bump_stores_the_version_in_collection_metadata(client):
+    client.create_collection("kb_test", metadata={"source": "ingest"})
+    assert kb_version.read_kb_version("kb_test") is None
+
+    version = kb_version.bump_kb_version("kb_test")
+
+    assert kb_version.read_kb_version("kb_test") == version
+    assert client.get_collection("kb_test").metadata == {"source": "ingest", "kb_version": version}
+
+
+def test_fingerprint_changes_after_ingest(client, monkeypatch):
+    monkeypatch.setattr(kb_version.settings, "DEFAULT_COLLECTION", "kb_test")
+    client.create_collection("kb_test")
+    before = kb_version.kb_fingerprint()
+
+    kb_version.bump_kb_version()
+
+    assert kb_version.kb_fingerprint() != before
+    assert kb_version.kb_fingerprint()[1:] == before[1:]
+
+
+def test_missing_collection_reads_no_version(client):
+    assert kb_version.read_kb_version("kb_missing") is None
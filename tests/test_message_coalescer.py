@@ -0,0 +1,96 @@
+import asyncio
+
+from src.controllers.message_coalescer import MessageCoalescer
+
+
+def test_burst_within_window_becomes_one_turn():
+    coalescer = MessageCoalescer(window=0.05, max_wait=1)
+    calls = []
+
+    async def run(text: str) -> str:
+        calls.append(text)
+        return f"respuesta a {text!r}"
+
+    async def main():
+        async def send(text: str, delay: float):
+            await asyncio.sleep(delay)
+            return await coalescer.submit("573001234567", text, run)
+
+        return await asyncio.gather(
+            send("hola", 0), send("quiero una crema dental", 0.01), send("para encías sensibles", 0.02)
+        )
+
+    replies = asyncio.run(main())
+    assert calls == ["hola\nquiero una crema dental\npara encías sensibles"]
+    assert len(set(replies)) == 1
+
+
+def test_max_wait_bounds_a_continuous_burst():
+    coalescer = MessageCoalescer(window=0.05, max_wait=0.1)
+    calls = []
+
+    async def run(text: str) -> str:
+        calls.append(text)
+        return text
+
+    async def main():
+        async def send(index: int):
+            await asyncio.sleep(index * 0.03)
+            return await coalescer.submit("573001234567", str(index), run)
+
+        # Cada mensaje llega antes de que cierre la ventana, pero el grupo se ejecuta a los max_wait
+        await asyncio.gather(*(send(index) for index in range(8)))
+
+    asyncio.run(main())
+    assert len(calls) > 1
+    assert "\n".join(calls).split("\n") == [str(index) for index in range(8)]
+
+
+def test_keys_and_failures_are_isolated():
+    coalescer = MessageCoalescer(window=0.02, max_wait=1)
+
+    async def run(text: str) -> str:
+        if text == "falla":
+            raise RuntimeError("falla del turno")
+        return text
+
+    async def main():
+        return await asyncio.gather(
+            coalescer.submit("573001111111", "falla", run),
+            coalescer.submit("573002222222", "hola", run),
+            return_exceptions=True,
+        )
+
+    failed, ok = asyncio.run(main())
+    assert isinstance(failed, RuntimeError)
+    assert ok == "hola"
+
+
+def test_cancelled_flush_releases_the_waiters():
+    coalescer = MessageCoalescer(window=0.02, max_wait=1)
+    started = []
+
+    async def run(text: str) -> str:
+        started.append(text)
+        await asyncio.sleep(10)
+        return text
+
+    async def main():
+        waiters = [
+            asyncio.create_task(coalescer.submit("573001111111", "hola", run)),
+            asyncio.create_task(coalescer.submit("573002222222", "buenas", run)),
+        ]
+        await asyncio.sleep(0)
+        # Un grupo se cancela durante la ventana y el otro mientras ejecuta el turno
+        flush_in_window = next(iter(coalescer._tasks))
+        flush_in_window.cancel()
+        await asyncio.sleep(0.05)
+        assert started and len(started) == 1
+        for task in list(coalescer._tasks):
+            task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=1)
+        return results, dict(coalescer._batches)
+
+    results, batches = asyncio.run(main())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert batches == {}
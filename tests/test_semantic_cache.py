@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+from src.memory.semantic_cache import SemanticCache
+
+
+class FakeEmbeddings:
+    """Embeddings fijos por texto; los textos desconocidos son ortogonales a todo."""
+
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.vectors.get(text, [0.0, 0.0, 0.0, 1.0])
+
+
+VECTORS = {
+    "quien fundo colgate": [1.0, 0.0, 0.0, 0.0],
+    "quien creo colgate": [0.98, 0.2, 0.0, 0.0],
+    "horarios de atencion": [0.0, 1.0, 0.0, 0.0],
+    "donde comprar palmolive": [0.0, 0.0, 1.0, 0.0],
+}
+
+
+def make_cache(fingerprint=lambda: ("v1",), **kwargs) -> SemanticCache:
+    options = {"threshold": 0.9, "max_entries": 100, "ttl": 60, "fingerprint_check_interval": 0}
+    options.update(kwargs)
+    return SemanticCache(lambda: FakeEmbeddings(VECTORS), fingerprint=fingerprint, **options)
+
+
+def test_similar_question_hits_and_distinct_question_misses():
+    cache = make_cache()
+
+    async def main():
+        answer, vector = await cache.alookup("quien fundo colgate")
+        assert answer is None
+        cache.store("quien fundo colgate", vector, "William Colgate, en 1806.")
+        return (await cache.alookup("quien creo colgate"))[0], (await cache.alookup("horarios de atencion"))[0]
+
+    similar, distinct = asyncio.run(main())
+    assert similar == "William Colgate, en 1806."
+    assert distinct is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_reuses_rows():
+    cache = make_cache(max_entries=2)
+
+    async def main():
+        for text in ("quien fundo colgate", "horarios de atencion", "donde comprar palmolive"):
+            _, vector = await cache.alookup(text)
+            cache.store(text, vector, text.upper())
+        return [(await cache.alookup(text))[0] for text in VECTORS]
+
+    assert asyncio.run(main()) == [None, None, "HORARIOS DE ATENCION", "DONDE COMPRAR PALMOLIVE"]
+    assert cache.stats()["size"] == 2
+
+
+def test_fingerprint_is_read_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    reads = []
+
+    def fingerprint():
+        reads.append(threading.get_ident())
+        return ("v1",)
+
+    cache = make_cache(fingerprint=fingerprint)
+    assert reads == []
+
+    async def main():
+        await cache.alookup("horarios de atencion")
+        await cache._fingerprint_task
+
+    asyncio.run(main())
+    assert reads and loop_thread not in reads
+
+
+def test_unknown_fingerprint_does_not_clear_but_a_change_does():
+    readings = iter([("v1", 10), (None, 10), ("v1", 10), ("v2", 10)])
+    cache = make_cache(fingerprint=lambda: next(readings))
+
+    async def main():
+        _, vector = await cache.alookup("quien fundo colgate")
+        cache.store("quien fundo colgate", vector, "William Colgate, en 1806.")
+        await cache._fingerprint_task
+        sizes = []
+        for _ in range(3):
+            await cache.alookup("horarios de atencion")
+            await cache._fingerprint_task
+            sizes.append(cache.stats()["size"])
+        return sizes
+
+    # Chroma sin respuesta (None) y su recuperación no vacían el caché; una versión nueva sí
+    assert asyncio.run(main()) == [1, 1, 0]
+    assert cache.stats()["invalidations"] == 1
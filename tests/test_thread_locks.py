@@ -0,0 +1,67 @@
+import asyncio
+
+from src.controllers.thread_locks import ThreadLockRegistry
+
+
+def test_same_thread_turns_are_serialized_in_order():
+    registry = ThreadLockRegistry()
+    events = []
+
+    async def turn(name: str):
+        async with registry.hold("573001234567"):
+            events.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name}:end")
+
+    async def main():
+        tasks = [asyncio.create_task(turn(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert len(registry) == 1
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert events == ["a:start", "a:end", "b:start", "b:end", "c:start", "c:end"]
+    assert len(registry) == 0
+
+
+def test_different_threads_run_in_parallel():
+    registry = ThreadLockRegistry()
+
+    async def main():
+        first_inside = asyncio.Event()
+        second_inside = asyncio.Event()
+
+        async def first():
+            async with registry.hold("573001111111"):
+                first_inside.set()
+                # Si los locks se compartieran, la segunda conversación nunca entraría
+                await asyncio.wait_for(second_inside.wait(), timeout=1)
+
+        async def second():
+            await first_inside.wait()
+            async with registry.hold("573002222222"):
+                second_inside.set()
+
+        await asyncio.gather(first(), second())
+
+    asyncio.run(main())
+    assert len(registry) == 0
+
+
+def test_entry_is_released_when_the_turn_fails():
+    registry = ThreadLockRegistry()
+
+    async def failing_turn():
+        async with registry.hold("573001234567"):
+            raise RuntimeError("falla del turno")
+
+    async def main():
+        try:
+            await failing_turn()
+        except RuntimeError:
+            pass
+        async with registry.hold("573001234567"):
+            pass
+
+    asyncio.run(main())
+    assert len(registry) == 0
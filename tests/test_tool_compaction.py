@@ -0,0 +1,71 @@
+from langchain.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+
+from src.models.tool_compaction import (
+    COMPACTED_TAG,
+    ToolResultCompactionMiddleware,
+    compact_tool_content,
+    compact_tool_messages,
+)
+
+
+def tool_turn(turn: int, size: int = 1000) -> list:
+    call_id = f"call-{turn}"
+    return [
+        HumanMessage(content=f"pregunta del turno {turn}", id=f"human-{turn}"),
+        AIMessage(
+            content="",
+            id=f"ai-call-{turn}",
+            tool_calls=[{"name": "retrieve_tool", "args": {"query": "encías"}, "id": call_id, "type": "tool_call"}],
+        ),
+        ToolMessage(content=f"{turn}" * size, tool_call_id=call_id, name="retrieve_tool", id=f"tool-{turn}"),
+        AIMessage(content=f"respuesta del turno {turn}", id=f"ai-{turn}"),
+    ]
+
+
+def conversation(turns: int, size: int = 1000) -> list:
+    return [message for turn in range(turns) for message in tool_turn(turn, size)]
+
+
+def test_only_turns_older_than_keep_turns_are_compacted():
+    messages = conversation(4)
+    compacted = compact_tool_messages(messages, max_chars=100, keep_turns=2)
+
+    assert [message.id for message in compacted] == ["tool-0", "tool-1"]
+    assert compact_tool_messages(messages, max_chars=100, keep_turns=4) == []
+
+
+def test_compacted_messages_keep_ids_and_tool_call_ids():
+    messages = conversation(3)
+    compacted = compact_tool_messages(messages, max_chars=100, keep_turns=1)
+    updated = add_messages(messages, compacted)
+
+    assert [message.id for message in updated] == [message.id for message in messages]
+    for original, message in zip(messages, updated):
+        if isinstance(message, ToolMessage):
+            assert message.tool_call_id == original.tool_call_id
+            assert message.name == original.name
+    assert COMPACTED_TAG in updated[2].content and COMPACTED_TAG in updated[6].content
+    assert updated[10].content == messages[10].content
+
+
+def test_compacted_content_keeps_head_and_reference():
+    message = tool_turn(7, size=500)[2]
+    content = compact_tool_content(message, max_chars=50)
+
+    assert content.startswith("7" * 50)
+    assert "retrieve_tool: 500 caracteres, sha1:" in content
+    # Contenidos cortos o ya compactados no cambian
+    assert compact_tool_content(message, max_chars=500) is None
+    assert compact_tool_content(message.model_copy(update={"content": content}), max_chars=50) is None
+
+
+def test_middleware_compacts_after_agent_and_is_idempotent():
+    middleware = ToolResultCompactionMiddleware(max_chars=100, keep_turns=1)
+    messages = conversation(2)
+
+    update = middleware.after_agent({"messages": messages}, None)
+    assert [message.id for message in update["messages"]] == ["tool-0"]
+
+    messages = add_messages(messages, update["messages"])
+    assert middleware.after_agent({"messages": messages}, None) is None
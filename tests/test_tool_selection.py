@@ -0,0 +1,54 @@
+from langchain.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.models.tool_selection import BASE_TOOLS, QUOTE_TOOLS, RETRIEVAL_TOOL, select_tools
+
+AVAILABLE = ["faq_tool", "price_tool", "retrieve_tool", "calculator_tool", "pdf_quote_tool", "email_quote_tool"]
+QUOTE = [name for name in AVAILABLE if name in QUOTE_TOOLS]
+
+
+def tool_step(name: str, result: str, call_id: str) -> list:
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": call_id, "type": "tool_call"}]),
+        ToolMessage(content=result, tool_call_id=call_id, name=name),
+    ]
+
+
+def test_greeting_gets_only_the_base_tools():
+    assert select_tools([HumanMessage(content="¡Hola, buenas tardes!")], AVAILABLE) == list(BASE_TOOLS)
+    assert select_tools([HumanMessage(content="gracias")], AVAILABLE) == list(BASE_TOOLS)
+
+
+def test_price_question_skips_retrieval():
+    messages = [HumanMessage(content="¿Cuánto cuesta la crema dental Colgate Total en Éxito?")]
+    assert select_tools(messages, AVAILABLE) == list(BASE_TOOLS)
+
+
+def test_open_question_adds_retrieval():
+    messages = [HumanMessage(content="¿Qué hago si me sangran las encías al cepillarme?")]
+    assert select_tools(messages, AVAILABLE) == [*BASE_TOOLS, RETRIEVAL_TOOL]
+
+
+def test_quote_flow_exposes_quote_tools_for_the_rest_of_the_conversation():
+    start = [HumanMessage(content="Quiero cotizar 24 unidades de Colgate Total")]
+    assert select_tools(start, AVAILABLE) == [*BASE_TOOLS, *QUOTE]
+
+    # Los turnos siguientes del flujo (correo, confirmaciones) conservan las herramientas
+    follow_up = [
+        *start,
+        *tool_step("calculator_tool", "Total: $312.000", "call-1"),
+        AIMessage(content="¿A qué correo envío la cotización?"),
+        HumanMessage(content="ana.gomez@gmail.com"),
+    ]
+    assert select_tools(follow_up, AVAILABLE) == [*BASE_TOOLS, *QUOTE]
+    assert select_tools([*follow_up, HumanMessage(content="sí, así está bien")], AVAILABLE) == [*BASE_TOOLS, *QUOTE]
+
+
+def test_faq_miss_falls_back_to_retrieval_in_the_same_turn():
+    question = HumanMessage(content="¿Cuál es el precio del cepillo Colgate 360 con carbón?")
+    miss = tool_step("faq_tool", "Lo siento, no encontré una pregunta similar en las preguntas frecuentes.", "call-1")
+
+    assert select_tools([question], AVAILABLE) == list(BASE_TOOLS)
+    assert select_tools([question, *miss], AVAILABLE) == [*BASE_TOOLS, RETRIEVAL_TOOL]
+    # Un fallo de FAQ de un turno anterior no abre la búsqueda en el turno siguiente
+    next_turn = [question, *miss, AIMessage(content="No tengo ese dato."), HumanMessage(content="ok")]
+    assert select_tools(next_turn, AVAILABLE) == list(BASE_TOOLS)
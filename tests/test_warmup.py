@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+
+import src.models.chatbot_model as chatbot_model
+from src.config.settings import settings
+from src.controllers import warmup
+from src.controllers.warmup import WarmupState, warm_up
+from src.models.model_registry import ModelRegistry
+
+
+class MemorySaver(InMemorySaver):
+    """Checkpointer en memoria con el setup() del saver de Postgres."""
+
+    def setup(self):
+        pass
+
+
+class AsyncMemorySaver(InMemorySaver):
+    async def setup(self):
+        pass
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(chatbot_model, "create_checkpointer_context", lambda: nullcontext(MemorySaver()))
+    monkeypatch.setattr(
+        chatbot_model, "create_async_checkpointer_context", lambda: nullcontext(AsyncMemorySaver())
+    )
+    # Sin datos locales ni vector store: solo interesan el controlador y el turno sintético
+    monkeypatch.setattr(warmup, "preload_qa_data", lambda: None)
+    monkeypatch.setattr(warmup, "_warm_vector_store", lambda: None)
+    registry = ModelRegistry.from_yaml(settings.MODELS_CONFIG_PATH)
+    return SimpleNamespace(model=chatbot_model.ChatbotModel("fake-small", tools=[], registry=registry))
+
+
+def test_synthetic_turn_leaves_no_thread_in_the_checkpointer(controller):
+    state = WarmupState()
+    threads = []
+    ainvoke = controller.model.ainvoke
+
+    async def recording_ainvoke(messages, thread_id=None, **kwargs):
+        threads.append(thread_id)
+        return await ainvoke(messages, thread_id=thread_id, **kwargs)
+
+    controller.model.ainvoke = recording_ainvoke
+
+    async def main():
+        for _ in range(2):
+            await warm_up(state, lambda: controller, "hola")
+        checkpointer = controller.model.async_checkpointer
+        stored = [item async for item in checkpointer.alist(None)]
+        await controller.model.aclose()
+        return stored
+
+    stored = asyncio.run(main())
+    assert state.ready and state.steps["synthetic_turn"]["ok"]
+    # Cada arranque usa una conversación desechable distinta y la borra al terminar
+    assert len(threads) == 2 and len(set(threads)) == 2
+    assert all(thread_id.startswith("warmup-") for thread_id in threads)
+    assert stored == []
+
+
+def test_failed_synthetic_turn_is_also_deleted(controller, monkeypatch):
+    state = WarmupState()
+    deleted = []
+    checkpointer_delete = AsyncMemorySaver.adelete_thread
+
+    async def failing_ainvoke(messages, thread_id=None, **kwargs):
+        raise RuntimeError("modelo no disponible")
+
+    async def recording_delete(self, thread_id):
+        deleted.append(thread_id)
+        await checkpointer_delete(self, thread_id)
+
+    controller.model.ainvoke = failing_ainvoke
+    monkeypatch.setattr(AsyncMemorySaver, "adelete_thread", recording_delete)
+    asyncio.run(warm_up(state, lambda: controller, "hola"))
+
+    # El turno sintético es opcional: la instancia queda lista aunque falle
+    assert state.ready and not state.steps["synthetic_turn"]["ok"]
+    assert len(deleted) == 1 and deleted[0].startswith("warmup-")